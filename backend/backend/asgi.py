@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Load the employee search index while the server starts.
+os.environ.setdefault('SEARCH_INDEX_WARM', '1')
+# Serve the external-auth endpoints with native async views.
+os.environ.setdefault('ASYNC_AUTH_VIEWS', '1')
 
 application = get_asgi_application()
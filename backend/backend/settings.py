@@ -43,8 +43,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'hackathon.middleware.InstrumentationMiddleware',
+    'hackathon.middleware.ProfilingMiddleware',
+    'hackathon.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'hackathon.middleware.CorsMiddleware',
+    'hackathon.middleware.SessionAuthMiddleware',
+    'hackathon.middleware.ReplicaRoutingMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -84,9 +89,126 @@ DATABASES = {
 if not DATABASES['default'].get('NAME'):
     DATABASES['default'] = {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': ':memory:',
+        # SQLITE_PATH keeps a local (e.g. benchmark) database between runs.
+        'NAME': os.getenv('SQLITE_PATH', ':memory:'),
     }
 
+# Read replicas (hackathon.replicas): GET requests read from them round
+# robin; writes, and a client's reads for REPLICA_LAG_SECONDS after its
+# own write, use the primary. Replicas are probed at most every
+# REPLICA_CHECK_SECONDS and skipped for REPLICA_RETRY_SECONDS after a
+# failure. DB_REPLICA_HOSTS lists MySQL replicas ("host" or "host:port",
+# same name and credentials as the primary); with SQLite,
+# SQLITE_REPLICA_PATHS lists database files (copies of SQLITE_PATH),
+# opened read-only.
+_sqlite = DATABASES['default']['ENGINE'].endswith('sqlite3')
+_replicas = os.getenv('SQLITE_REPLICA_PATHS' if _sqlite else 'DB_REPLICA_HOSTS', '')
+for _n, _entry in enumerate(filter(None, map(str.strip, _replicas.split(','))), start=1):
+    if _sqlite:
+        # Read-only: a missing file is an error instead of a new empty database.
+        _replica = {**DATABASES['default'], 'NAME': f'{Path(_entry).resolve().as_uri()}?mode=ro'}
+    else:
+        _host, _, _port = _entry.partition(':')
+        _replica = {**DATABASES['default'], 'HOST': _host, 'PORT': _port or DATABASES['default']['PORT']}
+    # Tests use the primary for replica aliases.
+    DATABASES[f'replica{_n}'] = {**_replica, 'TEST': {'MIRROR': 'default'}}
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['hackathon.replicas.ReplicaRouter']
+REPLICA_LAG_SECONDS = float(os.getenv('REPLICA_LAG_SECONDS', '5'))
+REPLICA_CHECK_SECONDS = float(os.getenv('REPLICA_CHECK_SECONDS', '5'))
+REPLICA_RETRY_SECONDS = float(os.getenv('REPLICA_RETRY_SECONDS', '30'))
+
+# Employee search index (hackathon.search): loaded in the background when
+# the server starts (backend/wsgi.py, backend/asgi.py set SEARCH_INDEX_WARM)
+# and rebuilt from scratch after SEARCH_INDEX_TTL seconds.
+SEARCH_INDEX_WARM = os.getenv('SEARCH_INDEX_WARM', '').strip().lower() in {'1', 'true', 'yes'}
+SEARCH_INDEX_TTL = float(os.getenv('SEARCH_INDEX_TTL', '300'))
+
+# IDs reserved per database round-trip by the hi/lo allocators of the
+# employee tables (hackathon.ids); EMP_ID_BLOCK_SIZE is the older name.
+ID_BLOCK_SIZE = int(os.getenv('ID_BLOCK_SIZE') or os.getenv('EMP_ID_BLOCK_SIZE') or '20')
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at e.g. Redis
+# or Memcached to share cached stats between workers. Entries are filed
+# under data versions (hackathon.caching), so a per-worker cache never
+# serves data older than the last committed write.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'hackathon'),
+    },
+}
+
+# How long (seconds) a cached entry is kept; a write files new entries under a new version.
+STATS_CACHE_TTL = int(os.getenv('STATS_CACHE_TTL', '300'))
+
+# Data versions behind ETags and report files (hackathon.caching) also
+# expire after this many seconds, for writes that bypass the app (0 = never).
+DATA_VERSION_MAX_AGE = float(os.getenv('DATA_VERSION_MAX_AGE', '300'))
+
+
+# When set, GET /metrics requires "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# List responses use orjson when installed; "json" forces the stdlib encoder.
+JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto')
+
+# Response compression (hackathon.middleware.CompressionMiddleware): codings
+# offered in preference order (br/zstd need the brotli/zstandard packages)
+# and the smallest body worth compressing.
+COMPRESS_ENCODINGS = tuple(
+    name.strip() for name in os.getenv('COMPRESS_ENCODINGS', 'zstd,br,gzip').split(',') if name.strip()
+)
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+
+# Report CSVs (hackathon.report_jobs): where generated files are kept, how
+# many are generated at once (0 = inline in the request), the longest wait
+# a download may ask for with ?wait= and how long a replaced file is kept
+# for downloads already handed its path.
+REPORT_DIR = os.getenv('REPORT_DIR', str(BASE_DIR / 'report_artifacts'))
+REPORT_WORKERS = int(os.getenv('REPORT_WORKERS', '2'))
+REPORT_WAIT_TIMEOUT = float(os.getenv('REPORT_WAIT_TIMEOUT', '30'))
+REPORT_GRACE_SECONDS = float(os.getenv('REPORT_GRACE_SECONDS', '60'))
+
+# Threads for /api/batch requests sent with "parallel": true.
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '4'))
+
+# Live updates (/api/events, hackathon.events): frames queued per client
+# before it is told to resync, and seconds between keep-alive comments.
+EVENTS_QUEUE_SIZE = int(os.getenv('EVENTS_QUEUE_SIZE', '100'))
+EVENTS_HEARTBEAT = float(os.getenv('EVENTS_HEARTBEAT', '15'))
+
+
+# Request profiling (hackathon.profiling): requests sent with
+# "X-Profile: <PROFILE_TOKEN>" are profiled on demand; PROFILE_SAMPLE_RATE
+# (0-1) of all requests are sampled in the background. PROFILE_DIR is
+# trimmed to the newest PROFILE_MAX_FILES every few saves.
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', '0.005'))
+PROFILE_DIR = os.getenv('PROFILE_DIR', str(BASE_DIR / 'profiles'))
+PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '500'))
+
+
+# External auth service client: keep-alive pool per host.
+EXTERNAL_AUTH_POOL_SIZE = int(os.getenv('EXTERNAL_AUTH_POOL_SIZE', '10'))
+EXTERNAL_AUTH_CONNECT_TIMEOUT = float(os.getenv('EXTERNAL_AUTH_CONNECT_TIMEOUT', '5'))
+EXTERNAL_AUTH_READ_TIMEOUT = float(os.getenv('EXTERNAL_AUTH_READ_TIMEOUT', '15'))
+
+# Largest body accepted by the bulk employee import (JSON or CSV), in bytes.
+IMPORT_MAX_BYTES = int(os.getenv('IMPORT_MAX_BYTES', str(20 * 1024 * 1024)))
+
+# Verified session tokens kept in memory per process (hackathon.auth).
+SESSION_CACHE_SIZE = int(os.getenv('SESSION_CACHE_SIZE', '10000'))
+
+# Route the external-auth endpoints to native async views. backend/asgi.py
+# turns this on; under WSGI the sync views with the blocking pool are used.
+ASYNC_AUTH_VIEWS = os.getenv('ASYNC_AUTH_VIEWS', '').strip().lower() in {'1', 'true', 'yes'}
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -107,6 +229,10 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [BASE_DIR.parent / 'frontend']
 
+# Output of "npm run build": content-hashed, precompressed files under
+# assets/ are served at /assets/ with far-future cache headers.
+FRONTEND_DIST = Path(os.getenv('FRONTEND_DIST', str(BASE_DIR.parent / 'frontend' / 'dist')))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
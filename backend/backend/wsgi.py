@@ -12,5 +12,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Load the employee search index while the server starts.
+os.environ.setdefault('SEARCH_INDEX_WARM', '1')
 
 application = get_wsgi_application()
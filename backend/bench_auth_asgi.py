@@ -0,0 +1,191 @@
+"""Compare WSGI vs ASGI throughput of /api/login against a slow auth stub.
+
+The external auth service is replaced by a local keep-alive HTTP server that
+sleeps ``--delay`` seconds per call. WSGI mode drives the sync views through
+``WSGIHandler`` with a fixed pool of worker threads (like gunicorn sync
+workers); ASGI mode drives the async views through ``ASGIHandler`` on a
+single event loop. Each mode runs in its own subprocess.
+
+    python bench_auth_asgi.py --requests 2000 --concurrency 200 --workers 8
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BODY = json.dumps({'username': 'bench@example.com', 'password': 'secret'}).encode('utf-8')
+
+
+class _SlowAuthHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    delay = 0.05
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        time.sleep(self.delay)
+        body = b'{"status": "success", "display_name": "Bench"}'
+        # One write for headers + body so Nagle/delayed-ACK never adds latency.
+        self.wfile.write(
+            b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+            b'Content-Length: %d\r\n\r\n%s' % (len(body), body)
+        )
+
+    def log_message(self, *args):
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Default listen backlog (5) drops connection bursts from the ASGI run.
+    request_queue_size = 1024
+
+
+def _start_stub(delay: float) -> ThreadingHTTPServer:
+    _SlowAuthHandler.delay = delay
+    server = _StubServer(('127.0.0.1', 0), _SlowAuthHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _setup_django(mode: str, stub_url: str, pool_size: int) -> None:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.environ['LOGIN_THROUGH_PASSWORD_URL'] = stub_url
+    os.environ['ASYNC_AUTH_VIEWS'] = '1' if mode == 'asgi' else '0'
+    os.environ['EXTERNAL_AUTH_POOL_SIZE'] = str(pool_size)
+    os.environ.setdefault('SECRET_KEY', 'bench-secret-key')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+
+    django.setup()
+
+
+def _run_wsgi(total: int, workers: int) -> list[int]:
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+
+    def one(_):
+        environ = {
+            'REQUEST_METHOD': 'POST',
+            'PATH_INFO': '/api/login',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '8000',
+            'HTTP_HOST': 'localhost',
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(BODY)),
+            'wsgi.input': io.BytesIO(BODY),
+            'wsgi.url_scheme': 'http',
+            'wsgi.errors': sys.stderr,
+        }
+        statuses = []
+        b''.join(handler(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+        return int(statuses[0].split()[0])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(one, range(total)))
+
+
+def _run_asgi(total: int, concurrency: int) -> list[int]:
+    from django.core.handlers.asgi import ASGIHandler
+
+    app = ASGIHandler()
+
+    async def one(limit: asyncio.Semaphore) -> int:
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'POST',
+            'scheme': 'http',
+            'path': '/api/login',
+            'raw_path': b'/api/login',
+            'query_string': b'',
+            'headers': [
+                (b'host', b'localhost'),
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(BODY)).encode()),
+            ],
+            'server': ('localhost', 8000),
+        }
+        messages = [{'type': 'http.request', 'body': BODY, 'more_body': False}]
+        status = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        async with limit:
+            await app(scope, receive, send)
+        return status[0]
+
+    async def main() -> list[int]:
+        limit = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(one(limit) for _ in range(total)))
+
+    return asyncio.run(main())
+
+
+def _child(args) -> None:
+    _setup_django(args.mode, args.stub_url, args.concurrency)
+    started = time.perf_counter()
+    if args.mode == 'wsgi':
+        statuses = _run_wsgi(args.requests, args.workers)
+    else:
+        statuses = _run_asgi(args.requests, args.concurrency)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'mode': args.mode,
+        'requests': args.requests,
+        'ok': sum(1 for s in statuses if s == 200),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(args.requests / elapsed, 1),
+        'threads': args.workers if args.mode == 'wsgi' else 1,
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=200, help='in-flight requests in ASGI mode')
+    parser.add_argument('--workers', type=int, default=8, help='worker threads in WSGI mode')
+    parser.add_argument('--delay', type=float, default=0.05, help='stub latency in seconds')
+    parser.add_argument('--mode', choices=['wsgi', 'asgi'], help=argparse.SUPPRESS)
+    parser.add_argument('--stub-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        _child(args)
+        return
+
+    stub = _start_stub(args.delay)
+    stub_url = f'http://127.0.0.1:{stub.server_address[1]}/login'
+    results = []
+    for mode in ('wsgi', 'asgi'):
+        out = subprocess.run(
+            [
+                sys.executable, __file__, '--mode', mode, '--stub-url', stub_url,
+                '--requests', str(args.requests), '--concurrency', str(args.concurrency),
+                '--workers', str(args.workers),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(json.dumps({'delay': args.delay, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,334 @@
+"""Latency, query count and peak memory for every route in hackathon/urls.py.
+
+Creates the emp_* tables in a local SQLite database (in memory, or in
+``--sqlite PATH`` so a large dataset is generated once and reused), fills
+them with synthetic employees, CTC histories, compliance, registration and
+bank rows, then drives each endpoint through the Django test client.
+Results are JSON; pass ``--baseline`` with an earlier result to flag
+regressions. A case that answers anything but 2xx or 304 fails the run:
+its timings are not of the endpoint working. Failures and regressions exit
+with status 1.
+
+    python bench_endpoints.py --scale 1k
+    python bench_endpoints.py --scale 100k --sqlite /tmp/hr-100k.sqlite3 --output run.json
+    python bench_endpoints.py --scale 1k --baseline run.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+
+SCALES = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+# Routes that are deliberately not measured here.
+SKIPPED = {
+    'api_login': 'calls the external auth service (see bench_auth_asgi.py)',
+    'api_register': 'calls the external auth service',
+    'api_forgot_password': 'calls the external auth service',
+    'api_otp_request': 'calls the external auth service',
+    'api_otp_verify': 'needs a challenge from api_otp_request',
+    'frontend_asset': 'serves files from the frontend build',
+    'events': 'long-lived event stream (ASGI only)',
+}
+
+
+@dataclass
+class Case:
+    name: str
+    route: str
+    path: str
+    method: str = 'get'
+    params: dict | None = None
+    # Called with the iteration number; returns the JSON body for POSTs.
+    body: object = None
+    auth: bool = False
+
+
+def _cases(employees: int) -> list[Case]:
+    some_emp = max(1, employees // 2)
+
+    def exit_body(i):
+        # Alternate the date so every call is a real write.
+        return {'emp_id': some_emp, 'end_date': (date.today() + timedelta(days=30 + i % 2)).isoformat()}
+
+    def bulk_body(i):
+        return [
+            {'first_name': f'Bulk{i}', 'last_name': f'Row{n}', 'start_date': '2024-04-01',
+             'ctc': {'int_title': 'eng', 'ext_title': 'Engineer', 'main_level': 2, 'sub_level': 'A', 'ctc_amt': 900000}}
+            for n in range(100)
+        ]
+
+    cases = [
+        Case('health', 'health', '/'),
+        Case('metrics', 'metrics', '/metrics'),
+        Case('home', 'api_home', '/api/home', auth=True),
+        Case('logout', 'api_logout', '/api/logout', method='post', body=lambda i: {}),
+        Case('batch_dashboard', 'batch', '/api/batch', method='post', body=lambda i: {'requests': [
+            {'id': path, 'path': path}
+            for path in ('/api/employees', '/api/compliance', '/api/onboarding', '/api/exit-workflow', '/api/reports')
+        ]}),
+        Case('employees', 'employee_list', '/api/employees'),
+        Case('employees_page', 'employee_list', '/api/employees', params={'limit': 100, 'sort': '-start_date'}),
+        Case('employees_filtered', 'employee_list', '/api/employees',
+             params={'status': 'active', 'start_from': '2020-01-01', 'name': 'A'}),
+        Case('employee_search', 'employee_search', '/api/employees/search', params={'q': 'pri eng'}),
+        Case('employee_profile', 'employee_profile', f'/api/employees/{some_emp}', auth=True),
+        Case('employee_add', 'employee_add', '/api/employees/add', method='post',
+             body=lambda i: {'first_name': 'Bench', 'last_name': f'Add{i}', 'start_date': '2024-04-01'}),
+        Case('employee_bulk_100', 'employee_bulk_import', '/api/employees/bulk', method='post', body=bulk_body,
+             auth=True),
+        Case('compliance', 'compliance_list', '/api/compliance'),
+        Case('onboarding', 'onboarding_list', '/api/onboarding'),
+        Case('job_history', 'job_history_list', '/api/job-history'),
+        Case('job_history_page', 'job_history_list', '/api/job-history',
+             params={'limit': 100, 'effective_from': '2020-01-01'}),
+        Case('exit_workflow', 'exit_workflow_list', '/api/exit-workflow'),
+        Case('reports', 'reports', '/api/reports'),
+        Case('report_stats', 'report_stats', '/api/reports/stats'),
+        Case('initiate_exit', 'initiate_exit', '/api/initiate-exit', method='post', body=exit_body),
+        Case('changes', 'changes', '/api/changes', params={'since': 0}),
+    ]
+    from hackathon.reports import REPORTS
+
+    for slug in REPORTS:
+        cases.append(Case(f'report_download_{slug}', 'report_download', f'/api/reports/download/{slug}'))
+    return cases
+
+
+def _setup_django(sqlite_path: str | None) -> None:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    # Empty DB_NAME selects the SQLite fallback in settings.
+    os.environ['DB_NAME'] = ''
+    if sqlite_path:
+        os.environ['SQLITE_PATH'] = sqlite_path
+    os.environ.setdefault('SECRET_KEY', 'bench-secret-key')
+    # Generate reports inline: worker threads cannot see an in-memory
+    # SQLite database, and inline runs are what the timings should cover.
+    os.environ.setdefault('REPORT_WORKERS', '0')
+    os.environ.setdefault('REPORT_DIR', tempfile.mkdtemp(prefix='bench-reports-'))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+
+    django.setup()
+
+
+def _prepare_data(employees: int, seed: int, regenerate: bool) -> dict:
+    from django.core.management import call_command
+
+    from hackathon import synthetic
+    from hackathon.models import EmpMaster
+
+    # Tables first: the report indexes migration skips missing tables.
+    synthetic.create_tables()
+    call_command('migrate', verbosity=0)
+    existing = EmpMaster.objects.count()
+    if existing == employees and not regenerate:
+        return {'reused': True, 'employees': existing}
+    synthetic.clear_tables()
+    started = time.perf_counter()
+    counts = synthetic.generate(employees, seed=seed)
+    return {'reused': False, 'seconds': round(time.perf_counter() - started, 1), **counts.as_dict()}
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    # Nearest-rank percentile.
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def _call(client, case: Case, i: int, headers: dict):
+    kwargs = {'headers': headers} if headers else {}
+    if case.method == 'get':
+        response = client.get(case.path, case.params or {}, **kwargs)
+    else:
+        response = client.post(case.path, case.body(i), content_type='application/json', **kwargs)
+    if response.streaming:
+        size = sum(len(chunk) for chunk in response.streaming_content)
+    else:
+        size = len(response.content)
+    return response.status_code, size
+
+
+def _succeeded(status: int) -> bool:
+    return 200 <= status < 300 or status == 304
+
+
+def _measure(client, case: Case, *, repeat: int, warmup: int, warm_cache: bool, headers: dict) -> dict:
+    from django.core.cache import cache
+    from django.db import connection
+
+    headers = headers if case.auth else {}
+    latencies, queries, db_ms, statuses, size = [], [], [], set(), 0
+    for i in range(warmup):
+        statuses.add(_call(client, case, i, headers)[0])
+
+    for i in range(warmup, warmup + repeat):
+        if not warm_cache:
+            cache.clear()
+        counter = _QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            status, size = _call(client, case, i, headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count)
+        db_ms.append(counter.seconds * 1000)
+        statuses.add(status)
+
+    # Separate pass: tracemalloc slows the request down too much to time it.
+    if not warm_cache:
+        cache.clear()
+    tracemalloc.start()
+    statuses.add(_call(client, case, warmup + repeat, headers)[0])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    ordered = sorted(latencies)
+    return {
+        'route': case.route,
+        'status': sorted(statuses),
+        'p50_ms': round(_percentile(ordered, 50), 3),
+        'p90_ms': round(_percentile(ordered, 90), 3),
+        'p99_ms': round(_percentile(ordered, 99), 3),
+        'max_ms': round(ordered[-1], 3),
+        'mean_ms': round(sum(ordered) / len(ordered), 3),
+        'queries': max(queries),
+        'db_execute_ms_p50': round(sorted(db_ms)[len(db_ms) // 2], 3),
+        'response_bytes': size,
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def _compare(results: dict, baseline: dict, tolerance: float) -> list[dict]:
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            continue
+        slower = current['p50_ms'] > before['p50_ms'] * (1 + tolerance) and current['p50_ms'] - before['p50_ms'] > 1
+        more_queries = current['queries'] > before['queries']
+        if slower or more_queries:
+            regressions.append({
+                'case': name,
+                'p50_ms': [before['p50_ms'], current['p50_ms']],
+                'queries': [before['queries'], current['queries']],
+            })
+    return regressions
+
+
+def _route_names(patterns) -> set[str]:
+    names = set()
+    for pattern in patterns:
+        if hasattr(pattern, 'url_patterns'):
+            names |= _route_names(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', default='1k', help=f'employee count or one of {", ".join(SCALES)}')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--only', nargs='*', help='case names to run (default: all)')
+    parser.add_argument('--warm-cache', action='store_true', help='keep Django caches between iterations')
+    parser.add_argument('--sqlite', help='SQLite file to generate into / reuse (default: in memory)')
+    parser.add_argument('--regenerate', action='store_true', help='rebuild data even if --sqlite already has it')
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    parser.add_argument('--baseline', help='earlier JSON result to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p50 slowdown vs baseline')
+    args = parser.parse_args()
+
+    employees = SCALES.get(args.scale.lower()) or int(args.scale)
+    _setup_django(args.sqlite)
+
+    import django
+    from django.db import connection
+    from django.test import Client
+    from django.urls import get_resolver
+
+    from hackathon.auth import create_signed_session
+
+    data = _prepare_data(employees, args.seed, args.regenerate)
+    token, _ = create_signed_session(payload={'username': 'bench@example.com', 'display_name': 'Bench'})
+    headers = {'Authorization': f'Bearer {token}'}
+    client = Client(HTTP_HOST='localhost')
+
+    cases = _cases(employees)
+    if args.only:
+        cases = [case for case in cases if case.name in args.only]
+    results = {}
+    for case in cases:
+        results[case.name] = _measure(
+            client, case, repeat=args.repeat, warmup=args.warmup, warm_cache=args.warm_cache, headers=headers,
+        )
+
+    routes = _route_names(get_resolver().url_patterns)
+    covered = {case.route for case in _cases(employees)}
+    failures = {name: result['status'] for name, result in results.items()
+                if not all(map(_succeeded, result['status']))}
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'employees': employees,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'warm_cache': args.warm_cache,
+            'data': data,
+        },
+        'results': results,
+        'failures': failures,
+        'skipped': {name: reason for name, reason in SKIPPED.items() if name in routes},
+        'uncovered_routes': sorted(routes - covered - set(SKIPPED)),
+    }
+    if args.baseline:
+        with open(args.baseline) as fh:
+            report['regressions'] = _compare(results, json.load(fh), args.tolerance)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as fh:
+            fh.write(text + '\n')
+    else:
+        print(text)
+    if failures or report.get('regressions'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Time the headcount/attrition queries behind /api/reports/stats.
+
+By default a synthetic dataset is generated in an in-memory SQLite database
+and every query is timed before and after the report indexes migration
+(0003_report_indexes). ``--live`` instead times the configured database
+as-is, without writing to it.
+
+    python bench_report_stats.py --employees 50000 --repeat 5
+    python bench_report_stats.py --live
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+
+def _setup_django(live: bool) -> None:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if not live:
+        # Empty DB_NAME selects the in-memory SQLite fallback in settings.
+        os.environ['DB_NAME'] = ''
+    os.environ.setdefault('SECRET_KEY', 'bench-secret-key')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+
+    django.setup()
+
+
+def _seed(employees: int, seed: int) -> None:
+    from django.core.management import call_command
+
+    from hackathon import synthetic
+
+    # Stop before 0003 so the first round runs without the report indexes.
+    call_command('migrate', 'hackathon', '0002', verbosity=0)
+    synthetic.create_tables()
+    synthetic.generate(employees, seed=seed)
+
+
+def _queries() -> dict:
+    from django.db.models import CharField, PositiveIntegerField
+
+    from hackathon.models import EmpMaster
+    from hackathon.queries import current_ctc_field, current_ctc_title, headcount_breakdown, headcount_totals
+
+    return {
+        # What ReportsView ran before: two separate COUNT queries.
+        'totals_two_counts': lambda: (
+            EmpMaster.objects.count(),
+            EmpMaster.objects.exclude(end_date__isnull=True).count(),
+        ),
+        'totals_single_query': headcount_totals,
+        'breakdown_by_level': lambda: headcount_breakdown(
+            main_level=current_ctc_field('main_level', PositiveIntegerField()),
+            sub_level=current_ctc_field('sub_level', CharField()),
+        ),
+        'breakdown_by_title': lambda: headcount_breakdown(title=current_ctc_title()),
+    }
+
+
+def _time_all(repeat: int) -> dict:
+    results = {}
+    for name, run in _queries().items():
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            samples.append(time.perf_counter() - started)
+        results[name] = {
+            'median_ms': round(statistics.median(samples) * 1000, 3),
+            'min_ms': round(min(samples) * 1000, 3),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--employees', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--live', action='store_true', help='time the configured database without seeding')
+    args = parser.parse_args()
+
+    _setup_django(args.live)
+    from django.core.management import call_command
+    from django.db import connection
+
+    report = {'database': connection.vendor, 'repeat': args.repeat}
+    if args.live:
+        report['results'] = _time_all(args.repeat)
+    else:
+        _seed(args.employees, args.seed)
+        report['employees'] = args.employees
+        report['without_indexes'] = _time_all(args.repeat)
+        call_command('migrate', 'hackathon', '0003', verbosity=0)
+        report['with_indexes'] = _time_all(args.repeat)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
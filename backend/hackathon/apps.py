@@ -1,6 +1,17 @@
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class HackathonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hackathon'
+
+    def ready(self):
+        # Servers (backend/wsgi.py, backend/asgi.py) turn this on; management
+        # commands and tests load the index on first search instead.
+        if getattr(settings, 'SEARCH_INDEX_WARM', False):
+            from .search import warm_employee_index
+
+            threading.Thread(target=warm_employee_index, name='hackathon-search-warm', daemon=True).start()
@@ -1,17 +1,29 @@
+import asyncio
+import hashlib
+import http.client
 import json
 import os
-import urllib.error
+import threading
+import time
 import urllib.parse
-import urllib.request
+from collections import OrderedDict
 from datetime import timedelta
 
+from django.conf import settings
 from django.core import signing
 from django.utils import timezone
 
+from .http_client import PooledHttpClient
+
 
 SESSION_TTL = timedelta(days=7)
 OTP_CHALLENGE_TTL = timedelta(minutes=5)
 
+_FORM_HEADERS = {
+    'Content-Type': 'application/x-www-form-urlencoded',
+    'Accept': 'application/json',
+}
+
 
 class ExternalAuthError(RuntimeError):
     pass
@@ -24,32 +36,65 @@ def _require_env(name: str) -> str:
     return value
 
 
-def post_form_json(*, url: str, payload: dict[str, str], timeout: int = 15) -> dict:
-    headers = {
-        'Content-Type': 'application/x-www-form-urlencoded',
-        'Accept': 'application/json',
-    }
+_http_client: PooledHttpClient | None = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> PooledHttpClient:
+    """Process-wide keep-alive client used for all external auth calls."""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = PooledHttpClient(
+                    maxsize=getattr(settings, 'EXTERNAL_AUTH_POOL_SIZE', 10),
+                    connect_timeout=getattr(settings, 'EXTERNAL_AUTH_CONNECT_TIMEOUT', 5.0),
+                    read_timeout=getattr(settings, 'EXTERNAL_AUTH_READ_TIMEOUT', 15.0),
+                )
+    return _http_client
+
+
+def _parse_external_response(status: int, body: bytes) -> dict:
+    if status < 200 or status >= 300:
+        raise ExternalAuthError(f'External auth returned HTTP {status}')
+    try:
+        parsed = json.loads(body.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ExternalAuthError('External auth returned invalid JSON') from exc
+    if not isinstance(parsed, dict):
+        raise ExternalAuthError('External auth returned invalid response')
+    return parsed
+
+
+def post_form_json(*, url: str, payload: dict[str, str], timeout: float | None = None) -> dict:
+    """POST ``payload`` form-encoded and return the JSON object response.
 
+    ``timeout`` overrides the client's read timeout for this call.
+    """
     raw = urllib.parse.urlencode(payload).encode('utf-8')
-    req = urllib.request.Request(url, data=raw, method='POST', headers=headers)
+    try:
+        status, body = get_http_client().request(
+            'POST', url, body=raw, headers=_FORM_HEADERS, read_timeout=timeout
+        )
+    except ValueError as exc:
+        raise ExternalAuthError('Invalid external auth URL') from exc
+    except (OSError, http.client.HTTPException) as exc:
+        raise ExternalAuthError('Unable to reach external auth service') from exc
+    return _parse_external_response(status, body)
 
+
+async def apost_form_json(*, url: str, payload: dict[str, str], timeout: float | None = None) -> dict:
+    """Async ``post_form_json``: awaits the call instead of blocking a thread."""
+    raw = urllib.parse.urlencode(payload).encode('utf-8')
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            status = getattr(resp, 'status', None) or resp.getcode()
-            body = resp.read().decode('utf-8')
-            if status < 200 or status >= 300:
-                raise ExternalAuthError(f'External auth returned HTTP {status}')
-            try:
-                parsed = json.loads(body)
-            except json.JSONDecodeError as exc:
-                raise ExternalAuthError('External auth returned invalid JSON') from exc
-            if not isinstance(parsed, dict):
-                raise ExternalAuthError('External auth returned invalid response')
-            return parsed
-    except urllib.error.HTTPError as exc:
-        raise ExternalAuthError(f'External auth returned HTTP {exc.code}') from exc
-    except urllib.error.URLError as exc:
+        status, body = await get_http_client().arequest(
+            'POST', url, body=raw, headers=_FORM_HEADERS, read_timeout=timeout
+        )
+    except ValueError as exc:
+        raise ExternalAuthError('Invalid external auth URL') from exc
+    except (OSError, asyncio.TimeoutError, http.client.HTTPException) as exc:
         raise ExternalAuthError('Unable to reach external auth service') from exc
+    return _parse_external_response(status, body)
 
 
 def _is_success_response(payload: dict) -> bool:
@@ -78,7 +123,60 @@ def create_signed_session(*, payload: dict) -> tuple[str, timezone.datetime]:
     return token, expires_at
 
 
+class _VerifiedSessionCache:
+    """Bounded LRU of verified session payloads, keyed by token digest.
+
+    Entries expire together with the token itself, so a cached session is
+    never accepted past ``SESSION_TTL``.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> tuple[dict, float] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: bytes, payload: dict, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: bytes) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_session_cache = _VerifiedSessionCache(getattr(settings, 'SESSION_CACHE_SIZE', 10_000))
+
+
+def _token_expiry(token: str) -> float:
+    # signing.dumps() tokens look like "<payload>:<base62 timestamp>:<signature>".
+    timestamp = token.rsplit(':', 2)[-2]
+    return signing.b62_decode(timestamp) + SESSION_TTL.total_seconds()
+
+
 def load_signed_session(token: str) -> dict:
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    cached = _session_cache.get(key)
+    if cached is not None:
+        payload, expires_at = cached
+        if time.time() <= expires_at:
+            return dict(payload)
+        _session_cache.discard(key)
+        raise ExternalAuthError('Session expired')
+
     try:
         data = signing.loads(token, salt='hackathon.session', max_age=int(SESSION_TTL.total_seconds()))
     except signing.SignatureExpired as exc:
@@ -88,7 +186,9 @@ def load_signed_session(token: str) -> dict:
 
     if not isinstance(data, dict):
         raise ExternalAuthError('Invalid session token')
-    return data
+
+    _session_cache.put(key, data, _token_expiry(token))
+    return dict(data)
 
 
 def create_signed_otp_challenge(*, email: str, channel: str) -> tuple[str, timezone.datetime]:
@@ -0,0 +1,157 @@
+"""Run several GET requests to this API in-process and combine the results.
+
+Sub-requests go straight to the resolved view with the caller's session,
+skipping the middleware stack. By default they run one after another in a
+single transaction, so they all read the same snapshot of the data (on
+MySQL the transaction is REPEATABLE READ; Django otherwise uses READ
+COMMITTED). ``parallel`` runs them on a thread pool instead: faster when
+several sub-requests are slow, but each worker reads through its own
+connection, so there is no shared snapshot. Only synchronous views that
+return JSON can be batched; others get a 406 entry.
+"""
+import asyncio
+import contextvars
+import copy
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.http import HttpRequest, HttpResponse, QueryDict
+from django.urls import Resolver404, resolve
+
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+MAX_REQUESTS = 20
+
+# Headers of the batch request that must not leak into sub-requests.
+_DROPPED_META = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE', 'CONTENT_LENGTH', 'CONTENT_TYPE')
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+class BatchError(ValueError):
+    pass
+
+
+def parse_requests(payload) -> list[tuple[str, str]]:
+    """Validate the ``requests`` list; return ``(id, path)`` pairs."""
+    requests = payload.get('requests') if isinstance(payload, dict) else None
+    if not isinstance(requests, list) or not requests:
+        raise BatchError('requests must be a non-empty list.')
+    if len(requests) > MAX_REQUESTS:
+        raise BatchError(f'At most {MAX_REQUESTS} requests per batch.')
+    parsed, seen = [], set()
+    for index, item in enumerate(requests):
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str) or not item['path'].startswith('/'):
+            raise BatchError(f'requests[{index}] needs a path starting with "/".')
+        if (item.get('method') or 'GET').upper() != 'GET':
+            raise BatchError(f'requests[{index}]: only GET can be batched.')
+        request_id = str(item.get('id', index))
+        if request_id in seen:
+            raise BatchError(f'Duplicate request id: {request_id}')
+        seen.add(request_id)
+        parsed.append((request_id, item['path']))
+    return parsed
+
+
+def _error(status: int, message: str) -> tuple[int, bytes]:
+    return status, dumps({'error': message})
+
+
+def _call(request: HttpRequest, target: str, batch_route: str) -> tuple[int, bytes]:
+    parts = urlsplit(target)
+    try:
+        match = resolve(parts.path)
+    except Resolver404:
+        return _error(404, f'No route for {parts.path}')
+    if match.url_name == batch_route:
+        return _error(400, 'Batches cannot be nested.')
+    if iscoroutinefunction(match.func):
+        # Async views (e.g. the event stream) need an event loop of their own.
+        return _error(406, f'{parts.path} cannot be batched.')
+
+    sub = copy.copy(request)
+    sub.method = 'GET'
+    sub.path = sub.path_info = parts.path
+    sub.GET = QueryDict(parts.query)
+    sub.META = {key: value for key, value in request.META.items() if key not in _DROPPED_META}
+    sub.META.update(REQUEST_METHOD='GET', PATH_INFO=parts.path, QUERY_STRING=parts.query)
+    # ``headers`` is cached from the batch request's META.
+    sub.__dict__.pop('headers', None)
+    sub.resolver_match = match
+    try:
+        response = match.func(sub, *match.args, **match.kwargs)
+    except Exception:
+        # Like Django's own 500 page, keep the details in the log.
+        logger.exception('Batched request to %s failed', parts.path)
+        return _error(500, 'Internal server error.')
+
+    if asyncio.iscoroutine(response):
+        response.close()
+        return _error(406, f'{parts.path} cannot be batched.')
+    if response.streaming or 'application/json' not in response.get('Content-Type', ''):
+        _discard(response)
+        return _error(406, f'{parts.path} does not return JSON.')
+    return response.status_code, response.content or b'null'
+
+
+def _discard(response: HttpResponse) -> None:
+    # Not response.close(): that also sends request_finished, which closes
+    # the database connection in the middle of the batch.
+    for closer in response._resource_closers:
+        closer()
+    response._resource_closers.clear()
+
+
+@contextmanager
+def _read_snapshot():
+    if connection.vendor == 'mysql' and not connection.in_atomic_block:
+        with connection.cursor() as cursor:
+            # Applies to the next transaction only.
+            cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+    with transaction.atomic():
+        yield
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = getattr(settings, 'BATCH_WORKERS', 4)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hackathon-batch')
+        return _executor
+
+
+def _call_in_worker(request: HttpRequest, target: str, batch_route: str) -> tuple[int, bytes]:
+    # Pool threads keep their connections between batches; drop broken or
+    # expired ones like Django does at request boundaries.
+    close_old_connections()
+    return _call(request, target, batch_route)
+
+
+def run(request: HttpRequest, requests: list[tuple[str, str]], *, parallel: bool = False) -> HttpResponse:
+    batch_route = request.resolver_match.url_name if request.resolver_match else None
+    if parallel and len(requests) > 1:
+        # copy_context keeps per-request state (e.g. the metrics timer).
+        futures = [
+            _pool().submit(contextvars.copy_context().run, _call_in_worker, request, target, batch_route)
+            for _, target in requests
+        ]
+        results = [future.result() for future in futures]
+    else:
+        with _read_snapshot():
+            results = [_call(request, target, batch_route) for _, target in requests]
+
+    # Sub-responses are already encoded JSON; splice them in as they are.
+    parts = []
+    for (request_id, _), (status, body) in zip(requests, results):
+        parts.append(b'{"id":' + dumps(request_id) + b',"status":' + str(status).encode() + b',"body":' + body + b'}')
+    return HttpResponse(b'{"responses":[' + b','.join(parts) + b']}', content_type='application/json')
@@ -0,0 +1,128 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+
+from . import replicas
+from .models import DataVersion
+
+STATS_KEY = 'hackathon:reports:stats'
+BREAKDOWNS_KEY = 'hackathon:reports:breakdowns'
+EMPLOYEE_KEY = 'hackathon:employee'
+
+_counters: Counter = Counter()
+_counters_lock = threading.Lock()
+
+
+def _cache():
+    return caches[getattr(settings, 'HACKATHON_CACHE_ALIAS', 'default')]
+
+
+def _count(key: str, outcome: str) -> None:
+    # Profiles are counted together, not per employee.
+    if key.startswith(f'{EMPLOYEE_KEY}:'):
+        key = EMPLOYEE_KEY
+    with _counters_lock:
+        _counters[(key, outcome)] += 1
+
+
+def get_or_build(
+    key: str, build: Callable[[], Any], *, version: str = '', timeout: int | None = None,
+) -> tuple[Any, bool]:
+    """Return ``(value, hit)`` for ``key``, building and storing it on a miss.
+
+    ``version`` is the ``data_etag`` of the tables ``build`` reads. The entry
+    is filed under it, so once a write commits every worker looks for a new
+    entry; nothing has to be deleted from per-process caches. Old entries
+    expire after ``timeout`` (default ``settings.STATS_CACHE_TTL``).
+    """
+    cache = _cache()
+    stored_key = f'{key}:{version}' if version else key
+    value = cache.get(stored_key)
+    if value is not None:
+        _count(key, 'hit')
+        return value, True
+
+    _count(key, 'miss')
+    # Cached for every client: never from a replica that may be behind.
+    with replicas.primary():
+        value = build()
+    if timeout is None:
+        timeout = getattr(settings, 'STATS_CACHE_TTL', 300)
+    cache.set(stored_key, value, timeout)
+    return value, False
+
+
+def employee_key(emp_id: int) -> str:
+    return f'{EMPLOYEE_KEY}:{emp_id}'
+
+
+def data_versions(*models) -> list[int]:
+    """Current write counter of each model's table (0 before its first write).
+
+    The counters live in the database, so every worker sees a write as soon
+    as it commits.
+    """
+    tables = [model._meta.db_table for model in models]
+    found = dict(DataVersion.objects.filter(table__in=tables).values_list('table', 'version'))
+    return [found.get(table, 0) for table in tables]
+
+
+def bump_data_version(*models) -> None:
+    """Record a write to each model's table, changing its data version.
+
+    Call it inside the transaction that made the write, like
+    ``changes.record``: the new version commits (or rolls back) with it.
+    """
+    tables = [model._meta.db_table for model in models]
+    with transaction.atomic(savepoint=False):
+        if DataVersion.objects.filter(table__in=tables).update(version=F('version') + 1) == len(tables):
+            return
+        # A table without a counter row yet (its migration seeds the usual ones).
+        missing = set(tables) - set(DataVersion.objects.filter(table__in=tables).values_list('table', flat=True))
+        DataVersion.objects.bulk_create([DataVersion(table=table) for table in missing], ignore_conflicts=True)
+        DataVersion.objects.filter(table__in=missing).update(version=F('version') + 1)
+
+
+def _age_bucket() -> int:
+    # The emp_* tables are shared: writes that bypass this app never bump a
+    # version, so versions also expire every DATA_VERSION_MAX_AGE seconds.
+    # Buckets start at the same instants in every worker.
+    max_age = getattr(settings, 'DATA_VERSION_MAX_AGE', 300)
+    return int(time.time() // max_age) if max_age > 0 else 0
+
+
+def data_etag(*models, extra: str = '') -> str:
+    """ETag for a response built only from ``models`` (plus ``extra``).
+
+    It changes on every write through this app and, for writes made
+    elsewhere, at least every ``DATA_VERSION_MAX_AGE`` seconds.
+    """
+    versions = ':'.join(str(v) for v in data_versions(*models))
+    return _digest(f'{versions}|{_age_bucket()}|{extra}')
+
+
+def extend_etag(etag: str, extra: str) -> str:
+    """ETag for a response that depends on ``etag``'s data and on ``extra``."""
+    return _digest(f'{etag}|{extra}')
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+
+
+def cache_counters() -> dict[str, dict[str, int]]:
+    """Hit/miss counts per cache key since process start (``/metrics``)."""
+    with _counters_lock:
+        snapshot = dict(_counters)
+    result: dict[str, dict[str, int]] = {}
+    for (key, outcome), count in snapshot.items():
+        result.setdefault(key, {'hit': 0, 'miss': 0})[outcome] = count
+    return result
@@ -0,0 +1,119 @@
+"""Append-only log of writes, for clients that sync by delta.
+
+Writers call ``record`` in the same transaction as the write. Each entry
+names a row of a tracked table (``TRACKED``) and gets the next sequence
+number from a counter row that stays locked until the transaction
+commits, so entries become visible in sequence order and a reader that
+has seen ``seq`` never later finds a smaller one.
+
+``changes_since`` collapses the entries after ``since`` to one per row and
+reads the rows as they are now: a row that still exists is an upsert, a
+row that is gone is a delete. Replaying a delta is therefore idempotent,
+and its cost depends on the number of changed rows, not the table size.
+"""
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import ChangeLogEntry, EmpComplianceTracker, EmpCtcInfo, EmpMaster, IdAllocation
+from .serialization import tabulate
+
+# Table -> (model, fields sent for an upsert). Compliance rows leave out
+# doc_url, like the compliance list.
+TRACKED = {
+    model._meta.db_table: (model, fields)
+    for model, fields in (
+        (EmpMaster, ('emp_id', 'first_name', 'middle_name', 'last_name', 'start_date', 'end_date')),
+        (EmpCtcInfo, (
+            'emp_ctc_id', 'emp_id', 'int_title', 'ext_title', 'main_level', 'sub_level',
+            'start_of_ctc', 'end_of_ctc', 'ctc_amt',
+        )),
+        (EmpComplianceTracker, ('emp_compliance_tracker_id', 'emp_id', 'comp_type', 'status')),
+    )
+}
+
+SEQ_COUNTER = 'hackathon_change_log.seq'
+
+
+def _reserve(count: int) -> int:
+    """Reserve ``count`` sequence numbers; return the first."""
+    # The UPDATE keeps the counter row locked until the caller commits.
+    if IdAllocation.objects.filter(name=SEQ_COUNTER).update(next_id=F('next_id') + count):
+        return IdAllocation.objects.values_list('next_id', flat=True).get(name=SEQ_COUNTER) - count
+    try:
+        # Savepoint: losing the race below must not break the caller's transaction.
+        with transaction.atomic():
+            first = current_seq() + 1
+            IdAllocation.objects.create(name=SEQ_COUNTER, next_id=first + count)
+            return first
+    except IntegrityError:
+        # Another writer created the counter first.
+        IdAllocation.objects.filter(name=SEQ_COUNTER).update(next_id=F('next_id') + count)
+        return IdAllocation.objects.values_list('next_id', flat=True).get(name=SEQ_COUNTER) - count
+
+
+def record(writes: Mapping[type, Iterable[int]]) -> int | None:
+    """Log writes to rows of tracked models (``{model: row_ids}``); call
+    inside the transaction that made them. Returns the last ``seq`` used."""
+    entries = []
+    for model, row_ids in writes.items():
+        table = model._meta.db_table
+        if table not in TRACKED:
+            raise ValueError(f'{table} is not tracked by the change log.')
+        entries.extend((table, row_id) for row_id in dict.fromkeys(row_ids))
+    if not entries:
+        return None
+    # No savepoint: a failure here fails the caller's write with it.
+    with transaction.atomic(savepoint=False):
+        first = _reserve(len(entries))
+        ChangeLogEntry.objects.bulk_create(
+            ChangeLogEntry(seq=seq, table=table, row_id=row_id) for seq, (table, row_id) in enumerate(entries, start=first)
+        )
+    return first + len(entries) - 1
+
+
+def current_seq() -> int:
+    last = ChangeLogEntry.objects.order_by('-seq').values_list('seq', flat=True).first()
+    return last or 0
+
+
+@dataclass
+class Delta:
+    seq: int
+    has_more: bool
+    upserts: dict[str, object] = field(default_factory=dict)
+    deletes: dict[str, list[int]] = field(default_factory=dict)
+
+
+def changes_since(since: int, *, limit: int, fmt: str) -> Delta:
+    """Rows changed by the first ``limit`` entries after ``since``.
+
+    ``Delta.seq`` is the last entry covered; pass it as the next ``since``.
+    Upserts are shaped by ``tabulate`` in ``fmt``.
+    """
+    entries = list(
+        ChangeLogEntry.objects.filter(seq__gt=since).order_by('seq').values_list('seq', 'table', 'row_id')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    if not entries:
+        return Delta(seq=since, has_more=False)
+
+    touched: dict[str, set[int]] = {}
+    for _, table, row_id in entries:
+        touched.setdefault(table, set()).add(row_id)
+
+    delta = Delta(seq=entries[-1][0], has_more=has_more)
+    for table, row_ids in touched.items():
+        model, fields = TRACKED[table]
+        pk = model._meta.pk.attname
+        rows = list(model.objects.filter(pk__in=row_ids).order_by(pk).values_list(*fields))
+        found = {row[0] for row in rows}
+        if rows:
+            delta.upserts[table] = tabulate(fields, rows, fmt)
+        missing = sorted(row_ids - found)
+        if missing:
+            delta.deletes[table] = missing
+    return delta
@@ -0,0 +1,131 @@
+"""Content-negotiated response compression.
+
+gzip is always available; brotli and zstd are offered when the ``brotli``
+and ``zstandard`` packages are installed. ``negotiate`` picks the coding
+with the highest ``Accept-Encoding`` weight, preferring zstd, then brotli,
+then gzip on ties. Streamed bodies are compressed chunk by chunk and
+flushed after every chunk, so clients still receive data as it is
+produced.
+"""
+import re
+import zlib
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+# Server preference, best first; only codings whose package is installed.
+AVAILABLE = tuple(
+    name for name, module in (('zstd', zstandard), ('br', brotli), ('gzip', zlib)) if module is not None
+)
+
+# Precompressed file suffix per coding (written by the precompress plugin in frontend/vite.config.js).
+FILE_SUFFIXES = {'zstd': '.zst', 'br': '.br', 'gzip': '.gz'}
+
+_COMPRESSIBLE_RE = re.compile(
+    r'^(text/|application/(json|javascript|xml|[\w.+-]+\+(json|xml))|image/svg\+xml)'
+)
+
+
+def compressible(content_type: str) -> bool:
+    # Event streams stay identity-coded: proxies and browsers buffer
+    # compressed streams, which would hold events back.
+    content_type = content_type or ''
+    return bool(_COMPRESSIBLE_RE.match(content_type)) and not content_type.startswith('text/event-stream')
+
+
+def _accepted(header: str) -> dict[str, float]:
+    weights = {}
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        match = re.search(r'q\s*=\s*([0-9.]+)', params)
+        if match:
+            try:
+                q = float(match.group(1))
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    return weights
+
+
+def negotiate(accept_encoding: str, offered: tuple[str, ...] | None = None) -> str | None:
+    """Return the coding to use for ``accept_encoding``, or None for identity."""
+    weights = _accepted(accept_encoding or '')
+    enabled = getattr(settings, 'COMPRESS_ENCODINGS', AVAILABLE)
+    best, best_q = None, 0.0
+    for name in offered if offered is not None else AVAILABLE:
+        if name not in enabled:
+            continue
+        q = weights.get(name, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class _Compressor:
+    """Incremental compressor with one interface for every coding."""
+
+    def __init__(self, coding: str) -> None:
+        self.coding = coding
+        if coding == 'gzip':
+            self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        elif coding == 'br':
+            self._obj = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._obj = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes, *, flush: bool = False) -> bytes:
+        if self.coding == 'br':
+            out = self._obj.process(data)
+            return out + self._obj.flush() if flush else out
+        out = self._obj.compress(data)
+        if flush:
+            if self.coding == 'gzip':
+                out += self._obj.flush(zlib.Z_SYNC_FLUSH)
+            else:
+                out += self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return out
+
+    def finish(self) -> bytes:
+        return self._obj.finish() if self.coding == 'br' else self._obj.flush()
+
+
+def compress(data: bytes, coding: str) -> bytes:
+    compressor = _Compressor(coding)
+    return compressor.compress(data) + compressor.finish()
+
+
+def compress_stream(chunks, coding: str):
+    compressor = _Compressor(coding)
+    for chunk in chunks:
+        if chunk:
+            out = compressor.compress(chunk, flush=True)
+            if out:
+                yield out
+    yield compressor.finish()
+
+
+async def acompress_stream(chunks, coding: str):
+    compressor = _Compressor(coding)
+    async for chunk in chunks:
+        if chunk:
+            out = compressor.compress(chunk, flush=True)
+            if out:
+                yield out
+    yield compressor.finish()
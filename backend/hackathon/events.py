@@ -0,0 +1,123 @@
+"""Live change events for the dashboard, sent as server-sent events.
+
+Writers ``publish`` a small event (type, change-log ``seq``, affected IDs)
+after their transaction commits. One in-process ``Broadcaster`` encodes
+it once and hands the same frame to every subscriber's queue on the
+subscriber's event loop; it never blocks and never waits for a client.
+
+Each subscriber queue holds at most ``EVENTS_QUEUE_SIZE`` frames. A client
+that falls that far behind (slow network, stalled tab) has its backlog
+dropped and gets a single ``resync`` event instead, telling it to catch up
+through ``/api/changes`` from the last ``seq`` it applied. Reconnecting
+clients (``Last-Event-ID``) get the same event.
+
+Subscribers are coroutines on the ASGI event loop, so an idle connection
+costs a queue and a suspended task, not a thread. Events only reach
+clients connected to the process that made the write.
+"""
+import asyncio
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+from .serialization import dumps
+
+EMPLOYEES_ADDED = 'employees.added'
+EXIT_INITIATED = 'employees.exit_initiated'
+RESYNC = 'resync'
+
+# Events about more rows than this carry only the count.
+MAX_IDS_PER_EVENT = 50
+
+
+def frame(event: str, data: dict, *, event_id: int | None = None) -> bytes:
+    lines = [b'event: ' + event.encode()]
+    if event_id is not None:
+        lines.append(b'id: ' + str(event_id).encode())
+    lines.append(b'data: ' + dumps(data))
+    return b'\n'.join(lines) + b'\n\n'
+
+
+def resync_frame(since: int | None) -> bytes:
+    return frame(RESYNC, {'since': since})
+
+
+class Subscriber:
+    """One client's bounded queue of encoded frames, bound to its event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int) -> None:
+        self.loop = loop
+        # seq of the last frame handed to the client.
+        self.delivered_seq: int | None = None
+        self._queue: asyncio.Queue[tuple[bytes, int | None]] = asyncio.Queue(maxsize)
+        self._lagging = False
+
+    def _offer(self, data: bytes, seq: int | None) -> None:
+        # Runs on self.loop.
+        if self._lagging:
+            return
+        try:
+            self._queue.put_nowait((data, seq))
+        except asyncio.QueueFull:
+            # Replace the backlog with one resync from what the client has.
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait((resync_frame(self.delivered_seq), None))
+            self._lagging = True
+
+    async def get(self, timeout: float) -> bytes | None:
+        """Next frame, or None if nothing arrived within ``timeout`` seconds."""
+        try:
+            data, seq = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if seq is not None:
+            self.delivered_seq = seq
+        if self._queue.empty():
+            self._lagging = False
+        return data
+
+
+class Broadcaster:
+    def __init__(self) -> None:
+        self._subscribers: set[Subscriber] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Subscriber:
+        """Register a subscriber for the running event loop."""
+        subscriber = Subscriber(asyncio.get_running_loop(), getattr(settings, 'EVENTS_QUEUE_SIZE', 100))
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def send(self, event: str, data: dict, *, seq: int | None = None) -> None:
+        """Queue an event for every subscriber; safe from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        encoded = frame(event, data, event_id=seq)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber._offer, encoded, seq)
+            except RuntimeError:
+                # Its loop has shut down.
+                self.unsubscribe(subscriber)
+
+
+broadcaster = Broadcaster()
+
+
+def publish(event: str, *, seq: int | None, ids: list[int] | None = None, **data) -> None:
+    """Send ``event`` once the current transaction commits (now if none)."""
+    payload = {'seq': seq, **data}
+    if ids is not None:
+        payload['count'] = len(ids)
+        if len(ids) <= MAX_IDS_PER_EVENT:
+            payload['ids'] = ids
+    transaction.on_commit(lambda: broadcaster.send(event, payload, seq=seq))
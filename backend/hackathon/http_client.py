@@ -0,0 +1,426 @@
+import asyncio
+import http.client
+import queue
+import select
+import ssl
+import threading
+import time
+import urllib.parse
+import weakref
+from dataclasses import dataclass
+
+# Failures that mean an idle keep-alive connection was closed by the server.
+# The server may have closed it after reading the request, so only requests
+# that are safe to repeat are retried (once, on a fresh connection); idle
+# connections the server has already closed are dropped before use instead.
+_STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'})
+# Responses that never carry a body (RFC 9112 section 6.3), besides any answer to HEAD.
+_BODYLESS_STATUSES = frozenset({'101', '204', '304'})
+
+
+def _retryable(method: str, reused: bool) -> bool:
+    return reused and method.upper() in IDEMPOTENT_METHODS
+
+
+def _dropped(conn: http.client.HTTPConnection) -> bool:
+    """True if the server closed (or wrote to) an idle connection."""
+    if conn.sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+class PoolTimeout(OSError):
+    pass
+
+
+@dataclass
+class EndpointStats:
+    count: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'avg_ms': round(self.total_seconds / self.count * 1000, 3) if self.count else 0.0,
+            'max_ms': round(self.max_seconds * 1000, 3),
+            'total_seconds': round(self.total_seconds, 6),
+        }
+
+
+class ConnectionPool:
+    """Keep-alive connections to a single ``scheme://host:port``.
+
+    At most ``maxsize`` connections exist at once; callers wait up to
+    ``connect_timeout`` for one to free up before ``PoolTimeout`` is raised.
+    """
+
+    def __init__(
+        self,
+        scheme: str,
+        host: str,
+        port: int | None,
+        *,
+        maxsize: int,
+        connect_timeout: float,
+        read_timeout: float,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._ssl_context = ssl_context
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(maxsize)
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        if self.scheme == 'https':
+            conn = http.client.HTTPSConnection(
+                self.host,
+                self.port,
+                timeout=self.connect_timeout,
+                context=self._ssl_context or ssl.create_default_context(),
+            )
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.connect_timeout)
+        conn.connect()
+        conn.sock.settimeout(self.read_timeout)
+        return conn
+
+    def _checkout(self) -> tuple[http.client.HTTPConnection, bool]:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._new_connection(), False
+            if not _dropped(conn):
+                return conn, True
+            conn.close()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        read_timeout: float | None = None,
+    ) -> tuple[int, bytes]:
+        if not self._slots.acquire(timeout=self.connect_timeout):
+            raise PoolTimeout(f'No free connection to {self.host} within {self.connect_timeout}s')
+        try:
+            conn, reused = self._checkout()
+            try:
+                return self._send(conn, method, path, body, headers, read_timeout)
+            except _STALE_ERRORS:
+                conn.close()
+                if not _retryable(method, reused):
+                    raise
+            conn = self._new_connection()
+            return self._send(conn, method, path, body, headers, read_timeout)
+        finally:
+            self._slots.release()
+
+    def _send(self, conn, method, path, body, headers, read_timeout) -> tuple[int, bytes]:
+        try:
+            if conn.sock is None:
+                conn.connect()
+            conn.sock.settimeout(read_timeout or self.read_timeout)
+            conn.request(method, path, body=body, headers=headers or {})
+            resp = conn.getresponse()
+            data = resp.read()
+        except BaseException:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            self._idle.put(conn)
+        return resp.status, data
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class AsyncConnectionPool:
+    """asyncio counterpart of ``ConnectionPool`` speaking minimal HTTP/1.1.
+
+    Bound to the event loop it is first used on; ``AsyncPooledHttpClient``
+    keeps one set of pools per loop.
+    """
+
+    def __init__(
+        self,
+        scheme: str,
+        host: str,
+        port: int | None,
+        *,
+        maxsize: int,
+        connect_timeout: float,
+        read_timeout: float,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        self.scheme = scheme
+        self.host = host
+        self.port = port or (443 if scheme == 'https' else 80)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._ssl_context = ssl_context
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots = asyncio.Semaphore(maxsize)
+        default_port = 443 if scheme == 'https' else 80
+        self._host_header = host if self.port == default_port else f'{host}:{self.port}'
+
+    async def _new_connection(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        ssl_arg = None
+        if self.scheme == 'https':
+            ssl_arg = self._ssl_context or ssl.create_default_context()
+        return await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=ssl_arg),
+            timeout=self.connect_timeout,
+        )
+
+    async def _checkout(self) -> tuple[tuple[asyncio.StreamReader, asyncio.StreamWriter], bool]:
+        while self._idle:
+            reader, writer = self._idle.pop()
+            # The server closed it while it sat idle.
+            if reader.at_eof() or writer.is_closing():
+                writer.close()
+                continue
+            return (reader, writer), True
+        return await self._new_connection(), False
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        read_timeout: float | None = None,
+    ) -> tuple[int, bytes]:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.connect_timeout)
+        except asyncio.TimeoutError as exc:
+            raise PoolTimeout(f'No free connection to {self.host} within {self.connect_timeout}s') from exc
+        try:
+            conn, reused = await self._checkout()
+            try:
+                return await self._send(conn, method, path, body, headers, read_timeout)
+            except (*_STALE_ERRORS, asyncio.IncompleteReadError):
+                if not _retryable(method, reused):
+                    raise
+            conn = await self._new_connection()
+            return await self._send(conn, method, path, body, headers, read_timeout)
+        finally:
+            self._slots.release()
+
+    async def _send(self, conn, method, path, body, headers, read_timeout) -> tuple[int, bytes]:
+        reader, writer = conn
+        try:
+            status, keep_alive, data = await asyncio.wait_for(
+                self._exchange(reader, writer, method, path, body or b'', headers or {}),
+                timeout=read_timeout or self.read_timeout,
+            )
+        except BaseException:
+            writer.close()
+            raise
+        if keep_alive:
+            self._idle.append(conn)
+        else:
+            writer.close()
+        return status, data
+
+    async def _exchange(self, reader, writer, method, path, body, headers) -> tuple[int, bool, bytes]:
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self._host_header}', f'Content-Length: {len(body)}']
+        lines.extend(f'{name}: {value}' for name, value in headers.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+        while True:
+            version, status, response_headers = await self._read_head(reader)
+            # Interim responses (100 Continue, 103 Early Hints) precede the real one.
+            if not status.startswith('1') or status == '101':
+                break
+
+        # After 101 the connection speaks another protocol; never reuse it.
+        keep_alive = (
+            version == 'HTTP/1.1' and status != '101'
+            and response_headers.get('connection', '').lower() != 'close'
+        )
+        if method.upper() == 'HEAD' or status in _BODYLESS_STATUSES:
+            # No body follows, whatever Content-Length or Transfer-Encoding say.
+            data = b''
+        elif 'chunked' in response_headers.get('transfer-encoding', '').lower():
+            data = await self._read_chunked(reader)
+        elif 'content-length' in response_headers:
+            length = response_headers['content-length']
+            if not length.isdigit():
+                raise http.client.HTTPException(f'Invalid Content-Length: {length}')
+            data = await reader.readexactly(int(length))
+        else:
+            # The body runs until the server closes the connection.
+            data = await reader.read()
+            keep_alive = False
+        return int(status), keep_alive, data
+
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader) -> tuple[str, str, dict[str, str]]:
+        """Read a status line and headers; return ``(version, status, headers)``."""
+        status_line = await reader.readline()
+        if not status_line:
+            raise http.client.RemoteDisconnected('Remote end closed connection without response')
+        version, status, _ = (status_line.decode('latin-1').rstrip('\r\n') + '  ').split(' ', 2)
+        if not status.isdigit():
+            raise http.client.BadStatusLine(status_line.decode('latin-1'))
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return version, status, headers
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        parts = []
+        while True:
+            size = int((await reader.readline()).split(b';', 1)[0].strip() or b'0', 16)
+            if size == 0:
+                # Trailers end with an empty line.
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(parts)
+            parts.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+
+def _split_url(url: str) -> tuple[tuple[str, str, int | None], str, str]:
+    """Return ``((scheme, host, port), request path, endpoint label)`` for ``url``."""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in {'http', 'https'} or not parts.hostname:
+        raise ValueError(f'Unsupported URL: {url}')
+    path = parts.path or '/'
+    endpoint = f'{parts.scheme}://{parts.netloc}{path}'
+    if parts.query:
+        path = f'{path}?{parts.query}'
+    return (parts.scheme, parts.hostname, parts.port), path, endpoint
+
+
+class PooledHttpClient:
+    """Connection pools per host plus per-endpoint latency counters.
+
+    ``request`` uses blocking keep-alive pools shared by all threads;
+    ``arequest`` uses asyncio pools, one set per running event loop.
+    """
+
+    def __init__(self, *, maxsize: int = 10, connect_timeout: float = 5.0, read_timeout: float = 15.0) -> None:
+        self.maxsize = maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._pools: dict[tuple[str, str, int | None], ConnectionPool] = {}
+        self._loop_pools: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._stats: dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, key: tuple[str, str, int | None]) -> ConnectionPool:
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    pool = self._pools[key] = ConnectionPool(
+                        *key,
+                        maxsize=self.maxsize,
+                        connect_timeout=self.connect_timeout,
+                        read_timeout=self.read_timeout,
+                    )
+        return pool
+
+    def _async_pool(self, key: tuple[str, str, int | None]) -> AsyncConnectionPool:
+        # Only touched from the loop's own thread, so no lock is needed.
+        pools = self._loop_pools.setdefault(asyncio.get_running_loop(), {})
+        pool = pools.get(key)
+        if pool is None:
+            pool = pools[key] = AsyncConnectionPool(
+                *key,
+                maxsize=self.maxsize,
+                connect_timeout=self.connect_timeout,
+                read_timeout=self.read_timeout,
+            )
+        return pool
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        read_timeout: float | None = None,
+    ) -> tuple[int, bytes]:
+        key, path, endpoint = _split_url(url)
+        pool = self._pool(key)
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = pool.request(method, path, body=body, headers=headers, read_timeout=read_timeout)
+            failed = False
+            return result
+        finally:
+            self._record(endpoint, time.perf_counter() - started, failed)
+
+    async def arequest(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        read_timeout: float | None = None,
+    ) -> tuple[int, bytes]:
+        key, path, endpoint = _split_url(url)
+        pool = self._async_pool(key)
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await pool.request(method, path, body=body, headers=headers, read_timeout=read_timeout)
+            failed = False
+            return result
+        finally:
+            self._record(endpoint, time.perf_counter() - started, failed)
+
+    def _record(self, endpoint: str, elapsed: float, failed: bool) -> None:
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                stats = self._stats[endpoint] = EndpointStats()
+            stats.count += 1
+            stats.errors += failed
+            stats.total_seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+
+    def metrics(self) -> dict[str, dict]:
+        with self._lock:
+            return {endpoint: stats.as_dict() for endpoint, stats in self._stats.items()}
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
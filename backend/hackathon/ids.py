@@ -0,0 +1,96 @@
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from .models import EmpBankInfo, EmpCtcInfo, EmpMaster, EmpRegInfo, IdAllocation
+
+
+class IdAllocator:
+    """Hi/lo allocator for primary keys of tables without auto-increment.
+
+    Blocks of ``block_size`` IDs are reserved in the ``IdAllocation`` table
+    under a row lock and then handed out from memory, so concurrent workers
+    never get the same ID and most inserts need no extra query. A block
+    always starts above the table's current ``MAX(pk)``, which keeps rows
+    inserted outside the allocator from colliding. Unused IDs of a block
+    are lost when the process exits.
+    """
+
+    def __init__(self, name: str, model, *, block_size: int) -> None:
+        self.name = name
+        self.model = model
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self, count: int) -> int:
+        """Reserve ``count`` consecutive IDs in the database; return the first."""
+        pk = self.model._meta.pk.attname
+        for attempt in range(2):
+            try:
+                with transaction.atomic():
+                    row = IdAllocation.objects.select_for_update().filter(name=self.name).first()
+                    floor = (self.model.objects.aggregate(m=Max(pk))['m'] or 0) + 1
+                    if row is None:
+                        row = IdAllocation.objects.create(name=self.name, next_id=floor + count)
+                        return floor
+                    start = max(row.next_id, floor)
+                    row.next_id = start + count
+                    row.save(update_fields=['next_id'])
+                    return start
+            except IntegrityError:
+                # Another worker created the row first; lock it on the retry.
+                if attempt:
+                    raise
+        raise AssertionError('unreachable')
+
+    def next_id(self) -> int:
+        with self._lock:
+            if self._next >= self._end:
+                self._next = self._reserve(self.block_size)
+                self._end = self._next + self.block_size
+            value = self._next
+            self._next += 1
+            return value
+
+    def allocate(self, count: int) -> range:
+        """Return ``count`` IDs; large requests get one dedicated reservation."""
+        if count <= 0:
+            return range(0)
+        with self._lock:
+            if self._end - self._next >= count:
+                start = self._next
+                self._next += count
+                return range(start, start + count)
+        start = self._reserve(count)
+        return range(start, start + count)
+
+    def reset(self) -> None:
+        """Forget the in-memory block (e.g. after the table was truncated)."""
+        with self._lock:
+            self._next = self._end = 0
+
+
+emp_id_allocator = IdAllocator(
+    'emp_master.emp_id',
+    EmpMaster,
+    block_size=getattr(settings, 'ID_BLOCK_SIZE', 20),
+)
+emp_ctc_id_allocator = IdAllocator(
+    'emp_ctc_info.emp_ctc_id',
+    EmpCtcInfo,
+    block_size=getattr(settings, 'ID_BLOCK_SIZE', 20),
+)
+emp_reg_info_id_allocator = IdAllocator(
+    'emp_reg_info.emp_reg_info_id',
+    EmpRegInfo,
+    block_size=getattr(settings, 'ID_BLOCK_SIZE', 20),
+)
+emp_bank_id_allocator = IdAllocator(
+    'emp_bank_info.emp_bank_id',
+    EmpBankInfo,
+    block_size=getattr(settings, 'ID_BLOCK_SIZE', 20),
+)
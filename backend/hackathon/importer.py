@@ -0,0 +1,221 @@
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.db import connection, transaction
+from django.utils.dateparse import parse_date
+
+from . import changes
+from .caching import bump_data_version
+from .ids import emp_bank_id_allocator, emp_ctc_id_allocator, emp_id_allocator, emp_reg_info_id_allocator
+from .models import EmpBankInfo, EmpCtcInfo, EmpMaster, EmpRegInfo
+
+# Rows written per INSERT statement.
+BATCH_SIZE = 1000
+# Upper bound on rows accepted by one import request.
+MAX_ROWS = 50_000
+
+# Optional per-employee sections. In JSON they are nested objects under the
+# section name; in CSV the same field names appear as flat columns.
+CTC_FIELDS = ('int_title', 'ext_title', 'main_level', 'sub_level', 'start_of_ctc', 'end_of_ctc', 'ctc_amt')
+REG_FIELDS = ('pan', 'aadhaar', 'uan_epf_acctno', 'esi')
+BANK_FIELDS = ('bank_acct_no', 'ifsc_code', 'branch_name', 'bank_name')
+
+
+class ImportTooLarge(ValueError):
+    pass
+
+
+@dataclass
+class _ValidRow:
+    master: dict
+    ctc: dict | None = None
+    reg: dict | None = None
+    bank: dict | None = None
+
+
+@dataclass
+class ImportResult:
+    received: int = 0
+    imported: int = 0
+    errors: list[dict] = field(default_factory=list)
+    employees: list[EmpMaster] = field(default_factory=list)
+    # Change-log seq of the import (see hackathon.changes).
+    seq: int | None = None
+
+
+def _text(value) -> str:
+    return str(value).strip() if value is not None else ''
+
+
+def _date(value, name: str, errors: list[str], *, required: bool) -> date | None:
+    raw = _text(value)
+    if not raw:
+        if required:
+            errors.append(f'{name} is required.')
+        return None
+    try:
+        parsed = parse_date(raw)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        errors.append(f'{name} must be YYYY-MM-DD.')
+    return parsed
+
+
+def _positive_int(value, name: str, errors: list[str]) -> int | None:
+    raw = _text(value)
+    if not raw.isdigit():
+        errors.append(f'{name} must be a non-negative integer.')
+        return None
+    return int(raw)
+
+
+def _check_limits(model, values: dict, prefix: str, errors: list[str]) -> None:
+    # Over-long or out-of-range values fail the whole INSERT (DataError) on
+    # strict databases; report them against the row instead.
+    for name, value in values.items():
+        field = model._meta.get_field(name)
+        if isinstance(value, str) and field.max_length and len(value) > field.max_length:
+            errors.append(f'{prefix}{name} must be at most {field.max_length} characters.')
+        elif isinstance(value, int):
+            low, high = connection.ops.integer_field_range(field.get_internal_type())
+            if (low is not None and value < low) or (high is not None and value > high):
+                errors.append(f'{prefix}{name} must be between {low} and {high}.')
+
+
+def _section(row: dict, name: str, fields: tuple[str, ...]) -> dict | None:
+    nested = row.get(name)
+    if isinstance(nested, dict):
+        values = {f: nested.get(f) for f in fields}
+    else:
+        values = {f: row.get(f) for f in fields}
+    if not any(_text(v) for v in values.values()):
+        return None
+    return values
+
+
+def _validate(row: dict, seen: dict[str, set]) -> tuple[_ValidRow | None, list[str]]:
+    errors: list[str] = []
+    if not isinstance(row, dict):
+        return None, ['Row must be an object.']
+
+    first_name = _text(row.get('first_name'))
+    last_name = _text(row.get('last_name'))
+    if not first_name:
+        errors.append('first_name is required.')
+    if not last_name:
+        errors.append('last_name is required.')
+    start_date = _date(row.get('start_date'), 'start_date', errors, required=True)
+    end_date = _date(row.get('end_date'), 'end_date', errors, required=False)
+    if start_date and end_date and end_date < start_date:
+        errors.append('end_date is before start_date.')
+
+    valid = _ValidRow(master={
+        'first_name': first_name,
+        'middle_name': _text(row.get('middle_name')) or None,
+        'last_name': last_name,
+        'start_date': start_date,
+        'end_date': end_date,
+    })
+    _check_limits(EmpMaster, valid.master, '', errors)
+
+    ctc = _section(row, 'ctc', CTC_FIELDS)
+    if ctc is not None:
+        for name in ('int_title', 'ext_title', 'sub_level'):
+            if not _text(ctc[name]):
+                errors.append(f'ctc.{name} is required.')
+        valid.ctc = {
+            'int_title': _text(ctc['int_title']),
+            'ext_title': _text(ctc['ext_title']),
+            'sub_level': _text(ctc['sub_level']),
+            'main_level': _positive_int(ctc['main_level'], 'ctc.main_level', errors),
+            'ctc_amt': _positive_int(ctc['ctc_amt'], 'ctc.ctc_amt', errors),
+            'start_of_ctc': _date(ctc['start_of_ctc'] or start_date, 'ctc.start_of_ctc', errors, required=True),
+            'end_of_ctc': _date(ctc['end_of_ctc'], 'ctc.end_of_ctc', errors, required=False),
+        }
+        _check_limits(EmpCtcInfo, valid.ctc, 'ctc.', errors)
+
+    for section, fields, model in (('reg', REG_FIELDS, EmpRegInfo), ('bank', BANK_FIELDS, EmpBankInfo)):
+        values = _section(row, section, fields)
+        if values is None:
+            continue
+        cleaned = {}
+        for name in fields:
+            cleaned[name] = _text(values[name])
+            if not cleaned[name]:
+                errors.append(f'{section}.{name} is required.')
+        _check_limits(model, cleaned, f'{section}.', errors)
+        setattr(valid, section, cleaned)
+
+    # Unique columns: catch duplicates inside the batch before the database does.
+    for section, names in (('reg', ('pan', 'aadhaar', 'uan_epf_acctno', 'esi')), ('bank', ('bank_acct_no',))):
+        values = getattr(valid, section)
+        for name in names if values else ():
+            key = f'{section}.{name}'
+            if values[name] and values[name] in seen.setdefault(key, set()):
+                errors.append(f'Duplicate {key} in this import.')
+            seen[key].add(values[name])
+
+    return (None if errors else valid), errors
+
+
+def import_employees(rows: Iterable[dict], *, partial: bool = False) -> ImportResult:
+    """Validate ``rows`` and insert them with batched ``bulk_create``.
+
+    Rows are validated one at a time as ``rows`` is consumed. Unless
+    ``partial`` is set, any invalid row aborts the whole import; otherwise
+    valid rows are written and invalid ones only reported. All inserts run
+    in one transaction, together with their change-log entries.
+    """
+    result = ImportResult()
+    valid_rows: list[_ValidRow] = []
+    seen: dict[str, set] = {}
+    for index, row in enumerate(rows, start=1):
+        if index > MAX_ROWS:
+            raise ImportTooLarge(f'At most {MAX_ROWS} rows can be imported at once.')
+        result.received = index
+        valid, errors = _validate(row, seen)
+        if errors:
+            result.errors.append({'row': index, 'errors': errors})
+        else:
+            valid_rows.append(valid)
+
+    if not valid_rows or (result.errors and not partial):
+        return result
+
+    emp_ids = emp_id_allocator.allocate(len(valid_rows))
+    employees, ctcs, regs, banks = [], [], [], []
+    for emp_id, valid in zip(emp_ids, valid_rows):
+        employees.append(EmpMaster(emp_id=emp_id, **valid.master))
+        if valid.ctc:
+            ctcs.append(EmpCtcInfo(emp_id=emp_id, **valid.ctc))
+        if valid.reg:
+            regs.append(EmpRegInfo(emp_id=emp_id, **valid.reg))
+        if valid.bank:
+            banks.append(EmpBankInfo(emp_id=emp_id, **valid.bank))
+
+    for objs, allocator, pk in (
+        (ctcs, emp_ctc_id_allocator, 'emp_ctc_id'),
+        (regs, emp_reg_info_id_allocator, 'emp_reg_info_id'),
+        (banks, emp_bank_id_allocator, 'emp_bank_id'),
+    ):
+        for obj, obj_id in zip(objs, allocator.allocate(len(objs))):
+            setattr(obj, pk, obj_id)
+
+    with transaction.atomic():
+        EmpMaster.objects.bulk_create(employees, batch_size=BATCH_SIZE)
+        for model, objs in ((EmpCtcInfo, ctcs), (EmpRegInfo, regs), (EmpBankInfo, banks)):
+            if objs:
+                model.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+        result.seq = changes.record({
+            EmpMaster: [emp.emp_id for emp in employees],
+            EmpCtcInfo: [ctc.emp_ctc_id for ctc in ctcs],
+        })
+        bump_data_version(EmpMaster, *(model for model, objs in (
+            (EmpCtcInfo, ctcs), (EmpRegInfo, regs), (EmpBankInfo, banks),
+        ) if objs))
+
+    result.imported = len(employees)
+    result.employees = employees
+    return result
@@ -0,0 +1,210 @@
+"""Per-route request metrics rendered in the Prometheus text format.
+
+Every thread records into its own shard, so the request path never takes
+a lock; ``render_prometheus`` merges the shards when metrics are scraped.
+Database time is measured by an execute wrapper installed once per
+connection that reports into the ``RequestTimer`` of the current context
+(propagated into ``sync_to_async`` threads, so ASGI requests count too).
+Cache hit/miss counts come from ``caching.cache_counters`` and external
+call counts from the auth service client (``PooledHttpClient.metrics``).
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .auth import get_http_client
+from .caching import cache_counters
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Route label for requests that did not resolve to a named URL.
+UNMATCHED_ROUTE = 'unmatched'
+
+
+class RequestTimer:
+    """Wall-clock and database time of one request."""
+
+    __slots__ = ('started', 'queries', 'db_seconds')
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+current_timer: ContextVar[RequestTimer | None] = ContextVar('hackathon_request_timer', default=None)
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.queries += 1
+        timer.db_seconds += time.perf_counter() - started
+
+
+def _install_wrapper(sender, connection, **kwargs) -> None:
+    # Fires on every (re)connect of the same wrapper object; install once.
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+connection_created.connect(_install_wrapper, dispatch_uid='hackathon.metrics')
+# Connections opened before this module was imported never see the signal.
+for _connection in connections.all(initialized_only=True):
+    _install_wrapper(None, _connection)
+
+
+class _RouteStats:
+    __slots__ = ('buckets', 'count', 'seconds', 'queries', 'db_seconds', 'response_bytes', 'statuses')
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.response_bytes = 0
+        self.statuses: dict[int, int] = {}
+
+    def merge(self, other: '_RouteStats') -> None:
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.count += other.count
+        self.seconds += other.seconds
+        self.queries += other.queries
+        self.db_seconds += other.db_seconds
+        self.response_bytes += other.response_bytes
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+
+
+_local = threading.local()
+_shards: list[dict[tuple[str, str], _RouteStats]] = []
+_shards_lock = threading.Lock()
+
+
+def _shard() -> dict[tuple[str, str], _RouteStats]:
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _local.shard = {}
+        with _shards_lock:
+            _shards.append(shard)
+    return shard
+
+
+def record(route: str, method: str, status: int, seconds: float, timer: RequestTimer, response_bytes: int) -> None:
+    shard = _shard()
+    stats = shard.get((route, method))
+    if stats is None:
+        stats = shard[(route, method)] = _RouteStats()
+    stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+    stats.count += 1
+    stats.seconds += seconds
+    stats.queries += timer.queries
+    stats.db_seconds += timer.db_seconds
+    stats.response_bytes += response_bytes
+    stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+
+def snapshot() -> dict[tuple[str, str], _RouteStats]:
+    """Merged stats of all threads, keyed by ``(route, method)``."""
+    with _shards_lock:
+        shards = list(_shards)
+    merged: dict[tuple[str, str], _RouteStats] = {}
+    for shard in shards:
+        # Another thread may add a route while we copy; retry on resize.
+        while True:
+            try:
+                items = list(shard.items())
+                break
+            except RuntimeError:
+                continue
+        for key, stats in items:
+            merged.setdefault(key, _RouteStats()).merge(stats)
+    return merged
+
+
+def reset() -> None:
+    with _shards_lock:
+        for shard in _shards:
+            shard.clear()
+
+
+def _labels(route: str, method: str, **extra: str) -> str:
+    return _label_set(route=route, method=method, **extra)
+
+
+def _label_set(**pairs: str) -> str:
+    body = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs.items()
+    )
+    return '{' + body + '}'
+
+
+def _fmt(value: float) -> str:
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus() -> str:
+    stats = sorted(snapshot().items())
+    lines = [
+        '# HELP hackathon_http_request_duration_seconds Time to produce the response, per route.',
+        '# TYPE hackathon_http_request_duration_seconds histogram',
+    ]
+    for (route, method), s in stats:
+        cumulative = 0
+        for bound, count in zip((*LATENCY_BUCKETS, '+Inf'), s.buckets):
+            cumulative += count
+            le = bound if bound == '+Inf' else _fmt(float(bound))
+            lines.append(f'hackathon_http_request_duration_seconds_bucket{_labels(route, method, le=le)} {cumulative}')
+        lines.append(f'hackathon_http_request_duration_seconds_sum{_labels(route, method)} {_fmt(s.seconds)}')
+        lines.append(f'hackathon_http_request_duration_seconds_count{_labels(route, method)} {s.count}')
+
+    simple = (
+        ('hackathon_http_requests_total', 'counter', 'Requests by response status.', None),
+        ('hackathon_db_queries_total', 'counter', 'Database queries executed.', 'queries'),
+        ('hackathon_db_query_seconds_total', 'counter', 'Time spent executing database queries.', 'db_seconds'),
+        ('hackathon_http_response_bytes_total', 'counter', 'Response body bytes sent.', 'response_bytes'),
+    )
+    for name, kind, help_text, attr in simple:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for (route, method), s in stats:
+            if attr is None:
+                for status, count in sorted(s.statuses.items()):
+                    lines.append(f'{name}{_labels(route, method, status=status)} {count}')
+            else:
+                lines.append(f'{name}{_labels(route, method)} {_fmt(getattr(s, attr))}')
+
+    external = sorted(get_http_client().metrics().items())
+    for name, kind, help_text, key in (
+        ('hackathon_external_requests_total', 'counter', 'Calls to external services, per endpoint.', 'count'),
+        ('hackathon_external_request_errors_total', 'counter', 'External calls that raised.', 'errors'),
+        ('hackathon_external_request_seconds_total', 'counter', 'Time spent in external calls.', 'total_seconds'),
+        ('hackathon_external_request_max_seconds', 'gauge', 'Slowest external call.', 'max_ms'),
+    ):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for endpoint, values in external:
+            value = values[key] / 1000 if key == 'max_ms' else values[key]
+            lines.append(f'{name}{_label_set(endpoint=endpoint)} {_fmt(value)}')
+
+    name = 'hackathon_cache_requests_total'
+    lines.append(f'# HELP {name} get_or_build lookups by cache key and result.')
+    lines.append(f'# TYPE {name} counter')
+    for key, outcomes in sorted(cache_counters().items()):
+        for outcome, count in sorted(outcomes.items()):
+            lines.append(f'{name}{_label_set(key=key, result=outcome)} {count}')
+    return '\n'.join(lines) + '\n'
@@ -1,24 +1,339 @@
 from __future__ import annotations
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
 from django.http import HttpRequest, HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
 
+from . import compression, metrics, profiling, replicas
+from .auth import ExternalAuthError, load_signed_session
+
+
+class _HybridMiddleware:
+    """Base for middleware that runs natively under both WSGI and ASGI.
+
+    Subclasses implement ``process_request`` (may return a response to
+    short-circuit) and ``process_response``; keeping the chain async under
+    ASGI avoids a thread hop per request for async views.
+    """
+
+    sync_capable = True
+    async_capable = True
 
-class CorsMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
-    def __call__(self, request: HttpRequest) -> HttpResponse:
-        if request.method == 'OPTIONS':
-            response = HttpResponse(status=204)
-        else:
+    def process_request(self, request: HttpRequest) -> HttpResponse | None:
+        return None
+
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        return response
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.process_request(request)
+        if response is None:
             response = self.get_response(request)
+        return self.process_response(request, response)
 
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        response = self.process_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return self.process_response(request, response)
+
+
+class CorsMiddleware(_HybridMiddleware):
+    def process_request(self, request: HttpRequest) -> HttpResponse | None:
+        if request.method == 'OPTIONS':
+            return HttpResponse(status=204)
+        return None
+
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
         origin = request.headers.get('Origin')
         if origin:
             response['Access-Control-Allow-Origin'] = origin
-            response['Vary'] = 'Origin'
+            patch_vary_headers(response, ('Origin',))
             response['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-            response['Access-Control-Allow-Headers'] = 'Authorization, Content-Type'
+            response['Access-Control-Allow-Headers'] = (
+                'Authorization, Content-Type, If-None-Match, X-Last-Write, X-Profile, X-Profile-Mode'
+            )
+            response['Access-Control-Expose-Headers'] = 'ETag, Server-Timing, X-Last-Write, X-Profile-Id'
             response['Access-Control-Max-Age'] = '86400'
 
         return response
+
+
+# Routes whose responses carry session or OTP tokens next to data from the
+# request; compressing them would let BREACH-style attacks recover the tokens.
+UNCOMPRESSED_ROUTES = frozenset({
+    'api_login', 'api_register', 'api_forgot_password', 'api_otp_request', 'api_otp_verify', 'api_home',
+    'api_logout',
+})
+
+
+class CompressionMiddleware(_HybridMiddleware):
+    """Compress text/JSON/CSV responses with the best coding the client accepts.
+
+    Bodies below ``COMPRESS_MIN_SIZE`` bytes are sent as is; streamed
+    responses (report downloads) are compressed on the fly. Responses that
+    already carry a ``Content-Encoding`` (e.g. precompressed assets), event
+    streams and the auth endpoints (``UNCOMPRESSED_ROUTES``) are left alone.
+    """
+
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        if response.has_header('Content-Encoding') or response.status_code in (204, 206, 304):
+            return response
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.url_name in UNCOMPRESSED_ROUTES:
+            return response
+        if not compression.compressible(response.get('Content-Type', '')):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not response.streaming and len(response.content) < getattr(settings, 'COMPRESS_MIN_SIZE', 1024):
+            return response
+        coding = compression.negotiate(request.headers.get('Accept-Encoding', ''))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compression.acompress_stream(response.streaming_content, coding)
+            else:
+                response.streaming_content = compression.compress_stream(response.streaming_content, coding)
+            del response['Content-Length']
+        else:
+            body = compression.compress(response.content, coding)
+            if len(body) >= len(response.content):
+                return response
+            response.content = body
+            response['Content-Length'] = str(len(body))
+
+        # The compressed body is a different representation of the same
+        # resource; conditional GETs compare ETags weakly.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = coding
+        return response
+
+
+def _get_bearer_token(request: HttpRequest) -> str | None:
+    auth_header = request.headers.get('Authorization')
+    if not auth_header:
+        return None
+
+    prefix = 'Bearer '
+    if not auth_header.startswith(prefix):
+        return None
+
+    token = auth_header[len(prefix) :].strip()
+    return token or None
+
+
+class SessionAuthMiddleware(_HybridMiddleware):
+    """Verify the bearer session token once and expose it as ``request.auth_session``.
+
+    ``auth_session`` is the session payload, or ``None`` when the request
+    carries no valid token.
+    """
+
+    def process_request(self, request: HttpRequest) -> HttpResponse | None:
+        request.auth_session = None
+        token = _get_bearer_token(request)
+        if token:
+            try:
+                request.auth_session = load_signed_session(token)
+            except ExternalAuthError:
+                pass
+        return None
+
+
+class ReplicaRoutingMiddleware(_HybridMiddleware):
+    """Let GET/HEAD requests read from a replica; see ``hackathon.replicas``.
+
+    The scope stays set after the response is returned, so streamed bodies
+    keep reading from the same database. Responses to requests that wrote
+    carry ``X-Last-Write`` for the client to send back.
+    """
+
+    def process_request(self, request: HttpRequest) -> HttpResponse | None:
+        request.replica_scope = replicas.begin(
+            request.method in ('GET', 'HEAD'), last_write=request.headers.get(replicas.LAST_WRITE_HEADER),
+        )
+        return None
+
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        scope = getattr(request, 'replica_scope', None)
+        if scope is not None and scope.wrote:
+            response[replicas.LAST_WRITE_HEADER] = replicas.write_stamp()
+        return response
+
+
+def _sends_file(response: HttpResponse) -> bool:
+    # Wrapping a FileResponse's content would stop the server from sending
+    # the file with sendfile (wsgi.file_wrapper); there is no work left to
+    # measure or profile in it anyway.
+    return getattr(response, 'file_to_stream', None) is not None
+
+
+class InstrumentationMiddleware:
+    """Record latency, DB queries/time, size and status per route.
+
+    Adds a ``Server-Timing`` header (total and DB time). Streaming
+    responses are recorded when the stream is exhausted, so report
+    downloads count their full generation time and size. Place it first
+    in ``MIDDLEWARE`` so the numbers include the other middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = metrics.RequestTimer()
+        token = metrics.current_timer.set(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current_timer.reset(token)
+        return self._finish(request, response, timer)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        timer = metrics.RequestTimer()
+        token = metrics.current_timer.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current_timer.reset(token)
+        return self._finish(request, response, timer)
+
+    def _finish(self, request: HttpRequest, response: HttpResponse, timer: metrics.RequestTimer) -> HttpResponse:
+        match = getattr(request, 'resolver_match', None)
+        route = match.url_name if match and match.url_name else metrics.UNMATCHED_ROUTE
+        elapsed = timer.elapsed()
+        response['Server-Timing'] = (
+            f'app;dur={elapsed * 1000:.1f}, db;dur={timer.db_seconds * 1000:.1f};desc="{timer.queries} queries"'
+        )
+        if response.streaming and not response.is_async and not _sends_file(response):
+            response.streaming_content = self._observe(response.streaming_content, request, response, route, timer)
+        else:
+            if response.streaming:
+                size = int(response.get('Content-Length') or 0)
+            else:
+                size = len(response.content)
+            metrics.record(route, request.method, response.status_code, elapsed, timer, size)
+        return response
+
+    @staticmethod
+    def _observe(chunks, request, response, route, timer):
+        size = 0
+        iterator = iter(chunks)
+        try:
+            while True:
+                # The server may iterate from another context; scope the
+                # timer to each step rather than across yields.
+                token = metrics.current_timer.set(timer)
+                try:
+                    chunk = next(iterator, None)
+                finally:
+                    metrics.current_timer.reset(token)
+                if chunk is None:
+                    break
+                size += len(chunk)
+                yield chunk
+        finally:
+            metrics.record(route, request.method, response.status_code, timer.elapsed(), timer, size)
+
+
+def _runs_on_event_loop(request: HttpRequest) -> bool:
+    try:
+        match = resolve(request.path_info, getattr(request, 'urlconf', None))
+    except Resolver404:
+        return False
+    return iscoroutinefunction(match.func)
+
+
+class ProfilingMiddleware:
+    """Profile requests that ask for it or fall into the background sample.
+
+    See ``hackathon.profiling``. Explicitly profiled responses name the
+    saved file in ``X-Profile-Id``; streamed responses are profiled while
+    they are iterated and saved when the stream ends.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        mode, explicit = profiling.requested_mode(request)
+        if mode is None:
+            return self.get_response(request)
+        session = profiling.ProfileSession(mode)
+        try:
+            response = self.get_response(request)
+        finally:
+            session.pause()
+        return self._finish(request, response, session, explicit)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        mode, explicit = profiling.requested_mode(request)
+        if mode is None:
+            return await self.get_response(request)
+        session = profiling.ProfileSession(mode, start=False)
+        if _runs_on_event_loop(request):
+            # Only this request's own steps; other tasks run in between.
+            response = await profiling.Stepped(self.get_response(request), session)
+        else:
+            # A sync view runs in the request's thread-sensitive thread:
+            # profile that thread, not the event loop.
+            await sync_to_async(session.resume, thread_sensitive=True)()
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(session.pause, thread_sensitive=True)()
+        return self._finish(request, response, session, explicit)
+
+    def _finish(self, request, response, session, explicit: bool):
+        match = getattr(request, 'resolver_match', None)
+        label = f'{request.method}-{match.url_name if match and match.url_name else metrics.UNMATCHED_ROUTE}'
+        if response.streaming and not response.is_async and not _sends_file(response):
+            response.streaming_content = self._profile_stream(response.streaming_content, session, label)
+            return response
+        name = session.save(label)
+        if explicit and name:
+            response['X-Profile-Id'] = name
+        return response
+
+    @staticmethod
+    def _profile_stream(chunks, session, label):
+        iterator = iter(chunks)
+        try:
+            while True:
+                session.resume()
+                try:
+                    chunk = next(iterator, None)
+                finally:
+                    session.pause()
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            session.save(label)
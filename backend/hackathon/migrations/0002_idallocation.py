@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hackathon', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdAllocation',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('next_id', models.PositiveBigIntegerField()),
+            ],
+            options={
+                'db_table': 'hackathon_id_allocation',
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+from django.db import migrations, models
+
+# emp_* tables are unmanaged (not in the migration state), so their indexes
+# are added against the live models and only where the table exists and the
+# index is missing. The emp_ctc_info index covers the current-CTC lookup
+# behind the role/level columns and breakdowns (no table access per
+# employee); the others serve the active/exited filters and the
+# per-employee compliance counts.
+REPORT_INDEXES = (
+    (
+        'EmpCtcInfo',
+        models.Index(
+            fields=['emp', 'end_of_ctc', 'start_of_ctc', 'ext_title', 'main_level', 'sub_level'],
+            name='emp_ctc_current_idx',
+        ),
+    ),
+    ('EmpMaster', models.Index(fields=['end_date'], name='emp_master_end_date_idx')),
+    ('EmpComplianceTracker', models.Index(fields=['emp', 'status'], name='emp_comp_emp_status_idx')),
+)
+
+
+def _existing(schema_editor, table: str) -> set[str] | None:
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if table not in connection.introspection.table_names(cursor):
+            return None
+        return set(connection.introspection.get_constraints(cursor, table))
+
+
+def add_indexes(apps, schema_editor):
+    from hackathon import models as live
+
+    for model_name, index in REPORT_INDEXES:
+        model = getattr(live, model_name)
+        existing = _existing(schema_editor, model._meta.db_table)
+        if existing is not None and index.name not in existing:
+            schema_editor.add_index(model, index)
+
+
+def remove_indexes(apps, schema_editor):
+    from hackathon import models as live
+
+    for model_name, index in REPORT_INDEXES:
+        model = getattr(live, model_name)
+        existing = _existing(schema_editor, model._meta.db_table)
+        if existing is not None and index.name in existing:
+            schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hackathon', '0002_idallocation'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_indexes, remove_indexes),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+SEQ_COUNTER = 'hackathon_change_log.seq'
+
+
+def create_counter(apps, schema_editor):
+    IdAllocation = apps.get_model('hackathon', 'IdAllocation')
+    IdAllocation.objects.get_or_create(name=SEQ_COUNTER, defaults={'next_id': 1})
+
+
+def delete_counter(apps, schema_editor):
+    apps.get_model('hackathon', 'IdAllocation').objects.filter(name=SEQ_COUNTER).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hackathon', '0003_report_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('seq', models.PositiveBigIntegerField(primary_key=True, serialize=False)),
+                ('table', models.CharField(max_length=64)),
+                ('row_id', models.PositiveBigIntegerField()),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'hackathon_change_log',
+            },
+        ),
+        migrations.RunPython(create_counter, delete_counter),
+    ]
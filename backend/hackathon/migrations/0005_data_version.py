@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+TABLES = ('emp_master', 'emp_ctc_info', 'emp_reg_info', 'emp_bank_info', 'emp_compliance_tracker')
+
+
+def create_versions(apps, schema_editor):
+    DataVersion = apps.get_model('hackathon', 'DataVersion')
+    DataVersion.objects.bulk_create([DataVersion(table=table, version=0) for table in TABLES], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hackathon', '0004_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('table', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'hackathon_data_version',
+            },
+        ),
+        migrations.RunPython(create_versions, migrations.RunPython.noop),
+    ]
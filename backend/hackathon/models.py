@@ -66,3 +66,35 @@ class EmpRegInfo(models.Model):
     class Meta:
         managed = False
         db_table = 'emp_reg_info'
+
+
+class IdAllocation(models.Model):
+    """High-water mark for ID blocks handed out by ``hackathon.ids.IdAllocator``."""
+
+    name = models.CharField(primary_key=True, max_length=50)
+    next_id = models.PositiveBigIntegerField()
+
+    class Meta:
+        db_table = 'hackathon_id_allocation'
+
+
+class ChangeLogEntry(models.Model):
+    """A write to one row of a table tracked by ``hackathon.changes``."""
+
+    seq = models.PositiveBigIntegerField(primary_key=True)
+    table = models.CharField(max_length=64)
+    row_id = models.PositiveBigIntegerField()
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'hackathon_change_log'
+
+
+class DataVersion(models.Model):
+    """Write counter of one table, behind the data-version ETags (``hackathon.caching``)."""
+
+    table = models.CharField(primary_key=True, max_length=64)
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'hackathon_data_version'
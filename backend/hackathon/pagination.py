@@ -0,0 +1,76 @@
+from collections.abc import Sequence
+
+from django.core import signing
+from django.db.models import Q, QuerySet
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+_CURSOR_SALT = 'hackathon.cursor'
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def parse_limit(raw: str | None, *, default: int = DEFAULT_LIMIT) -> int:
+    if raw in (None, ''):
+        return default
+    try:
+        limit = int(raw)
+    except ValueError as exc:
+        raise PaginationError('limit must be an integer.') from exc
+    if limit < 1 or limit > MAX_LIMIT:
+        raise PaginationError(f'limit must be between 1 and {MAX_LIMIT}.')
+    return limit
+
+
+def _encode_cursor(order: Sequence[str], row: dict) -> str:
+    values = [str(row[field.lstrip('-')]) for field in order]
+    return signing.dumps({'o': list(order), 'v': values}, salt=_CURSOR_SALT, compress=True)
+
+
+def _decode_cursor(order: Sequence[str], token: str) -> list[str]:
+    try:
+        data = signing.loads(token, salt=_CURSOR_SALT)
+    except signing.BadSignature as exc:
+        raise PaginationError('Invalid cursor.') from exc
+    if not isinstance(data, dict) or data.get('o') != list(order):
+        raise PaginationError('Cursor does not match the requested sort.')
+    values = data.get('v')
+    if not isinstance(values, list) or len(values) != len(order):
+        raise PaginationError('Invalid cursor.')
+    return values
+
+
+def _after(order: Sequence[str], values: list[str]) -> Q:
+    # (a, b) > (x, y)  ==>  a > x OR (a = x AND b > y), honoring per-field direction.
+    condition = Q()
+    equal = {}
+    for field, value in zip(order, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= Q(**equal, **{f'{name}__{lookup}': value})
+        equal[name] = value
+    return condition
+
+
+def keyset_page(
+    queryset: QuerySet,
+    *,
+    order: Sequence[str],
+    limit: int,
+    cursor: str | None,
+) -> tuple[list[dict], str | None]:
+    """Return one page of ``queryset`` (a ``values()`` queryset) plus the next cursor.
+
+    ``order`` must end in a unique column so that the key is total; every
+    field in it has to be selected by ``queryset``.
+    """
+    if cursor:
+        queryset = queryset.filter(_after(order, _decode_cursor(order, cursor)))
+    rows = list(queryset.order_by(*order)[: limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, _encode_cursor(order, rows[-1])
@@ -0,0 +1,204 @@
+"""Opt-in request profiling.
+
+A request is profiled when it carries ``X-Profile: <PROFILE_TOKEN>``
+(``X-Profile-Mode: sample`` picks the sampler instead of cProfile) or when
+it falls into the ``PROFILE_SAMPLE_RATE`` fraction of background samples,
+which always use the sampler. cProfile sessions are saved as ``.prof``
+files for ``pstats``/snakeviz; sampler sessions as ``.folded`` stacks for
+flamegraph.pl or speedscope. ``PROFILE_DIR`` is trimmed to the newest
+``PROFILE_MAX_FILES`` on a background thread every ``PRUNE_EVERY`` saves.
+"""
+import cProfile
+import hmac
+import itertools
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpRequest
+
+CPROFILE = 'cprofile'
+SAMPLE = 'sample'
+
+# Saves between two trims of PROFILE_DIR (the first save trims too).
+PRUNE_EVERY = 50
+
+_prune_lock = threading.Lock()
+_saves = itertools.count()
+
+
+def requested_mode(request: HttpRequest) -> tuple[str | None, bool]:
+    """Return ``(mode, explicit)``; ``mode`` is None when not profiling."""
+    token = getattr(settings, 'PROFILE_TOKEN', '')
+    supplied = request.headers.get('X-Profile')
+    if token and supplied and hmac.compare_digest(supplied.encode(), token.encode()):
+        mode = (request.headers.get('X-Profile-Mode') or CPROFILE).lower()
+        return (SAMPLE if mode == SAMPLE else CPROFILE), True
+    rate = getattr(settings, 'PROFILE_SAMPLE_RATE', 0.0)
+    if rate > 0 and random.random() < rate:
+        return SAMPLE, False
+    return None, False
+
+
+class StackSampler:
+    """Record one thread's Python stack every ``interval`` seconds.
+
+    Sampling happens on a daemon thread, so the profiled code runs at full
+    speed apart from the GIL hand-offs. ``target`` can be switched while
+    running, e.g. when a streamed response continues on another thread.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.target: int | None = None
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='hackathon-profiler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            target = self.target
+            frame = sys._current_frames().get(target) if target is not None else None
+            if frame is not None:
+                self.stacks[_fold(frame)] += 1
+
+    def folded(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def _fold(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class ProfileSession:
+    """One profiled request; ``pause``/``resume`` bracket the work done in it.
+
+    Both act on the calling thread, so work can be followed from thread to
+    thread (the event loop, the thread running a sync view, the thread
+    iterating a stream) as long as it runs in one of them at a time.
+    """
+
+    def __init__(self, mode: str, *, start: bool = True) -> None:
+        self.mode = mode
+        self.started = time.time()
+        self._sampler: StackSampler | None = None
+        if mode == CPROFILE:
+            self._profile = cProfile.Profile()
+        else:
+            self._start_sampler()
+        if start:
+            self.resume()
+
+    def _start_sampler(self) -> None:
+        self._sampler = StackSampler(getattr(settings, 'PROFILE_INTERVAL', 0.005))
+        self._sampler.start()
+
+    def resume(self) -> None:
+        if self.mode == CPROFILE:
+            try:
+                self._profile.enable()
+                return
+            except ValueError:
+                # Another profiler is active (Python 3.12+ allows only one).
+                self.mode = SAMPLE
+                self._start_sampler()
+        self._sampler.target = threading.get_ident()
+
+    def pause(self) -> None:
+        if self.mode == CPROFILE:
+            self._profile.disable()
+        else:
+            self._sampler.target = None
+
+    def save(self, label: str) -> str | None:
+        """Write the profile to ``PROFILE_DIR`` and return its file name.
+
+        Sampler sessions too short to catch a single sample write nothing.
+        """
+        if self.mode == SAMPLE:
+            self._sampler.stop()
+            if not self._sampler.stacks:
+                return None
+        directory = Path(getattr(settings, 'PROFILE_DIR'))
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started))
+        safe_label = re.sub(r'[^A-Za-z0-9_.-]+', '-', label)[:80]
+        base = f'{stamp}-{safe_label}-{uuid.uuid4().hex[:8]}'
+        if self.mode == CPROFILE:
+            name = f'{base}.prof'
+            self._profile.dump_stats(directory / name)
+        else:
+            name = f'{base}.folded'
+            (directory / name).write_text(self._sampler.folded(), encoding='utf-8')
+        if next(_saves) % PRUNE_EVERY == 0:
+            threading.Thread(target=_prune, args=(directory,), name='hackathon-profile-prune', daemon=True).start()
+        return name
+
+
+class Stepped:
+    """Await ``coroutine`` with ``session`` resumed only while it runs.
+
+    Other tasks on the same event loop run between the steps, while the
+    session is paused, so they are left out of the profile.
+    """
+
+    def __init__(self, coroutine, session: ProfileSession) -> None:
+        self._coroutine = coroutine
+        self._session = session
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            self._session.resume()
+            try:
+                if error is None:
+                    signal = self._coroutine.send(value)
+                else:
+                    signal = self._coroutine.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self._session.pause()
+            try:
+                value, error = (yield signal), None
+            except BaseException as exc:
+                value, error = None, exc
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def _prune(directory: Path) -> None:
+    keep = getattr(settings, 'PROFILE_MAX_FILES', 500)
+    if not _prune_lock.acquire(blocking=False):
+        # A trim is already running.
+        return
+    try:
+        files = sorted((p for p in directory.iterdir() if p.suffix in {'.prof', '.folded'}), key=_mtime)
+        for path in files[: max(0, len(files) - keep)]:
+            path.unlink(missing_ok=True)
+    finally:
+        _prune_lock.release()
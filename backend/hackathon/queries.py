@@ -0,0 +1,211 @@
+from django.db.models import (
+    Case,
+    CharField,
+    Count,
+    F,
+    Field,
+    Func,
+    IntegerField,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+    Value,
+    When,
+    Window,
+)
+from django.db.models.functions import Cast, Concat, FirstValue, Lag
+
+from .models import EmpBankInfo, EmpComplianceTracker, EmpCtcInfo, EmpMaster, EmpRegInfo
+
+# Compliance statuses that count as done.
+VERIFIED_STATUSES = ('Verified', 'Completed')
+
+
+def _current_ctc_rows():
+    # Active CTC row (no end_of_ctc) first, otherwise the most recent one.
+    return (
+        EmpCtcInfo.objects.filter(emp_id=OuterRef('emp_id'))
+        .annotate(
+            _inactive=Case(
+                When(end_of_ctc__isnull=True, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by('_inactive', '-start_of_ctc')
+    )
+
+
+def current_ctc_field(name: str, output_field: Field) -> Subquery:
+    """Correlated subquery yielding one column of the employee's current CTC row."""
+    return Subquery(_current_ctc_rows().values(name)[:1], output_field=output_field)
+
+
+def current_ctc_title() -> Subquery:
+    """Correlated subquery yielding the employee's current ``ext_title``."""
+    return current_ctc_field('ext_title', CharField())
+
+
+def current_ctc_level() -> Subquery:
+    """Correlated subquery yielding the employee's current level, e.g. ``L2A``."""
+    level = Concat(
+        Value('L'),
+        Cast('main_level', output_field=CharField()),
+        'sub_level',
+        output_field=CharField(),
+    )
+    return Subquery(
+        _current_ctc_rows().annotate(_level=level).values('_level')[:1],
+        output_field=CharField(),
+    )
+
+
+def _compliance_count(**filters) -> Subquery:
+    # COUNT without GROUP BY always yields one row, so employees with no
+    # records get 0 rather than NULL.
+    rows = (
+        EmpComplianceTracker.objects.filter(emp_id=OuterRef('emp_id'), **filters)
+        .order_by()
+        .annotate(n=Func(F('pk'), function='COUNT'))
+        .values('n')
+    )
+    return Subquery(rows, output_field=IntegerField())
+
+
+def headcount_totals() -> dict[str, int]:
+    """``total`` and ``exited`` employee counts in a single pass over emp_master."""
+    return EmpMaster.objects.aggregate(
+        total=Count('pk'),
+        exited=Count('pk', filter=Q(end_date__isnull=False)),
+    )
+
+
+def headcount_breakdown(**dimensions) -> dict[str, list]:
+    """Headcount per distinct value of ``dimensions`` (name -> expression).
+
+    One GROUP BY query; the result is column arrays keyed by the dimension
+    names plus ``headcount``, ``active`` and ``exited``.
+    """
+    rows = (
+        EmpMaster.objects.annotate(**dimensions)
+        .values(*dimensions)
+        .annotate(
+            headcount=Count('pk'),
+            exited=Count('pk', filter=Q(end_date__isnull=False)),
+        )
+        .order_by(*dimensions)
+    )
+    columns: dict[str, list] = {name: [] for name in (*dimensions, 'headcount', 'active', 'exited')}
+    for row in rows:
+        for name in dimensions:
+            columns[name].append(row[name])
+        columns['headcount'].append(row['headcount'])
+        columns['active'].append(row['headcount'] - row['exited'])
+        columns['exited'].append(row['exited'])
+    return columns
+
+
+def employee_rollups(employees: QuerySet | None = None) -> QuerySet:
+    """One row per employee with current role and compliance counts.
+
+    Returns a ``values()`` queryset with ``emp_id``, names, ``start_date``,
+    ``end_date``, ``role`` (current CTC title) and ``docs_total`` /
+    ``docs_verified``. Everything is computed by the database with
+    correlated subqueries, so there is no join fan-out and no GROUP BY.
+    """
+    if employees is None:
+        employees = EmpMaster.objects.all()
+    return (
+        employees.values('emp_id', 'first_name', 'last_name', 'start_date', 'end_date')
+        .annotate(
+            role=current_ctc_title(),
+            docs_total=_compliance_count(),
+            docs_verified=_compliance_count(status__in=VERIFIED_STATUSES),
+        )
+        .order_by('emp_id')
+    )
+
+
+def job_history(employees: QuerySet | None = None) -> QuerySet:
+    """Every CTC change joined to its employee, with the title held before it.
+
+    Returns a ``values()`` queryset with ``emp_ctc_id``, ``emp_id``,
+    ``first_name``, ``last_name``, ``previous_title``, ``ext_title``,
+    ``main_level``, ``sub_level``, ``effective_date``, ``end_of_ctc`` and
+    ``ctc_amt``. ``previous_title`` is ``LAG(ext_title)`` over the employee's
+    whole history, so restrict employees through ``employees`` (whole
+    partitions) and dates through ``effective_date``.
+    """
+    history = EmpCtcInfo.objects.all()
+    if employees is not None:
+        history = history.filter(emp_id__in=employees.values('emp_id'))
+    return history.values(
+        'emp_ctc_id',
+        'emp_id',
+        'ext_title',
+        'main_level',
+        'sub_level',
+        'end_of_ctc',
+        'ctc_amt',
+        first_name=F('emp__first_name'),
+        last_name=F('emp__last_name'),
+    ).annotate(
+        previous_title=Window(
+            Lag('ext_title'),
+            partition_by=[F('emp_id')],
+            order_by=[F('start_of_ctc').asc(), F('emp_ctc_id').asc()],
+        ),
+        # start_of_ctc as a one-row window: filters on it are applied after
+        # LAG (Django wraps the query), so a date range never hides the row
+        # a promotion's previous title comes from.
+        effective_date=Window(FirstValue('start_of_ctc'), partition_by=[F('emp_ctc_id')]),
+    )
+
+
+def employee_profile(emp_id: int) -> dict | None:
+    """Master row with registration IDs, bank accounts, CTC timeline and
+    compliance documents of one employee, or None if there is no such employee.
+
+    Four queries whatever the history length: registration is joined to the
+    master row, the three one-to-many tables are read with one query each.
+    """
+    emp = EmpMaster.objects.select_related('empreginfo').filter(emp_id=emp_id).first()
+    if emp is None:
+        return None
+    try:
+        reg = emp.empreginfo
+    except EmpRegInfo.DoesNotExist:
+        reg = None
+    return {
+        'employee': {
+            'emp_id': emp.emp_id,
+            'first_name': emp.first_name,
+            'middle_name': emp.middle_name,
+            'last_name': emp.last_name,
+            'start_date': emp.start_date,
+            'end_date': emp.end_date,
+            'status': 'Active' if emp.end_date is None else 'Exited',
+        },
+        'registration': None if reg is None else {
+            'pan': reg.pan,
+            'aadhaar': reg.aadhaar,
+            'uan_epf_acctno': reg.uan_epf_acctno,
+            'esi': reg.esi,
+        },
+        'bank_accounts': list(
+            EmpBankInfo.objects.filter(emp_id=emp_id)
+            .values('bank_name', 'branch_name', 'ifsc_code', 'bank_acct_no')
+            .order_by('emp_bank_id')
+        ),
+        'ctc_timeline': list(
+            EmpCtcInfo.objects.filter(emp_id=emp_id)
+            .values('int_title', 'ext_title', 'main_level', 'sub_level', 'start_of_ctc', 'end_of_ctc', 'ctc_amt')
+            .order_by('start_of_ctc', 'emp_ctc_id')
+        ),
+        'compliance': list(
+            EmpComplianceTracker.objects.filter(emp_id=emp_id)
+            .values('comp_type', 'status', 'doc_url')
+            .order_by('emp_compliance_tracker_id')
+        ),
+    }
@@ -0,0 +1,148 @@
+"""Send reads of GET requests to read replicas.
+
+``ReplicaRouter`` routes reads to a replica only inside a read-routed
+scope: a GET/HEAD request (``ReplicaRoutingMiddleware``) or ``reading()``
+(background report runs). Everything else, and every write, uses
+``default``; ``primary()`` forces it for a block inside such a scope. A
+scope picks one replica on its first query, round robin, and keeps it, so
+all its reads see the same replica. A replica is probed with a query at
+most every ``REPLICA_CHECK_SECONDS``; one that fails is skipped for
+``REPLICA_RETRY_SECONDS``, and with none left reads fall back to the
+primary.
+
+Read-your-writes is per client: the response to a request that wrote
+carries ``X-Last-Write`` (server time), the frontend sends it back, and for
+``REPLICA_LAG_SECONDS`` after it that client reads from the primary. Other
+clients keep using the replicas, so anything built for everyone is built
+on the primary (``caching.get_or_build``) or checked against the data
+version it is filed under (``report_jobs``).
+"""
+import contextvars
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from .models import DataVersion
+
+LAST_WRITE_HEADER = 'X-Last-Write'
+
+
+def replica_aliases() -> list[str]:
+    return getattr(settings, 'REPLICA_DATABASES', [])
+
+
+class _Scope:
+    def __init__(self, replica_reads: bool) -> None:
+        self.replica_reads = replica_reads
+        self.alias: str | None = None
+        self.wrote = False
+
+
+_scope: contextvars.ContextVar[_Scope | None] = contextvars.ContextVar('hackathon_replica_scope', default=None)
+
+_down_until: dict[str, float] = {}
+_checked_until: dict[str, float] = {}
+_turn = itertools.count()
+_lock = threading.Lock()
+
+
+def _recently_written(last_write: str | None) -> bool:
+    try:
+        stamp = float(last_write)
+    except (TypeError, ValueError):
+        return False
+    return time.time() - stamp < getattr(settings, 'REPLICA_LAG_SECONDS', 5)
+
+
+def write_stamp() -> str:
+    """Value of ``X-Last-Write`` for a response to a request that wrote."""
+    return f'{time.time():.3f}'
+
+
+def _probe(alias: str) -> None:
+    # A query against one of our tables, not just a connection: SQLite opens
+    # (or creates) any file, and a replica without the schema is no use.
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT 1 FROM {connection.ops.quote_name(DataVersion._meta.db_table)} LIMIT 1')
+
+
+def _healthy_replica(aliases: list[str]) -> str | None:
+    with _lock:
+        start = next(_turn)
+    now = time.monotonic()
+    for offset in range(len(aliases)):
+        alias = aliases[(start + offset) % len(aliases)]
+        if _down_until.get(alias, 0) > now:
+            continue
+        if _checked_until.get(alias, 0) <= now:
+            try:
+                _probe(alias)
+            except DatabaseError:
+                connections[alias].close()
+                _down_until[alias] = now + getattr(settings, 'REPLICA_RETRY_SECONDS', 30)
+                continue
+            _down_until.pop(alias, None)
+            _checked_until[alias] = now + getattr(settings, 'REPLICA_CHECK_SECONDS', 5)
+        return alias
+    return None
+
+
+def begin(replica_reads: bool, *, last_write: str | None = None) -> _Scope:
+    """Start the scope of a request; ``last_write`` is the client's ``X-Last-Write``."""
+    scope = _Scope(replica_reads and not _recently_written(last_write))
+    _scope.set(scope)
+    return scope
+
+
+@contextmanager
+def reading():
+    """Let reads in this block go to a replica (outside any request)."""
+    token = _scope.set(_Scope(True))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+@contextmanager
+def primary():
+    """Send reads in this block to the primary."""
+    outer = _scope.get()
+    inner = _Scope(False)
+    token = _scope.set(inner)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+        if inner.wrote and outer is not None:
+            outer.wrote = True
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        scope = _scope.get()
+        aliases = replica_aliases()
+        if scope is None or not scope.replica_reads or scope.wrote or not aliases:
+            return DEFAULT_DB_ALIAS
+        if scope.alias is None:
+            scope.alias = _healthy_replica(aliases) or DEFAULT_DB_ALIAS
+        return scope.alias
+
+    def db_for_write(self, model, **hints):
+        scope = _scope.get()
+        if scope is not None:
+            scope.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication.
+        return False if db in replica_aliases() else None
@@ -0,0 +1,193 @@
+"""Report CSVs generated in the background and kept on disk.
+
+Each report is written once per data version of the tables it reads (see
+``REPORT_TABLES``): the file name carries a hash of those versions, so a
+download after any write to them finds no file and queues a new run, and
+an unchanged dataset is never regenerated. Runs happen on a small thread
+pool (``REPORT_WORKERS``; 0 runs them inline); concurrent requests for the
+same version share one run. A gzip copy is written alongside, so both
+forms can be sent straight from disk. The newest file is always kept, so
+downloads can be served from it while a newer run is in progress; a file
+that a newer run replaced is kept for ``REPORT_GRACE_SECONDS``, so a
+request that was just handed it can still open it.
+"""
+import gzip
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+from . import replicas
+from .caching import data_etag
+from .reports import REPORT_TABLES, iter_report_csv
+
+GZIP_SUFFIX = '.gz'
+
+_executor: ThreadPoolExecutor | None = None
+_pending: dict[tuple[str, str], Future] = {}
+_lock = threading.Lock()
+
+
+def _directory() -> Path:
+    return Path(getattr(settings, 'REPORT_DIR'))
+
+
+def report_version(slug: str) -> str:
+    return data_etag(*REPORT_TABLES[slug], extra=slug)
+
+
+def artifact_path(slug: str, version: str) -> Path:
+    return _directory() / f'{slug}-{version}.csv'
+
+
+def _artifacts(slug: str) -> list[Path]:
+    directory = _directory()
+    if not directory.is_dir():
+        return []
+    pattern = re.compile(rf'{re.escape(slug)}-[0-9a-f]+\.csv')
+    return [path for path in directory.iterdir() if pattern.fullmatch(path.name)]
+
+
+def _newest(slug: str) -> tuple[float, Path] | None:
+    dated = []
+    for path in _artifacts(slug):
+        try:
+            dated.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            continue
+    return max(dated, default=None)
+
+
+def latest_artifact(slug: str) -> Path | None:
+    """The newest file for ``slug``, whatever data version it was made from."""
+    newest = _newest(slug)
+    return newest[1] if newest else None
+
+
+def last_generated(slug: str) -> str | None:
+    """When the newest file for ``slug`` was written (ISO 8601, UTC)."""
+    newest = _newest(slug)
+    if newest is None:
+        return None
+    return datetime.fromtimestamp(newest[0], tz=timezone.utc).isoformat(timespec='seconds')
+
+
+def _executor_or_none() -> ThreadPoolExecutor | None:
+    global _executor
+    workers = getattr(settings, 'REPORT_WORKERS', 2)
+    if workers <= 0:
+        return None
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hackathon-report')
+    return _executor
+
+
+def request_report(slug: str) -> Future:
+    """Return a future for the path of the current ``slug`` file.
+
+    The future is already done when the file for the current data version
+    exists; otherwise a run is queued, or joined if one is in progress.
+    """
+    version = report_version(slug)
+    path = artifact_path(slug, version)
+    if path.is_file():
+        done: Future = Future()
+        done.set_result(path)
+        return done
+
+    key = (slug, version)
+    with _lock:
+        job = _pending.get(key)
+        if job is not None:
+            return job
+        executor = _executor_or_none()
+        if executor is None:
+            job = Future()
+        else:
+            job = executor.submit(_run, slug, version)
+        _pending[key] = job
+        job.add_done_callback(lambda _: _forget(key))
+    if executor is None:
+        try:
+            job.set_result(_generate(slug, version))
+        except Exception as exc:
+            job.set_exception(exc)
+    return job
+
+
+def _forget(key: tuple[str, str]) -> None:
+    with _lock:
+        _pending.pop(key, None)
+
+
+def _run(slug: str, version: str) -> Path:
+    try:
+        # Exports are read-only; let them use a replica like GET requests,
+        # unless it is behind the version the file is named after.
+        with replicas.reading():
+            if report_version(slug) == version:
+                return _generate(slug, version)
+        return _generate(slug, version)
+    finally:
+        # Worker threads own their connections; don't leave them open.
+        connections.close_all()
+
+
+def _generate(slug: str, version: str) -> Path:
+    path = artifact_path(slug, version)
+    if path.is_file():
+        # A run for this version finished after the caller looked.
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f'.{slug}-', suffix='.tmp')
+    tmp = Path(tmp_name)
+    tmp_gz = tmp.with_name(tmp.name + GZIP_SUFFIX)
+    try:
+        with (
+            os.fdopen(fd, 'wb') as plain,
+            open(tmp_gz, 'wb') as raw,
+            # Name the final file in the gzip header, not the temporary one.
+            gzip.GzipFile(path.name, 'wb', compresslevel=6, fileobj=raw, mtime=0) as packed,
+        ):
+            for chunk in iter_report_csv(slug):
+                data = chunk.encode()
+                plain.write(data)
+                packed.write(data)
+        # The .gz goes first: a visible .csv always has its gzip copy.
+        os.replace(tmp_gz, path.with_name(path.name + GZIP_SUFFIX))
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        tmp_gz.unlink(missing_ok=True)
+        raise
+    _prune(slug, keep=path)
+    return path
+
+
+def _prune(slug: str, *, keep: Path) -> None:
+    """Remove files replaced more than ``REPORT_GRACE_SECONDS`` ago."""
+    dated = []
+    for path in _artifacts(slug):
+        try:
+            dated.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            continue
+    dated.sort(reverse=True)
+    cutoff = time.time() - getattr(settings, 'REPORT_GRACE_SECONDS', 60)
+    # Each file was replaced when the next newer one was written.
+    for (replaced_at, _), (_, old) in zip(dated, dated[1:]):
+        if old == keep or replaced_at > cutoff:
+            continue
+        for stale in (old, old.with_name(old.name + GZIP_SUFFIX)):
+            try:
+                stale.unlink(missing_ok=True)
+            except OSError:
+                # Still open elsewhere (Windows); removed on a later run.
+                pass
@@ -0,0 +1,104 @@
+import csv
+import io
+from collections.abc import Iterable, Iterator
+
+from .models import EmpComplianceTracker, EmpCtcInfo, EmpMaster
+from .queries import current_ctc_level, current_ctc_title
+
+# Rows fetched per database round-trip while streaming a report.
+CHUNK_SIZE = 2000
+# Rows encoded into a single chunk of the HTTP response body.
+ROWS_PER_WRITE = 500
+
+
+def _headcount_rows() -> Iterator[list]:
+    yield ['Emp ID', 'First Name', 'Last Name', 'Role', 'Level', 'Start Date', 'End Date', 'Status']
+    rows = (
+        EmpMaster.objects.annotate(role=current_ctc_title(), level=current_ctc_level())
+        .values_list('emp_id', 'first_name', 'last_name', 'role', 'level', 'start_date', 'end_date')
+        .order_by('emp_id')
+    )
+    for emp_id, first, last, role, level, start, end in rows.iterator(chunk_size=CHUNK_SIZE):
+        status = 'Active' if end is None else 'Exited'
+        yield [emp_id, first, last, role or 'N/A', level or 'N/A', start, end or '', status]
+
+
+def _joiners_leavers_rows() -> Iterator[list]:
+    yield ['Emp ID', 'Name', 'Type', 'Date']
+    joiners = EmpMaster.objects.values_list('emp_id', 'first_name', 'last_name', 'start_date').order_by('-start_date')
+    for emp_id, first, last, start in joiners.iterator(chunk_size=CHUNK_SIZE):
+        yield [emp_id, f"{first} {last}", 'Joiner', start]
+    leavers = (
+        EmpMaster.objects.exclude(end_date__isnull=True)
+        .values_list('emp_id', 'first_name', 'last_name', 'end_date')
+        .order_by('-end_date')
+    )
+    for emp_id, first, last, end in leavers.iterator(chunk_size=CHUNK_SIZE):
+        yield [emp_id, f"{first} {last}", 'Leaver', end]
+
+
+def _ctc_rows() -> Iterator[list]:
+    yield ['Emp ID', 'Name', 'Role', 'Level', 'CTC Amount', 'Start Date', 'End Date']
+    rows = EmpCtcInfo.objects.values_list(
+        'emp_id', 'emp__first_name', 'emp__last_name', 'ext_title',
+        'main_level', 'sub_level', 'ctc_amt', 'start_of_ctc', 'end_of_ctc',
+    ).order_by('-ctc_amt')
+    for emp_id, first, last, title, main, sub, amt, start, end in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield [emp_id, f"{first} {last}", title, f"L{main}{sub}", amt, start, end or 'Current']
+
+
+def _compliance_rows() -> Iterator[list]:
+    yield ['Emp ID', 'Name', 'Compliance Type', 'Status', 'Document URL']
+    rows = EmpComplianceTracker.objects.values_list(
+        'emp_id', 'emp__first_name', 'emp__last_name', 'comp_type', 'status', 'doc_url',
+    )
+    for emp_id, first, last, comp_type, status, doc_url in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield [emp_id, f"{first} {last}", comp_type, status, doc_url or '']
+
+
+# (name, description, slug) as listed on the Reports & Analytics page.
+REPORT_CATALOG = [
+    ('Headcount Report', 'Breakdown by Level & Role', 'headcount'),
+    ('Joiners & Leavers', 'Monthly movement tracking', 'joiners-leavers'),
+    ('CTC Distribution', 'Salary band analysis', 'ctc'),
+    ('Compliance Status', 'Audit ready compliance report', 'compliance'),
+]
+
+# slug -> (download filename, row generator)
+REPORTS = {
+    'headcount': ('headcount_report.csv', _headcount_rows),
+    'joiners-leavers': ('joiners_leavers_report.csv', _joiners_leavers_rows),
+    'ctc': ('ctc_distribution_report.csv', _ctc_rows),
+    'compliance': ('compliance_status_report.csv', _compliance_rows),
+}
+
+# slug -> tables the report reads; their data versions decide when a
+# generated file is stale (see report_jobs).
+REPORT_TABLES = {
+    'headcount': (EmpMaster, EmpCtcInfo),
+    'joiners-leavers': (EmpMaster,),
+    'ctc': (EmpCtcInfo, EmpMaster),
+    'compliance': (EmpComplianceTracker, EmpMaster),
+}
+
+
+def encode_csv(rows: Iterable[list]) -> Iterator[str]:
+    """Encode rows as CSV text, yielding one chunk per ``ROWS_PER_WRITE`` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= ROWS_PER_WRITE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
+def iter_report_csv(slug: str) -> Iterator[str]:
+    _, rows = REPORTS[slug]
+    return encode_csv(rows())
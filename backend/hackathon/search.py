@@ -0,0 +1,296 @@
+import heapq
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from .changes import current_seq
+from .models import ChangeLogEntry, EmpCtcInfo, EmpMaster
+from .queries import current_ctc_title
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r'[^\W_]+')
+
+# Token kinds, also used as ranking weights (higher ranks first).
+_NAME = 1
+_TITLE = 0
+
+# Recent result pages kept per index; typeahead traffic repeats short prefixes.
+RESULT_CACHE_SIZE = 1024
+
+# More change-log entries than this since the last sync: rebuild instead.
+MAX_CATCH_UP = 2000
+
+
+@dataclass(frozen=True)
+class EmployeeDoc:
+    emp_id: int
+    first_name: str
+    last_name: str
+    title: str | None
+    active: bool
+
+    def as_dict(self) -> dict:
+        return {
+            'emp_id': self.emp_id,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'title': self.title,
+            'active': self.active,
+        }
+
+
+def _tokens(text: str | None) -> list[str]:
+    return _TOKEN_RE.findall((text or '').lower())
+
+
+def _doc_tokens(doc: EmployeeDoc) -> dict[str, int]:
+    """Map each searchable token of ``doc`` to its kind (name beats title)."""
+    tokens = {token: _TITLE for token in _tokens(doc.title)}
+    tokens.update((token, _NAME) for token in _tokens(f'{doc.first_name} {doc.last_name}'))
+    return tokens
+
+
+def _trigrams(token: str) -> set[str]:
+    padded = f'  {token} '
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class EmployeeSearchIndex:
+    """In-memory prefix + trigram index over employee names and current titles.
+
+    Prefix matches walk a sorted vocabulary of tokens with ``bisect`` and read
+    each token's postings; when nothing matches by prefix, the trigram index
+    gives typo-tolerant results. ``upsert``/``remove`` change single
+    employees without a rebuild; every change also drops the small cache of
+    recent result pages. ``seq`` is the change-log position the index
+    reflects (see ``get_employee_index``).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._docs: dict[int, EmployeeDoc] = {}
+        self._vocab: list[str] = []
+        self._postings: dict[str, dict[int, int]] = {}
+        self._trigrams: dict[str, set[int]] = {}
+        self._results: OrderedDict[tuple, list[EmployeeDoc]] = OrderedDict()
+        self._loaded = False
+        self.seq = 0
+        self.built_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def build(self, docs, *, seq: int = 0) -> None:
+        by_id = {}
+        postings: dict[str, dict[int, int]] = {}
+        trigrams: dict[str, set[int]] = {}
+        for doc in docs:
+            by_id[doc.emp_id] = doc
+            for token, kind in _doc_tokens(doc).items():
+                postings.setdefault(token, {})[doc.emp_id] = kind
+                for tri in _trigrams(token):
+                    trigrams.setdefault(tri, set()).add(doc.emp_id)
+        with self._lock:
+            self._docs = by_id
+            self._postings = postings
+            self._vocab = sorted(postings)
+            self._trigrams = trigrams
+            self._results.clear()
+            self._loaded = True
+            self.seq = seq
+            self.built_at = time.monotonic()
+
+    def upsert(self, doc: EmployeeDoc) -> None:
+        with self._lock:
+            self._remove_locked(doc.emp_id)
+            self._results.clear()
+            self._docs[doc.emp_id] = doc
+            for token, kind in _doc_tokens(doc).items():
+                posting = self._postings.get(token)
+                if posting is None:
+                    posting = self._postings[token] = {}
+                    insort(self._vocab, token)
+                posting[doc.emp_id] = kind
+                for tri in _trigrams(token):
+                    self._trigrams.setdefault(tri, set()).add(doc.emp_id)
+
+    def remove(self, emp_id: int) -> None:
+        with self._lock:
+            self._remove_locked(emp_id)
+            self._results.clear()
+
+    def get(self, emp_id: int) -> EmployeeDoc | None:
+        return self._docs.get(emp_id)
+
+    def search(self, query: str, *, limit: int = 20, active: bool | None = None) -> list[EmployeeDoc]:
+        terms = _tokens(query)
+        if not terms:
+            return []
+        cache_key = (tuple(terms), limit, active)
+        with self._lock:
+            cached = self._results.get(cache_key)
+            if cached is not None:
+                self._results.move_to_end(cache_key)
+                return cached
+            scores = self._prefix_scores(terms)
+            if not scores:
+                scores = self._trigram_scores(terms)
+            docs = self._docs
+            if active is not None:
+                scores = {emp_id: score for emp_id, score in scores.items() if docs[emp_id].active == active}
+            # Only the best-scoring employees can make the page; rank just those.
+            cutoff = heapq.nlargest(limit, scores.values())
+            floor = cutoff[-1] if cutoff else 0
+            ranked = sorted(
+                (docs[emp_id] for emp_id, score in scores.items() if score >= floor),
+                key=lambda doc: (
+                    -scores[doc.emp_id],
+                    not doc.active,
+                    doc.first_name.lower(),
+                    doc.last_name.lower(),
+                    doc.emp_id,
+                ),
+            )[:limit]
+            self._results[cache_key] = ranked
+            if len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return ranked
+
+    def _remove_locked(self, emp_id: int) -> None:
+        old = self._docs.pop(emp_id, None)
+        if old is None:
+            return
+        for token in _doc_tokens(old):
+            posting = self._postings.get(token)
+            if posting is not None:
+                posting.pop(emp_id, None)
+                if not posting:
+                    del self._postings[token]
+                    i = bisect_left(self._vocab, token)
+                    if i < len(self._vocab) and self._vocab[i] == token:
+                        del self._vocab[i]
+            for tri in _trigrams(token):
+                ids = self._trigrams.get(tri)
+                if ids is not None:
+                    ids.discard(emp_id)
+                    if not ids:
+                        del self._trigrams[tri]
+
+    def _prefix_scores(self, terms: list[str]) -> dict[int, int]:
+        # Every term has to prefix-match some token of the employee. Per term,
+        # an exact name token scores 4, a name prefix 3, title exact/prefix 2/1.
+        scores: dict[int, int] | None = None
+        vocab = self._vocab
+        for term in terms:
+            best: dict[int, int] = {}
+            i = bisect_left(vocab, term)
+            while i < len(vocab) and vocab[i].startswith(term):
+                token = vocab[i]
+                bonus = 1 + (token == term)
+                for emp_id, kind in self._postings[token].items():
+                    points = kind * 2 + bonus
+                    if points > best.get(emp_id, 0):
+                        best[emp_id] = points
+                i += 1
+            if scores is None:
+                scores = best
+            else:
+                scores = {emp_id: score + best[emp_id] for emp_id, score in scores.items() if emp_id in best}
+            if not scores:
+                return {}
+        return scores or {}
+
+    def _trigram_scores(self, terms: list[str], threshold: float = 0.5) -> dict[int, int]:
+        grams = set()
+        for term in terms:
+            if len(term) >= 3:
+                grams |= _trigrams(term)
+        if not grams:
+            return {}
+        hits = Counter()
+        for tri in grams:
+            hits.update(self._trigrams.get(tri, ()))
+        needed = threshold * len(grams)
+        return {emp_id: count for emp_id, count in hits.items() if count >= needed}
+
+
+def _load_docs(emp_ids=None):
+    rows = EmpMaster.objects.annotate(title=current_ctc_title())
+    if emp_ids is not None:
+        rows = rows.filter(emp_id__in=emp_ids)
+    rows = rows.values_list('emp_id', 'first_name', 'last_name', 'title', 'end_date').iterator(chunk_size=2000)
+    for emp_id, first, last, title, end in rows:
+        yield EmployeeDoc(emp_id, first, last, title, end is None)
+
+
+employee_index = EmployeeSearchIndex()
+_build_lock = threading.Lock()
+
+
+def _rebuild(index: EmployeeSearchIndex) -> None:
+    # Read the position first: changes made during the load are replayed.
+    index.build(_load_docs(), seq=current_seq())
+
+
+def _catch_up(index: EmployeeSearchIndex) -> bool:
+    """Apply change-log entries after ``index.seq``; False if there are too many."""
+    entries = list(
+        ChangeLogEntry.objects.filter(seq__gt=index.seq).order_by('seq')
+        .values_list('seq', 'table', 'row_id')[:MAX_CATCH_UP + 1]
+    )
+    if not entries:
+        return True
+    if len(entries) > MAX_CATCH_UP:
+        return False
+    emp_ids = {row_id for _, table, row_id in entries if table == EmpMaster._meta.db_table}
+    ctc_ids = [row_id for _, table, row_id in entries if table == EmpCtcInfo._meta.db_table]
+    if ctc_ids:
+        emp_ids.update(EmpCtcInfo.objects.filter(pk__in=ctc_ids).values_list('emp_id', flat=True))
+    found = set()
+    for doc in _load_docs(emp_ids) if emp_ids else ():
+        index.upsert(doc)
+        found.add(doc.emp_id)
+    for emp_id in emp_ids - found:
+        index.remove(emp_id)
+    index.seq = max(index.seq, entries[-1][0])
+    return True
+
+
+def get_employee_index() -> EmployeeSearchIndex:
+    """Return the process-wide index, up to date with the database.
+
+    The first call loads it; later calls apply the change-log entries
+    written since (by any process), so a search costs one small query when
+    nothing changed. It is rebuilt after ``SEARCH_INDEX_TTL`` seconds to
+    pick up writes that bypass the change log.
+    """
+    index = employee_index
+    ttl = getattr(settings, 'SEARCH_INDEX_TTL', 300)
+    if index.loaded and time.monotonic() - index.built_at < ttl and _catch_up(index):
+        return index
+    with _build_lock:
+        if not index.loaded or time.monotonic() - index.built_at >= ttl or not _catch_up(index):
+            _rebuild(index)
+    return index
+
+
+def warm_employee_index() -> None:
+    """Load the index in the background at startup (see ``HackathonConfig``)."""
+    try:
+        get_employee_index()
+    except DatabaseError:
+        logger.exception('Could not load the employee search index at startup')
+    finally:
+        connections.close_all()
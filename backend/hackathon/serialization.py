@@ -0,0 +1,49 @@
+"""JSON encoding for the list endpoints.
+
+``dumps`` uses orjson when it is installed and falls back to the stdlib
+encoder otherwise; both go through ``DjangoJSONEncoder`` for the types
+orjson leaves to us (datetimes, decimals, UUIDs), so the output decodes to
+the same values either way. Set ``JSON_BACKEND=json`` to force the stdlib.
+"""
+import json
+from collections.abc import Iterable, Sequence
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+ROWS = 'rows'
+COLUMNS = 'columns'
+FORMATS = (ROWS, COLUMNS)
+
+_django_default = DjangoJSONEncoder().default
+
+
+def dumps(data) -> bytes:
+    if orjson is not None and getattr(settings, 'JSON_BACKEND', 'auto') != 'json':
+        return orjson.dumps(data, default=_django_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+class FastJsonResponse(HttpResponse):
+    """``JsonResponse`` encoded with ``dumps``."""
+
+    def __init__(self, data, **kwargs) -> None:
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
+
+
+def tabulate(fields: Sequence[str], values: Iterable[tuple], fmt: str) -> list[dict] | dict[str, list]:
+    """Shape row tuples as a list of objects (``rows``) or as column arrays
+    keyed by field name (``columns``), which repeat no keys."""
+    if fmt == COLUMNS:
+        rows = list(values)
+        if not rows:
+            return {field: [] for field in fields}
+        return {field: list(column) for field, column in zip(fields, zip(*rows))}
+    return [dict(zip(fields, row)) for row in values]
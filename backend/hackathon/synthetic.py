@@ -0,0 +1,180 @@
+"""Synthetic HR data for benchmarks and tests.
+
+The emp_* tables are unmanaged, so ``create_tables`` builds them (plus the
+foreign-key indexes MySQL would create implicitly) on whatever database is
+configured, typically the in-memory SQLite fallback. ``generate`` fills
+them deterministically for a given seed, inserting in batches so memory
+stays flat even at a million employees.
+"""
+import random
+import string
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.db import connection
+from django.db.models import Index
+
+from .models import EmpBankInfo, EmpComplianceTracker, EmpCtcInfo, EmpMaster, EmpRegInfo
+
+TABLES = (EmpMaster, EmpCtcInfo, EmpComplianceTracker, EmpRegInfo, EmpBankInfo)
+
+FIRST_NAMES = (
+    'Aarav', 'Aditi', 'Ananya', 'Arjun', 'Diya', 'Ishaan', 'Kavya', 'Krishna', 'Meera', 'Neha',
+    'Nikhil', 'Priya', 'Rahul', 'Riya', 'Rohan', 'Sanjay', 'Sneha', 'Tanvi', 'Varun', 'Vikram',
+)
+LAST_NAMES = (
+    'Agarwal', 'Bhat', 'Chopra', 'Das', 'Gupta', 'Iyer', 'Jain', 'Kapoor', 'Kumar', 'Menon',
+    'Mehta', 'Nair', 'Patel', 'Rao', 'Reddy', 'Shah', 'Sharma', 'Singh', 'Verma', 'Yadav',
+)
+# (external title, internal title), ordered by seniority.
+TITLES = (
+    ('Associate', 'assoc'),
+    ('Engineer', 'eng'),
+    ('Senior Engineer', 'sr_eng'),
+    ('Lead Engineer', 'lead'),
+    ('Engineering Manager', 'em'),
+    ('Director', 'dir'),
+)
+COMPLIANCE_TYPES = ('PAN Card', 'Aadhaar', 'Offer Letter', 'Background Check', 'Bank Proof', 'NDA')
+COMPLIANCE_STATUSES = ('Verified', 'Completed', 'Pending', 'Rejected')
+BANKS = (('HDFC Bank', 'HDFC'), ('ICICI Bank', 'ICIC'), ('State Bank of India', 'SBIN'), ('Axis Bank', 'UTIB'))
+BRANCHES = ('Bengaluru', 'Chennai', 'Hyderabad', 'Mumbai', 'Pune')
+
+# Fraction of employees who have left, and who have reg/bank details.
+EXIT_RATE = 0.18
+DETAILS_RATE = 0.9
+
+
+@dataclass
+class GeneratedCounts:
+    employees: int = 0
+    ctc_rows: int = 0
+    compliance_rows: int = 0
+    reg_rows: int = 0
+    bank_rows: int = 0
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+def create_tables() -> None:
+    """Create the emp_* tables that do not exist yet."""
+    with connection.cursor() as cursor:
+        existing = set(connection.introspection.table_names(cursor))
+    with connection.schema_editor() as editor:
+        for model in TABLES:
+            if model._meta.db_table in existing:
+                continue
+            editor.create_model(model)
+            for field in model._meta.concrete_fields:
+                if field.many_to_one:
+                    editor.add_index(model, Index(fields=[field.name], name=f'{model._meta.db_table}_{field.column}_fk'))
+
+
+def clear_tables() -> None:
+    for model in reversed(TABLES):
+        model.objects.all().delete()
+
+
+def _pan(emp_id: int) -> str:
+    letters = []
+    n = emp_id
+    for _ in range(5):
+        n, r = divmod(n, 26)
+        letters.append(string.ascii_uppercase[r])
+    return ''.join(letters) + f'{emp_id % 10000:04d}' + string.ascii_uppercase[emp_id % 26]
+
+
+def generate(employees: int, *, seed: int = 1, batch_size: int = 5000, today: date | None = None) -> GeneratedCounts:
+    """Insert ``employees`` synthetic employees with CTC history, compliance,
+    registration and bank rows. IDs start at 1, so call on empty tables."""
+    rnd = random.Random(seed)
+    today = today or date.today()
+    counts = GeneratedCounts()
+    batches: dict = {model: [] for model in TABLES}
+    ctc_id = doc_id = 1
+
+    def flush(force: bool = False) -> None:
+        # Parents first so foreign keys always resolve.
+        for model in TABLES:
+            rows = batches[model]
+            if rows and (force or len(rows) >= batch_size):
+                model.objects.bulk_create(rows, batch_size=batch_size)
+                rows.clear()
+
+    horizon = (today - date(2012, 1, 1)).days
+    for emp_id in range(1, employees + 1):
+        start = date(2012, 1, 1) + timedelta(days=rnd.randint(0, horizon - 30))
+        end = None
+        if rnd.random() < EXIT_RATE:
+            # Some leavers are still serving notice.
+            end = start + timedelta(days=rnd.randint(30, max(31, (today - start).days + 60)))
+        batches[EmpMaster].append(EmpMaster(
+            emp_id=emp_id,
+            first_name=rnd.choice(FIRST_NAMES),
+            middle_name=rnd.choice(FIRST_NAMES) if rnd.random() < 0.2 else None,
+            last_name=rnd.choice(LAST_NAMES),
+            start_date=start,
+            end_date=end,
+        ))
+        counts.employees += 1
+
+        # One CTC row per year of tenure (at most five), each a promotion.
+        level = rnd.randint(0, 2)
+        amount = rnd.randint(4, 12) * 100_000
+        last_day = min(end or today, today)
+        changes = max(1, min(5, (last_day - start).days // 365 + 1))
+        for n in range(changes):
+            ext_title, int_title = TITLES[min(level, len(TITLES) - 1)]
+            batches[EmpCtcInfo].append(EmpCtcInfo(
+                emp_ctc_id=ctc_id,
+                emp_id=emp_id,
+                int_title=int_title,
+                ext_title=ext_title,
+                main_level=min(level, len(TITLES) - 1) + 1,
+                sub_level=rnd.choice('ABC'),
+                start_of_ctc=start + timedelta(days=365 * n),
+                end_of_ctc=(start + timedelta(days=365 * (n + 1) - 1)) if n < changes - 1 else end,
+                ctc_amt=amount,
+            ))
+            ctc_id += 1
+            counts.ctc_rows += 1
+            level += rnd.random() < 0.6
+            amount = int(amount * rnd.uniform(1.05, 1.3))
+
+        for comp_type in rnd.sample(COMPLIANCE_TYPES, rnd.randint(0, len(COMPLIANCE_TYPES))):
+            batches[EmpComplianceTracker].append(EmpComplianceTracker(
+                emp_compliance_tracker_id=doc_id,
+                emp_id=emp_id,
+                comp_type=comp_type,
+                status=rnd.choices(COMPLIANCE_STATUSES, weights=(6, 2, 3, 1))[0],
+                doc_url=f'https://docs.example.com/{emp_id}/{doc_id}.pdf',
+            ))
+            doc_id += 1
+            counts.compliance_rows += 1
+
+        if rnd.random() < DETAILS_RATE:
+            batches[EmpRegInfo].append(EmpRegInfo(
+                emp_reg_info_id=emp_id,
+                emp_id=emp_id,
+                pan=_pan(emp_id),
+                aadhaar=f'{500000000000 + emp_id:012d}',
+                uan_epf_acctno=f'UAN{emp_id:012d}',
+                esi=f'ESI{emp_id:017d}',
+            ))
+            counts.reg_rows += 1
+            bank_name, ifsc_prefix = rnd.choice(BANKS)
+            batches[EmpBankInfo].append(EmpBankInfo(
+                emp_bank_id=emp_id,
+                emp_id=emp_id,
+                bank_acct_no=f'{10_000_000_000 + emp_id:014d}',
+                ifsc_code=f'{ifsc_prefix}0{rnd.randint(0, 999999):06d}',
+                branch_name=rnd.choice(BRANCHES),
+                bank_name=bank_name,
+            ))
+            counts.bank_rows += 1
+
+        if emp_id % batch_size == 0:
+            flush()
+    flush(force=True)
+    return counts
@@ -1,3 +1,1414 @@
-from django.test import TestCase
+"""Tests for the hackathon app; run with ``python manage.py test hackathon``.
 
-# Create your tests here.
+``QueryCountTests`` is the query-count regression guard: every route in
+hackathon/urls.py is called against synthetic data at two scales. A view
+passes when it stays within its query budget, runs the same number of
+queries at both scales (no per-row queries) and never repeats a SQL
+statement within one request. The other classes test one feature each.
+"""
+import asyncio
+import csv
+import gzip
+import http.client
+import io
+import itertools
+import json
+import os
+import pstats
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import urllib.parse
+import warnings
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.models import F
+from django.http import HttpResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, resolve
+
+from . import (
+    auth, caching, changes, ids, importer, metrics, profiling, replicas, report_jobs, reports, search, synthetic, views,
+)
+from .auth import create_signed_session
+from .http_client import PooledHttpClient
+from .middleware import CompressionMiddleware, InstrumentationMiddleware
+from .metrics import render_prometheus
+from .models import ChangeLogEntry, DataVersion, EmpComplianceTracker, EmpCtcInfo, EmpMaster, EmpRegInfo, IdAllocation
+from .reports import REPORTS
+
+# Employee counts of the two runs; the larger must have several times the rows.
+SCALES = (12, 60)
+
+# Routes not exercised here: they call the external auth service, serve
+# files from disk without touching the database or stream events (ASGI only).
+UNGUARDED_ROUTES = {
+    'api_login', 'api_register', 'api_forgot_password', 'api_otp_request', 'api_otp_verify', 'frontend_asset',
+    'events',
+}
+
+
+@dataclass
+class Endpoint:
+    name: str
+    route: str
+    path: str
+    max_queries: int
+    method: str = 'get'
+    params: dict | None = None
+    # Called with the employee count; returns the JSON body for POSTs.
+    body: object = None
+    auth: bool = False
+
+
+def _bulk_rows(employees: int) -> list[dict]:
+    return [
+        {'first_name': 'Bulk', 'last_name': f'Row{n}', 'start_date': '2024-04-01',
+         'ctc': {'int_title': 'eng', 'ext_title': 'Engineer', 'main_level': 2, 'sub_level': 'A', 'ctc_amt': 900000}}
+        for n in range(10)
+    ]
+
+
+ENDPOINTS = [
+    Endpoint('health', 'health', '/', 0),
+    Endpoint('metrics', 'metrics', '/metrics', 0),
+    Endpoint('home', 'api_home', '/api/home', 0, auth=True),
+    Endpoint('logout', 'api_logout', '/api/logout', 0, method='post', body=lambda n: {}),
+    Endpoint('batch', 'batch', '/api/batch', 4, method='post', body=lambda n: {'requests': [
+        {'id': 'employees', 'path': '/api/employees'}, {'id': 'compliance', 'path': '/api/compliance'},
+    ]}),
+    Endpoint('employees', 'employee_list', '/api/employees', 2),
+    Endpoint('employees_page', 'employee_list', '/api/employees', 2, params={'limit': 5, 'sort': '-start_date'}),
+    Endpoint('employee_search', 'employee_search', '/api/employees/search', 2, params={'q': 'pri eng'}),
+    Endpoint('employee_profile', 'employee_profile', '/api/employees/1', 5, auth=True),
+    Endpoint('employee_add', 'employee_add', '/api/employees/add', 8, method='post',
+             body=lambda n: {'first_name': 'Test', 'last_name': 'Add', 'start_date': '2024-04-01'}),
+    Endpoint('employee_bulk', 'employee_bulk_import', '/api/employees/bulk', 9, method='post', body=_bulk_rows, auth=True),
+    Endpoint('compliance', 'compliance_list', '/api/compliance', 2),
+    Endpoint('onboarding', 'onboarding_list', '/api/onboarding', 2),
+    Endpoint('job_history', 'job_history_list', '/api/job-history', 2),
+    Endpoint('job_history_page', 'job_history_list', '/api/job-history', 2, params={'limit': 5}),
+    Endpoint('exit_workflow', 'exit_workflow_list', '/api/exit-workflow', 2),
+    Endpoint('reports', 'reports', '/api/reports', 2),
+    Endpoint('report_stats', 'report_stats', '/api/reports/stats', 5),
+    Endpoint('initiate_exit', 'initiate_exit', '/api/initiate-exit', 6, method='post',
+             body=lambda n: {'emp_id': n // 2, 'end_date': (date.today() + timedelta(days=30)).isoformat()}),
+    # After the writes above, so the log has rows to return.
+    Endpoint('changes', 'changes', '/api/changes', 3, params={'since': 0}),
+    Endpoint('changes_seq', 'changes', '/api/changes', 1),
+] + [
+    Endpoint(f'report_download_{slug}', 'report_download', f'/api/reports/download/{slug}',
+             3 if slug == 'joiners-leavers' else 2)
+    for slug in REPORTS
+]
+
+
+def _route_names(patterns) -> set[str]:
+    names = set()
+    for pattern in patterns:
+        if hasattr(pattern, 'url_patterns'):
+            names |= _route_names(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+_SAVEPOINT_RE = re.compile(r'(RELEASE |ROLLBACK TO )?SAVEPOINT ')
+
+
+def _statement(sql: str) -> str:
+    # Literal values differ per row in an N+1 loop; compare the statement shape.
+    return re.sub(r"'[^']*'|\b\d+\b", '?', sql)
+
+
+class EmpTablesTestCase(TestCase):
+    """Creates the unmanaged emp_* tables for the class."""
+
+    @classmethod
+    def setUpClass(cls):
+        # SQLite cannot change the schema inside the test transaction.
+        synthetic.create_tables()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            for model in reversed(synthetic.TABLES):
+                editor.delete_model(model)
+
+    def setUp(self):
+        cache.clear()
+
+
+class QueryCountTests(EmpTablesTestCase):
+    """Query counts per endpoint must not depend on the number of rows."""
+
+    @classmethod
+    def setUpClass(cls):
+        # Reports are generated inline so their queries are counted here.
+        report_dir = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, report_dir, ignore_errors=True)
+        cls.enterClassContext(override_settings(REPORT_WORKERS=0, REPORT_DIR=report_dir))
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        token, _ = create_signed_session(payload={'username': 'test@example.com', 'display_name': 'Test'})
+        self.auth_headers = {'Authorization': f'Bearer {token}'}
+
+    def _queries(self, endpoint: Endpoint, employees: int) -> list[str]:
+        cache.clear()
+        headers = self.auth_headers if endpoint.auth else {}
+        with CaptureQueriesContext(connection) as captured:
+            if endpoint.method == 'get':
+                response = self.client.get(endpoint.path, endpoint.params or {}, headers=headers)
+            else:
+                response = self.client.post(
+                    endpoint.path, endpoint.body(employees), content_type='application/json', headers=headers,
+                )
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400, f'{endpoint.name}: HTTP {response.status_code}')
+        # Savepoints come from the test transaction, not the view.
+        return [query['sql'] for query in captured.captured_queries if not _SAVEPOINT_RE.match(query['sql'])]
+
+    def _run_scale(self, employees: int) -> dict[str, list[str]]:
+        synthetic.clear_tables()
+        # The change-log counter is created by its migration; keep it.
+        IdAllocation.objects.exclude(name=changes.SEQ_COUNTER).delete()
+        ChangeLogEntry.objects.all().delete()
+        for allocator in (ids.emp_id_allocator, ids.emp_ctc_id_allocator,
+                          ids.emp_reg_info_id_allocator, ids.emp_bank_id_allocator):
+            allocator.reset()
+        synthetic.generate(employees, seed=employees)
+        # A fresh search index so the first search loads it at this scale.
+        with mock.patch.object(search, 'employee_index', search.EmployeeSearchIndex()):
+            return {endpoint.name: self._queries(endpoint, employees) for endpoint in ENDPOINTS}
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        small, large = (self._run_scale(employees) for employees in SCALES)
+        for endpoint in ENDPOINTS:
+            with self.subTest(endpoint.name):
+                counts = (len(small[endpoint.name]), len(large[endpoint.name]))
+                self.assertLessEqual(max(counts), endpoint.max_queries, f'query budget exceeded: {counts}')
+                self.assertEqual(counts[0], counts[1], f'query count grows with rows: {counts}')
+                repeated = [
+                    sql for sql, count in Counter(map(_statement, large[endpoint.name])).items() if count > 1
+                ]
+                self.assertEqual(repeated, [], 'statement repeated within one request (per-row query?)')
+
+    def test_every_route_is_guarded(self):
+        routes = _route_names(get_resolver().url_patterns)
+        guarded = {endpoint.route for endpoint in ENDPOINTS}
+        self.assertEqual(sorted(routes - guarded - UNGUARDED_ROUTES), [])
+
+
+class KeysetPaginationTests(EmpTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        synthetic.generate(40, seed=3)
+
+    def _pages(self, path: str, key: str, params: dict) -> list[dict]:
+        rows, cursor = [], None
+        while True:
+            page = self.client.get(path, {**params, **({'cursor': cursor} if cursor else {})}).json()
+            self.assertLessEqual(len(page[key]), params['limit'])
+            rows += page[key]
+            cursor = page['next_cursor']
+            if cursor is None:
+                return rows
+
+    def test_employee_pages_match_unpaged_list(self):
+        for params in ({'sort': 'emp_id'}, {'sort': '-start_date'}, {'sort': 'start_date', 'status': 'active'}):
+            with self.subTest(**params):
+                full = self.client.get('/api/employees', params).json()['employees']
+                self.assertEqual(self._pages('/api/employees', 'employees', {**params, 'limit': 7}), full)
+
+    def test_job_history_pages_match_unpaged_list(self):
+        full = self.client.get('/api/job-history').json()['job_history']
+        self.assertGreater(len(full), 40)
+        self.assertEqual(self._pages('/api/job-history', 'job_history', {'limit': 9}), full)
+
+    def test_last_page_has_no_cursor(self):
+        page = self.client.get('/api/employees', {'limit': 40}).json()
+        self.assertEqual(len(page['employees']), 40)
+        self.assertIsNone(page['next_cursor'])
+
+    def test_invalid_or_tampered_cursor_is_rejected(self):
+        cursor = self.client.get('/api/employees', {'limit': 5}).json()['next_cursor']
+        tampered = cursor[:-2] + ('AA' if not cursor.endswith('AA') else 'BB')
+        for bad in ('garbage', tampered):
+            response = self.client.get('/api/employees', {'limit': 5, 'cursor': bad})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['error'], 'Invalid cursor.')
+
+    def test_cursor_is_bound_to_its_sort(self):
+        cursor = self.client.get('/api/employees', {'limit': 5, 'sort': 'emp_id'}).json()['next_cursor']
+        response = self.client.get('/api/employees', {'limit': 5, 'sort': '-start_date', 'cursor': cursor})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('sort', response.json()['error'])
+
+    def test_filter_change_continues_after_the_cursor_key(self):
+        first = self.client.get('/api/employees', {'limit': 5, 'status': 'active'}).json()
+        last_id = first['employees'][-1]['emp_id']
+        rest = self._pages('/api/employees', 'employees', {'limit': 5, 'cursor': first['next_cursor']})
+        full = self.client.get('/api/employees').json()['employees']
+        self.assertEqual(rest, [row for row in full if row['emp_id'] > last_id])
+
+    def test_invalid_limit_is_rejected(self):
+        for limit in ('0', '-1', 'ten', '100000'):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.client.get('/api/employees', {'limit': limit}).status_code, 400)
+
+
+class SearchIndexTests(EmpTablesTestCase):
+    def _index(self, *docs: search.EmployeeDoc) -> search.EmployeeSearchIndex:
+        index = search.EmployeeSearchIndex()
+        index.build(docs)
+        return index
+
+    def test_prefix_ranking(self):
+        index = self._index(
+            search.EmployeeDoc(1, 'Priya', 'Shah', 'Engineer', True),
+            search.EmployeeDoc(2, 'Prisha', 'Rao', 'Engineer', True),
+            search.EmployeeDoc(3, 'Anil', 'Pri', 'Engineer', False),
+            search.EmployeeDoc(4, 'Meera', 'Iyer', 'Principal Analyst', True),
+        )
+        # Exact name token, then name prefixes (active first), then title prefix.
+        self.assertEqual([doc.emp_id for doc in index.search('pri')], [3, 2, 1, 4])
+        self.assertEqual([doc.emp_id for doc in index.search('pri eng')], [3, 2, 1])
+        self.assertEqual([doc.emp_id for doc in index.search('pri', active=True, limit=2)], [2, 1])
+
+    def test_trigram_fallback_for_typos(self):
+        index = self._index(
+            search.EmployeeDoc(1, 'Priyanka', 'Shah', None, True),
+            search.EmployeeDoc(2, 'Rahul', 'Mehta', None, True),
+        )
+        self.assertEqual([doc.emp_id for doc in index.search('priyanak')], [1])
+        self.assertEqual(index.search('zzzz'), [])
+
+    def test_upsert_and_remove(self):
+        index = self._index(search.EmployeeDoc(1, 'Priya', 'Shah', 'Engineer', True))
+        self.assertEqual([doc.emp_id for doc in index.search('shah')], [1])
+        index.upsert(search.EmployeeDoc(1, 'Priya', 'Kapoor', 'Engineer', False))
+        self.assertEqual(index.search('shah'), [])
+        self.assertEqual([doc.active for doc in index.search('kapoor')], [False])
+        index.remove(1)
+        self.assertEqual(index.search('kapoor'), [])
+        self.assertIsNone(index.get(1))
+        self.assertEqual(len(index), 0)
+
+    def test_index_follows_the_change_log(self):
+        with mock.patch.object(search, 'employee_index', search.EmployeeSearchIndex()):
+            self.assertEqual(search.get_employee_index().search('zephyr'), [])
+            # Written as another worker would: only the database and change log change.
+            emp = EmpMaster.objects.create(emp_id=900001, first_name='Zephyr', last_name='Quill', start_date=date(2024, 1, 1))
+            changes.record({EmpMaster: [emp.emp_id]})
+            self.assertEqual([doc.emp_id for doc in search.get_employee_index().search('zephyr')], [900001])
+            EmpMaster.objects.filter(emp_id=900001).delete()
+            changes.record({EmpMaster: [900001]})
+            self.assertEqual(search.get_employee_index().search('zephyr'), [])
+
+    def test_index_is_rebuilt_after_its_ttl(self):
+        with mock.patch.object(search, 'employee_index', search.EmployeeSearchIndex()):
+            search.get_employee_index()
+            # Not in the change log: only a rebuild finds it.
+            EmpMaster.objects.create(emp_id=900002, first_name='Zephyr', last_name='Quill', start_date=date(2024, 1, 1))
+            self.assertEqual(search.get_employee_index().search('zephyr'), [])
+            with override_settings(SEARCH_INDEX_TTL=0):
+                self.assertEqual([doc.emp_id for doc in search.get_employee_index().search('zephyr')], [900002])
+
+
+class CacheCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _counts(self, key: str) -> dict[str, int]:
+        return caching.cache_counters().get(key, {'hit': 0, 'miss': 0})
+
+    def test_second_lookup_is_a_hit(self):
+        key = 'hackathon:test:counters'
+        before = self._counts(key)
+        build = mock.Mock(return_value={'n': 1})
+        self.assertEqual(caching.get_or_build(key, build), ({'n': 1}, False))
+        self.assertEqual(caching.get_or_build(key, build), ({'n': 1}, True))
+        build.assert_called_once()
+        after = self._counts(key)
+        self.assertEqual((after['hit'] - before['hit'], after['miss'] - before['miss']), (1, 1))
+
+    def test_counters_are_exported_per_key(self):
+        caching.get_or_build(caching.employee_key(1), lambda: {'emp_id': 1})
+        caching.get_or_build(caching.employee_key(2), lambda: {'emp_id': 2})
+        text = render_prometheus()
+        self.assertIn('# TYPE hackathon_cache_requests_total counter', text)
+        misses = self._counts(caching.EMPLOYEE_KEY)['miss']
+        self.assertIn(f'hackathon_cache_requests_total{{key="{caching.EMPLOYEE_KEY}",result="miss"}} {misses}', text)
+        self.assertNotIn(f'key="{caching.employee_key(1)}"', text)
+
+
+class VersionedCacheTests(EmpTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        EmpMaster.objects.create(emp_id=1, first_name='Asha', last_name='Rao', start_date=date(2024, 1, 1))
+
+    def setUp(self):
+        super().setUp()
+        token, _ = create_signed_session(payload={'username': 'test@example.com'})
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def _profile(self):
+        response = self.client.get('/api/employees/1', headers=self.headers)
+        return response['X-Cache'], response.json()['employee']['end_date']
+
+    def test_profile_after_an_update(self):
+        self.assertEqual(self._profile(), ('MISS', None))
+        self.assertEqual(self._profile(), ('HIT', None))
+        response = self.client.post(
+            '/api/initiate-exit', {'emp_id': 1, 'end_date': '2024-06-30'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._profile(), ('MISS', '2024-06-30'))
+
+    def test_write_by_another_worker(self):
+        self.client.get('/api/reports/stats')
+        self._profile()
+        # Nothing reaches this worker's cache; only the database changes.
+        with transaction.atomic():
+            EmpMaster.objects.filter(emp_id=1).update(end_date=date(2024, 6, 30))
+            caching.bump_data_version(EmpMaster)
+        self.assertEqual(self._profile(), ('MISS', '2024-06-30'))
+        self.assertEqual(self.client.get('/api/reports/stats').json()['exited_employees'], 1)
+
+
+class ChangesTests(EmpTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for emp_id in (1, 2):
+            EmpMaster.objects.create(emp_id=emp_id, first_name='Asha', last_name=str(emp_id), start_date=date(2024, 1, 1))
+        EmpCtcInfo.objects.create(
+            emp_ctc_id=7, emp_id=1, int_title='Engineer', ext_title='Engineer', main_level=1, sub_level='A',
+            start_of_ctc=date(2024, 1, 1), ctc_amt=100000,
+        )
+
+    def _changes(self, **params) -> dict:
+        response = self.client.get('/api/changes', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_repeated_changes_collapse_to_the_current_row(self):
+        since = self._changes()['seq']
+        for end_date in ('2024-06-30', '2024-07-31'):
+            self.client.post('/api/initiate-exit', {'emp_id': 1, 'end_date': end_date}, content_type='application/json')
+        with transaction.atomic():
+            changes.record({EmpMaster: [1, 2, 1]})
+
+        delta = self._changes(since=since)
+        self.assertEqual((delta['seq'], delta['has_more'], delta['deletes']), (since + 4, False, {}))
+        self.assertEqual(
+            [(row['emp_id'], row['end_date']) for row in delta['upserts']['emp_master']],
+            [(1, '2024-07-31'), (2, None)],
+        )
+        self.assertEqual(self._changes(since=delta['seq'])['upserts'], {})
+
+    def test_removed_rows_are_deletes(self):
+        since = self._changes()['seq']
+        with transaction.atomic():
+            changes.record({EmpCtcInfo: [7, 8], EmpMaster: [2]})
+            EmpCtcInfo.objects.filter(emp_ctc_id=7).delete()
+            EmpMaster.objects.filter(emp_id=2).update(last_name='Iyer')
+
+        delta = self._changes(since=since, format='columns')
+        self.assertEqual(delta['deletes'], {'emp_ctc_info': [7, 8]})
+        self.assertEqual(list(delta['upserts']), ['emp_master'])
+        self.assertEqual(
+            (delta['upserts']['emp_master']['emp_id'], delta['upserts']['emp_master']['last_name']), ([2], ['Iyer']),
+        )
+
+    def test_pages_follow_the_log(self):
+        since = self._changes()['seq']
+        with transaction.atomic():
+            changes.record({EmpMaster: [1, 2]})
+            changes.record({EmpMaster: [1]})
+
+        first = self._changes(since=since, limit=2)
+        self.assertEqual((first['seq'], first['has_more']), (since + 2, True))
+        self.assertEqual([row['emp_id'] for row in first['upserts']['emp_master']], [1, 2])
+        last = self._changes(since=first['seq'], limit=2)
+        self.assertEqual((last['seq'], last['has_more']), (since + 3, False))
+        self.assertEqual([row['emp_id'] for row in last['upserts']['emp_master']], [1])
+        self.assertEqual(self.client.get('/api/changes', {'since': 'x'}).status_code, 400)
+
+
+class ReportStatsTests(EmpTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for emp_id, end_date in ((1, None), (2, date(2024, 6, 30)), (3, None), (4, date(2024, 3, 31)), (5, None)):
+            EmpMaster.objects.create(
+                emp_id=emp_id, first_name='Asha', last_name=str(emp_id), start_date=date(2019, 1, 1), end_date=end_date,
+            )
+        # (emp_id, title, level, start, end); employee 4 has no CTC row.
+        timeline = (
+            (1, 'Intern', (0, 'B'), date(2019, 1, 1), date(2019, 12, 31)),
+            (1, 'Engineer', (1, 'A'), date(2020, 1, 1), None),
+            (2, 'Engineer', (1, 'A'), date(2020, 1, 1), None),
+            (3, 'Manager', (2, 'A'), date(2021, 1, 1), None),
+            # An ended row started later does not replace the open one.
+            (3, 'Consultant', (2, 'B'), date(2022, 1, 1), date(2022, 6, 30)),
+            # Only ended rows: the most recent one counts.
+            (5, 'Analyst', (1, 'B'), date(2019, 1, 1), date(2019, 12, 31)),
+            (5, 'Senior Analyst', (1, 'C'), date(2020, 1, 1), date(2020, 12, 31)),
+        )
+        for emp_ctc_id, (emp_id, title, (main, sub), start, end) in enumerate(timeline, start=1):
+            EmpCtcInfo.objects.create(
+                emp_ctc_id=emp_ctc_id, emp_id=emp_id, int_title=title, ext_title=title, main_level=main, sub_level=sub,
+                start_of_ctc=start, end_of_ctc=end, ctc_amt=100000,
+            )
+
+    @staticmethod
+    def _rows(columns: dict, *dimensions: str) -> dict:
+        keys = zip(*(columns[name] for name in dimensions))
+        return dict(zip(keys, zip(columns['headcount'], columns['active'], columns['exited'])))
+
+    def test_totals_and_breakdowns(self):
+        stats = self.client.get('/api/reports/stats').json()
+        self.assertEqual(
+            (stats['total_headcount'], stats['active_employees'], stats['exited_employees'], stats['attrition_rate']),
+            (5, 3, 2, 40.0),
+        )
+        self.assertEqual(self._rows(stats['by_level'], 'main_level', 'sub_level'), {
+            (1, 'A'): (2, 1, 1),
+            (1, 'C'): (1, 1, 0),
+            (2, 'A'): (1, 1, 0),
+            (None, None): (1, 0, 1),
+        })
+        self.assertEqual(self._rows(stats['by_title'], 'title'), {
+            ('Engineer',): (2, 1, 1),
+            ('Manager',): (1, 1, 0),
+            ('Senior Analyst',): (1, 1, 0),
+            (None,): (1, 0, 1),
+        })
+
+    def test_breakdowns_follow_a_promotion(self):
+        first = self.client.get('/api/reports/stats')
+        self.assertEqual(self.client.get('/api/reports/stats')['X-Cache'], 'HIT')
+        with transaction.atomic():
+            EmpCtcInfo.objects.filter(emp_ctc_id=2).update(end_of_ctc=date(2024, 12, 31))
+            EmpCtcInfo.objects.create(
+                emp_ctc_id=8, emp_id=1, int_title='Manager', ext_title='Manager', main_level=2, sub_level='A',
+                start_of_ctc=date(2025, 1, 1), ctc_amt=150000,
+            )
+            caching.bump_data_version(EmpCtcInfo)
+
+        second = self.client.get('/api/reports/stats')
+        self.assertEqual(second['X-Cache'], 'MISS')
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        by_title = self._rows(second.json()['by_title'], 'title')
+        self.assertEqual((by_title[('Engineer',)], by_title[('Manager',)]), ((1, 0, 1), (2, 2, 0)))
+
+
+class SessionCacheTests(TestCase):
+    def test_lru_eviction(self):
+        sessions = auth._VerifiedSessionCache(2)
+        sessions.put(b'a', {'n': 1}, 10.0)
+        sessions.put(b'b', {'n': 2}, 10.0)
+        sessions.get(b'a')
+        sessions.put(b'c', {'n': 3}, 10.0)
+        self.assertIsNone(sessions.get(b'b'))
+        self.assertEqual(sessions.get(b'a'), ({'n': 1}, 10.0))
+        self.assertEqual(sessions.get(b'c'), ({'n': 3}, 10.0))
+
+    def test_cached_session_expires_with_its_token(self):
+        token, _ = create_signed_session(payload={'email': 'user@example.com'})
+        with mock.patch.object(auth, '_session_cache', auth._VerifiedSessionCache(4)) as sessions:
+            self.assertEqual(auth.load_signed_session(token)['email'], 'user@example.com')
+            key, (_, expires_at) = next(iter(sessions._entries.items()))
+            self.assertAlmostEqual(expires_at, time.time() + auth.SESSION_TTL.total_seconds(), delta=5)
+            # Served from the cache without verifying the signature again.
+            with mock.patch.object(auth.signing, 'loads') as loads:
+                auth.load_signed_session(token)
+            loads.assert_not_called()
+            with mock.patch.object(auth.time, 'time', return_value=expires_at + 1):
+                with self.assertRaisesMessage(auth.ExternalAuthError, 'Session expired'):
+                    auth.load_signed_session(token)
+            self.assertIsNone(sessions.get(key))
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Keep-alive HTTP/1.1 server for the pool tests; see ``HttpClientTests``."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _handle(self):
+        self.server.body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self.server.requests.append((self.command, self.path))
+        if self.path == '/drop-once' and not self.server.dropped:
+            # Read the request, then hang up without answering.
+            self.server.dropped = True
+            self.close_connection = True
+            return
+        if self.path == '/chunked':
+            self.send_response(200)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for part in (b'hello ', b'chunked ', b'world'):
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(part), part))
+            self.wfile.write(b'0\r\n\r\n')
+            return
+        if self.path in ('/no-content', '/not-modified'):
+            # Neither Content-Length nor Transfer-Encoding: the status says there is no body.
+            self.send_response(204 if self.path == '/no-content' else 304)
+            self.end_headers()
+            return
+        if self.path == '/early-hints':
+            self.send_response_only(103)
+            self.send_header('Link', '</app.js>; rel=preload')
+            self.end_headers()
+        body = self.server.auth_reply if self.path == '/auth' else self.path.encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+        if self.path == '/close-after':
+            # Closed without "Connection: close": the client still holds it idle.
+            self.close_connection = True
+
+    do_GET = do_HEAD = do_POST = _handle
+
+    def finish(self):
+        super().finish()
+        self.server.closed.set()
+
+
+class HttpClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+        self.server.daemon_threads = True
+        self.server.connections, self.server.requests, self.server.dropped = 0, [], False
+        self.server.auth_reply = b'{"success": true, "display_name": "Asha"}'
+        self.server.closed = threading.Event()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = PooledHttpClient(maxsize=2, connect_timeout=2, read_timeout=2)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(self.client.close)
+
+    def url(self, path: str) -> str:
+        return f'http://127.0.0.1:{self.server.server_port}{path}'
+
+    def test_keep_alive_reuses_the_connection(self):
+        for path in ('/a', '/b', '/c'):
+            self.assertEqual(self.client.request('GET', self.url(path)), (200, path.encode()))
+        self.assertEqual(self.server.connections, 1)
+        metrics = self.client.metrics()[self.url('/a')]
+        self.assertEqual((metrics['count'], metrics['errors']), (1, 0))
+
+    def test_metrics_are_exported(self):
+        self.client.request('GET', self.url('/a'))
+        with mock.patch('hackathon.metrics.get_http_client', return_value=self.client):
+            text = render_prometheus()
+        self.assertIn(f'hackathon_external_requests_total{{endpoint="{self.url("/a")}"}} 1', text)
+
+    def test_connection_closed_while_idle_is_replaced(self):
+        for method in ('GET', 'POST'):
+            with self.subTest(method):
+                self.server.closed.clear()
+                self.client.request(method, self.url('/close-after'), body=b'x')
+                self.assertTrue(self.server.closed.wait(2))
+                self.assertEqual(self.client.request(method, self.url('/ok'), body=b'x'), (200, b'/ok'))
+
+    def test_only_idempotent_requests_are_retried(self):
+        self.client.request('GET', self.url('/ok'))
+        self.assertEqual(self.client.request('GET', self.url('/drop-once')), (200, b'/drop-once'))
+        self.assertEqual(self.server.requests.count(('GET', '/drop-once')), 2)
+
+        self.server.dropped = False
+        self.client.request('POST', self.url('/ok'), body=b'x')
+        with self.assertRaises(http.client.RemoteDisconnected):
+            self.client.request('POST', self.url('/drop-once'), body=b'x')
+        self.assertEqual(self.server.requests.count(('POST', '/drop-once')), 1)
+        self.assertEqual(self.client.metrics()[self.url('/drop-once')]['errors'], 1)
+
+    def test_chunked_response(self):
+        self.assertEqual(self.client.request('GET', self.url('/chunked')), (200, b'hello chunked world'))
+
+    def test_async_pool(self):
+        async def run():
+            chunked = await self.client.arequest('GET', self.url('/chunked'))
+            reused = await self.client.arequest('GET', self.url('/ok'))
+            await self.client.arequest('GET', self.url('/drop-once'))
+            post = await self.client.arequest('POST', self.url('/ok'), body=b'x')
+            with self.assertRaises(http.client.RemoteDisconnected):
+                self.server.dropped = False
+                await self.client.arequest('POST', self.url('/drop-once'), body=b'x')
+            return chunked, reused, post
+
+        chunked, reused, post = asyncio.run(run())
+        self.assertEqual(chunked, (200, b'hello chunked world'))
+        self.assertEqual(reused, (200, b'/ok'))
+        self.assertEqual(post, (200, b'/ok'))
+        self.assertEqual(self.server.requests.count(('GET', '/drop-once')), 2)
+        self.assertEqual(self.server.requests.count(('POST', '/drop-once')), 1)
+        # The GET retry opened the second connection; the POST was not retried.
+        self.assertEqual(self.server.connections, 2)
+
+    def test_async_responses_without_a_body(self):
+        async def run():
+            return [
+                await self.client.arequest('GET', self.url('/no-content')),
+                await self.client.arequest('GET', self.url('/not-modified')),
+                await self.client.arequest('HEAD', self.url('/ok')),
+                await self.client.arequest('GET', self.url('/early-hints')),
+                await self.client.arequest('GET', self.url('/ok')),
+            ]
+
+        started = time.monotonic()
+        self.assertEqual(asyncio.run(run()), [
+            (204, b''), (304, b''), (200, b''), (200, b'/early-hints'), (200, b'/ok'),
+        ])
+        # Each reply ended at its headers instead of waiting out the 2s read timeout,
+        # and the connection stayed in the pool throughout.
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(self.server.connections, 1)
+
+    def _post_async_view(self, view, payload: dict, url_env: str, path: str = '/auth'):
+        request = AsyncRequestFactory().post('/', data=payload, content_type='application/json')
+        with mock.patch.dict(os.environ, {url_env: self.url(path)}), \
+                mock.patch('hackathon.auth.get_http_client', return_value=self.client):
+            return asyncio.run(view.as_view()(request))
+
+    def test_async_login_view(self):
+        response = self._post_async_view(
+            views.AsyncApiLoginView, {'username': 'asha@example.com', 'password': 'pw'}, 'LOGIN_THROUGH_PASSWORD_URL',
+        )
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(response.content)
+        self.assertEqual(body['user']['username'], 'asha@example.com')
+        self.assertEqual(auth.load_signed_session(body['token'])['display_name'], 'Asha')
+        self.assertEqual(self.server.requests, [('POST', '/auth')])
+        self.assertEqual(
+            urllib.parse.parse_qs(self.server.body.decode()),
+            {'email': ['asha@example.com'], 'password': ['pw'], 'system_name': [views.SYSTEM_NAME]},
+        )
+
+    def test_async_views_report_failures(self):
+        missing = self._post_async_view(views.AsyncApiLoginView, {'username': 'a'}, 'LOGIN_THROUGH_PASSWORD_URL')
+        self.assertEqual(missing.status_code, 400)
+
+        self.server.auth_reply = b'{"success": false, "message": "Wrong password."}'
+        rejected = self._post_async_view(
+            views.AsyncApiLoginView, {'username': 'a', 'password': 'b'}, 'LOGIN_THROUGH_PASSWORD_URL',
+        )
+        self.assertEqual((rejected.status_code, json.loads(rejected.content)), (401, {'error': 'Wrong password.'}))
+
+        unreachable = self._post_async_view(
+            views.AsyncApiForgotPasswordView, {'email': 'a', 'password': 'b'}, 'FORGET_PASSWORD_URL', '/no-content',
+        )
+        self.assertEqual(unreachable.status_code, 502)
+
+    def test_async_otp_round_trip(self):
+        requested = self._post_async_view(
+            views.AsyncApiOtpRequestView, {'channel': 'email', 'email': 'asha@example.com'}, 'SEND_OTP_URL',
+        )
+        self.assertEqual(requested.status_code, 200)
+        verified = self._post_async_view(
+            views.AsyncApiOtpVerifyView,
+            {'challenge_id': json.loads(requested.content)['challenge_id'], 'otp': '123456'},
+            'VERIFY_OTP_URL',
+        )
+        self.assertEqual(verified.status_code, 200)
+        self.assertEqual(json.loads(verified.content)['user']['username'], 'asha@example.com')
+
+
+class IdAllocatorTests(EmpTablesTestCase):
+    """Allocators in several threads stand in for several worker processes.
+
+    The threads share a temporary SQLite file opened with immediate
+    transactions, so a reservation waits for the one in progress; the
+    in-memory test database cannot lock between connections.
+    """
+
+    def setUp(self):
+        super().setUp()
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, True)
+        database = {
+            **connections.settings['default'],
+            'NAME': f'{tmpdir}/ids.sqlite3',
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 30},
+        }
+        # Connections opened by new threads use these settings.
+        patcher = mock.patch.dict(connections.settings, {'default': database})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self._in_threads(lambda n: self._create_schema(), 1)
+
+    @staticmethod
+    def _create_schema():
+        with connection.schema_editor() as editor:
+            editor.create_model(IdAllocation)
+            editor.create_model(EmpMaster)
+
+    def _in_threads(self, target, count: int) -> list:
+        results, errors = [None] * count, []
+
+        def run(n):
+            try:
+                results[n] = target(n)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run, args=(n,)) for n in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        return results
+
+    def test_concurrent_workers_get_disjoint_blocks(self):
+        workers = [ids.IdAllocator('test.emp_id', EmpMaster, block_size=5) for _ in range(4)]
+        issued = self._in_threads(lambda n: [workers[n].next_id() for _ in range(12)], 4)
+        flat = [emp_id for worker_ids in issued for emp_id in worker_ids]
+        self.assertEqual(len(flat), len(set(flat)))
+        # Three blocks per worker and no block reserved twice.
+        self.assertLessEqual(max(flat), 4 * 15)
+
+    def test_threads_sharing_an_allocator_get_unique_ids(self):
+        allocator = ids.IdAllocator('test.emp_id', EmpMaster, block_size=3)
+        issued = self._in_threads(lambda n: [allocator.next_id() for _ in range(10)] + list(allocator.allocate(7)), 4)
+        flat = [emp_id for thread_ids in issued for emp_id in thread_ids]
+        self.assertEqual(len(flat), 4 * 17)
+        self.assertEqual(len(flat), len(set(flat)))
+
+    def test_blocks_start_above_rows_inserted_outside_the_allocator(self):
+        allocator = ids.IdAllocator('test.emp_id', EmpMaster, block_size=5)
+        first = allocator.next_id()
+        EmpMaster.objects.create(emp_id=first + 100, first_name='A', last_name='B', start_date=date(2024, 1, 1))
+        self.assertEqual(list(allocator.allocate(4)), [first + 1, first + 2, first + 3, first + 4])
+        self.assertEqual(allocator.next_id(), first + 101)
+
+
+class BulkImportTests(EmpTablesTestCase):
+    CSV = (
+        'first_name,last_name,start_date,int_title,ext_title,main_level,sub_level,ctc_amt\n'
+        'Asha,Rao,2024-04-01,eng,Engineer,2,A,900000\n'
+        'Ben,Das,2024-05-01,,,,,\n'
+    )
+
+    def setUp(self):
+        super().setUp()
+        token, _ = create_signed_session(payload={'username': 'test@example.com'})
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def _post(self, data, content_type='application/json', path='/api/employees/bulk', **kwargs):
+        return self.client.post(path, data, content_type=content_type, headers=self.headers, **kwargs)
+
+    def test_csv_body(self):
+        response = self._post(self.CSV, content_type='text/csv')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['imported'], 2)
+        emp_id = response.json()['emp_ids'][0]
+        self.assertEqual(EmpMaster.objects.get(emp_id=emp_id).first_name, 'Asha')
+        self.assertEqual(EmpCtcInfo.objects.get(emp_id=emp_id).ext_title, 'Engineer')
+
+    def test_csv_upload(self):
+        upload = SimpleUploadedFile('employees.csv', self.CSV.encode(), content_type='text/csv')
+        response = self.client.post('/api/employees/bulk', {'file': upload}, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['imported'], 2)
+
+    def test_json_rows_and_partial_mode(self):
+        rows = [
+            {'first_name': 'Asha', 'last_name': 'Rao', 'start_date': '2024-04-01'},
+            {'first_name': 'Ben', 'start_date': 'not a date'},
+        ]
+        response = self._post({'employees': rows})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((response.json()['received'], response.json()['imported']), (2, 0))
+        self.assertEqual(response.json()['errors'][0]['row'], 2)
+        self.assertFalse(EmpMaster.objects.filter(first_name='Asha').exists())
+
+        response = self._post(rows, path='/api/employees/bulk?partial=1')
+        self.assertEqual(response.json()['imported'], 1)
+        self.assertTrue(EmpMaster.objects.filter(first_name='Asha').exists())
+
+    def test_values_are_checked_against_the_columns(self):
+        high = connection.ops.integer_field_range('PositiveIntegerField')[1]
+        rows = [
+            {'first_name': 'A' * 51, 'last_name': 'Rao', 'start_date': '2024-04-01'},
+            {'first_name': 'Ben', 'last_name': 'Das', 'start_date': '2024-04-01', 'ctc': {
+                'int_title': 'eng', 'ext_title': 'Engineer', 'main_level': 2, 'sub_level': 'AB', 'ctc_amt': high + 1,
+            }},
+            {'first_name': 'Cal', 'last_name': 'Roy', 'start_date': '2024-04-01', 'bank': {
+                'bank_acct_no': '1' * 21, 'ifsc_code': 'IFSC0001234', 'branch_name': 'Main', 'bank_name': 'Bank',
+            }},
+        ]
+        response = self._post(rows, path='/api/employees/bulk?partial=1')
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertEqual(response.json()['errors'], [
+            {'row': 1, 'errors': ['first_name must be at most 50 characters.']},
+            {'row': 2, 'errors': [
+                'ctc.sub_level must be at most 1 characters.', f'ctc.ctc_amt must be between 0 and {high}.',
+            ]},
+            {'row': 3, 'errors': ['bank.bank_acct_no must be at most 20 characters.']},
+        ])
+
+    def test_requires_a_session(self):
+        response = self.client.post('/api/employees/bulk', [], content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_too_large(self):
+        with override_settings(IMPORT_MAX_BYTES=40):
+            for content_type, body in (('text/csv', self.CSV), ('application/json', [{'first_name': 'x' * 50}])):
+                with self.subTest(content_type):
+                    self.assertEqual(self._post(body, content_type=content_type).status_code, 413)
+            upload = SimpleUploadedFile('employees.csv', self.CSV.encode(), content_type='text/csv')
+            self.assertEqual(self.client.post('/api/employees/bulk', {'file': upload}, headers=self.headers).status_code, 413)
+        with mock.patch.object(importer, 'MAX_ROWS', 1):
+            self.assertEqual(self._post(self.CSV, content_type='text/csv').status_code, 413)
+        self.assertFalse(EmpMaster.objects.exists())
+
+    def test_stream_is_bounded_without_a_content_length(self):
+        body = io.BytesIO(self.CSV.encode())
+        self.assertEqual(b''.join(views._import_lines(body, 1000)), self.CSV.encode())
+        with self.assertRaises(importer.ImportTooLarge):
+            list(views._import_lines(io.BytesIO(self.CSV.encode()), 60))
+
+
+class DataVersionTests(EmpTablesTestCase):
+    def test_bump_changes_only_the_written_tables(self):
+        before = caching.data_versions(EmpMaster, EmpCtcInfo)
+        caching.bump_data_version(EmpMaster)
+        self.assertEqual(caching.data_versions(EmpMaster, EmpCtcInfo), [before[0] + 1, before[1]])
+
+    def test_table_without_a_counter_row(self):
+        DataVersion.objects.filter(table=EmpRegInfo._meta.db_table).delete()
+        self.assertEqual(caching.data_versions(EmpRegInfo), [0])
+        caching.bump_data_version(EmpMaster, EmpRegInfo)
+        self.assertEqual(caching.data_versions(EmpRegInfo), [1])
+
+    def test_etag_follows_writes_of_other_workers(self):
+        etag = self.client.get('/api/compliance')['ETag']
+        self.assertEqual(self.client.get('/api/compliance', headers={'If-None-Match': etag}).status_code, 304)
+        # Versions are not kept in the (per-process) cache.
+        cache.clear()
+        self.assertEqual(self.client.get('/api/compliance', headers={'If-None-Match': etag}).status_code, 304)
+        # Another worker's write only reaches this one through the database.
+        DataVersion.objects.filter(table=EmpMaster._meta.db_table).update(version=F('version') + 1)
+        self.assertEqual(self.client.get('/api/compliance', headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_version_commits_with_the_write(self):
+        before = caching.data_versions(EmpMaster)
+        body = {'first_name': 'Asha', 'last_name': 'Rao', 'start_date': '2024-04-01'}
+        with mock.patch.object(views, 'bump_data_version', side_effect=DatabaseError('down')):
+            self.assertEqual(self.client.post('/api/employees/add', body, content_type='application/json').status_code, 500)
+        self.assertFalse(EmpMaster.objects.exists())
+        self.assertFalse(ChangeLogEntry.objects.exists())
+        self.assertEqual(self.client.post('/api/employees/add', body, content_type='application/json').status_code, 200)
+        self.assertEqual(caching.data_versions(EmpMaster), [before[0] + 1])
+
+    def test_versions_expire_for_writes_outside_the_app(self):
+        with override_settings(DATA_VERSION_MAX_AGE=60), mock.patch('time.time', return_value=6000):
+            etag = caching.data_etag(EmpMaster)
+            report = report_jobs.report_version('headcount')
+        with override_settings(DATA_VERSION_MAX_AGE=60), mock.patch('time.time', return_value=6059):
+            self.assertEqual(caching.data_etag(EmpMaster), etag)
+        with override_settings(DATA_VERSION_MAX_AGE=60), mock.patch('time.time', return_value=6060):
+            self.assertNotEqual(caching.data_etag(EmpMaster), etag)
+            self.assertNotEqual(report_jobs.report_version('headcount'), report)
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    BODY = b'{"rows": "' + b'x' * 4096 + b'"}'
+
+    def _respond(self, path: str, response: HttpResponseBase) -> HttpResponseBase:
+        request = RequestFactory().get(path, headers={'Accept-Encoding': 'gzip'})
+        request.resolver_match = resolve(path)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_json_is_compressed(self):
+        response = self._respond('/api/employees', HttpResponse(self.BODY, content_type='application/json'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_event_stream_is_not_compressed(self):
+        stream = StreamingHttpResponse(iter([b'data: 1\n\n']), content_type='text/event-stream')
+        self.assertFalse(self._respond('/api/events', stream).has_header('Content-Encoding'))
+
+    def test_auth_endpoints_are_not_compressed(self):
+        for path in ('/api/login', '/api/otp/verify', '/api/home'):
+            with self.subTest(path):
+                response = self._respond(path, HttpResponse(self.BODY, content_type='application/json'))
+                self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class InstrumentationTests(EmpTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        synthetic.generate(10, seed=4)
+
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        token, _ = create_signed_session(payload={'username': 'test@example.com'})
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def _scrape(self) -> dict[str, float]:
+        response = self.client.get('/metrics')
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if not line.startswith('#'):
+                name, _, value = line.rpartition(' ')
+                samples[name] = float(value)
+        return samples
+
+    def test_server_timing_counts_the_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/employees', headers=self.headers)
+        timing = re.fullmatch(r'app;dur=([\d.]+), db;dur=([\d.]+);desc="(\d+) queries"', response['Server-Timing'])
+        self.assertIsNotNone(timing, response['Server-Timing'])
+        app_ms, db_ms, count = float(timing[1]), float(timing[2]), int(timing[3])
+        self.assertEqual(count, len(queries))
+        self.assertGreater(count, 0)
+        self.assertLessEqual(db_ms, app_ms)
+
+    def test_requests_are_counted_per_route(self):
+        # Cache counters run for the life of the process; compare against now.
+        misses = caching.cache_counters().get(caching.EMPLOYEE_KEY, {}).get('miss', 0)
+        sizes = [len(self.client.get('/api/employees', headers=self.headers).content) for _ in range(2)]
+        timing = self.client.get('/api/employees/1', headers=self.headers)['Server-Timing']
+        queries = int(re.search(r'"(\d+) queries"', timing)[1])
+        self.client.get('/api/no-such-route')
+
+        samples = self._scrape()
+        employees = 'route="employee_list",method="GET"'
+        self.assertEqual(samples[f'hackathon_http_requests_total{{{employees},status="200"}}'], 2)
+        self.assertEqual(samples[f'hackathon_http_request_duration_seconds_count{{{employees}}}'], 2)
+        self.assertEqual(samples[f'hackathon_http_request_duration_seconds_bucket{{{employees},le="+Inf"}}'], 2)
+        self.assertEqual(samples[f'hackathon_http_response_bytes_total{{{employees}}}'], sum(sizes))
+        profile = 'route="employee_profile",method="GET"'
+        self.assertEqual(samples[f'hackathon_db_queries_total{{{profile}}}'], queries)
+        self.assertEqual(samples['hackathon_http_requests_total{route="unmatched",method="GET",status="404"}'], 1)
+        cache_misses = f'hackathon_cache_requests_total{{key="{caching.EMPLOYEE_KEY}",result="miss"}}'
+        self.assertEqual(samples[cache_misses], misses + 1)
+
+    def test_streamed_response_is_recorded_when_exhausted(self):
+        request = RequestFactory().get('/api/reports/download/headcount')
+        request.resolver_match = resolve(request.path)
+        response = InstrumentationMiddleware(
+            lambda request: StreamingHttpResponse(iter([b'a,b\n', b'1,2\n']), content_type='text/csv')
+        )(request)
+        route = 'route="report_download",method="GET"'
+        self.assertNotIn(f'hackathon_http_response_bytes_total{{{route}}}', self._scrape())
+        self.assertEqual(b''.join(response.streaming_content), b'a,b\n1,2\n')
+        self.assertEqual(self._scrape()[f'hackathon_http_response_bytes_total{{{route}}}'], 8)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code, 401)
+        self.assertEqual(self.client.get('/metrics', headers={'Authorization': 'Bearer s3cret'}).status_code, 200)
+
+
+def _profiled_work():
+    return sum(range(1000))
+
+
+def _other_work():
+    return sum(range(1000))
+
+
+class ProfilingTests(SimpleTestCase):
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir, True)
+        self.enterContext(override_settings(PROFILE_TOKEN='token', PROFILE_DIR=self.profile_dir))
+        self.enterContext(mock.patch.object(profiling, '_saves', itertools.count()))
+
+    def _functions(self, name: str) -> set[tuple[str, str]]:
+        stats = pstats.Stats(os.path.join(self.profile_dir, name))
+        return {(os.path.basename(filename), function) for filename, _, function in stats.stats}
+
+    async def test_sync_view_is_profiled_under_asgi(self):
+        response = await self.async_client.get('/', headers={'X-Profile': 'token'})
+        self.assertIn(('views.py', 'get'), self._functions(response['X-Profile-Id']))
+
+    async def test_coroutine_steps_leave_out_other_tasks(self):
+        session = profiling.ProfileSession(profiling.CPROFILE, start=False)
+
+        async def steps(work):
+            for _ in range(3):
+                work()
+                await asyncio.sleep(0)
+
+        await asyncio.gather(profiling.Stepped(steps(_profiled_work), session), steps(_other_work))
+        functions = {function for _, function in self._functions(session.save('steps'))}
+        self.assertIn('_profiled_work', functions)
+        self.assertNotIn('_other_work', functions)
+
+    def _save_and_wait(self) -> list[str]:
+        profiling.ProfileSession(profiling.CPROFILE).save('prune')
+        for thread in threading.enumerate():
+            if thread.name == 'hackathon-profile-prune':
+                thread.join()
+        return os.listdir(self.profile_dir)
+
+    def test_directory_is_trimmed_every_few_saves(self):
+        with override_settings(PROFILE_MAX_FILES=1), mock.patch.object(profiling, 'PRUNE_EVERY', 2):
+            counts = [len(self._save_and_wait()) for _ in range(3)]
+        # Trimmed on the first and third save only.
+        self.assertEqual(counts, [1, 2, 1])
+
+
+class ReportJobTests(EmpTablesTestCase):
+    def setUp(self):
+        super().setUp()
+        report_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, report_dir, True)
+        self.enterContext(override_settings(REPORT_WORKERS=0, REPORT_DIR=report_dir))
+        synthetic.generate(5, seed=1)
+
+    def _generate(self, age: float | None = None):
+        path = report_jobs.request_report('headcount').result()
+        if age is not None:
+            stamp = time.time() - age
+            os.utime(path, (stamp, stamp))
+        caching.bump_data_version(EmpMaster)
+        return path
+
+    def test_gzip_copy_names_the_final_file(self):
+        path = self._generate()
+        packed = path.with_name(path.name + report_jobs.GZIP_SUFFIX).read_bytes()
+        # Header, then the zero-terminated file name (FNAME).
+        self.assertEqual(packed[10:packed.index(b'\0', 10)], path.name.encode())
+        self.assertEqual(gzip.decompress(packed), path.read_bytes())
+
+    def test_replaced_files_are_kept_for_the_grace_period(self):
+        first = self._generate(age=300)
+        second = self._generate(age=200)
+        # Replaced just now by ``second``: still there.
+        self.assertTrue(first.is_file())
+        third = self._generate()
+        self.assertFalse(first.is_file())
+        self.assertFalse(first.with_name(first.name + report_jobs.GZIP_SUFFIX).exists())
+        self.assertTrue(second.is_file())
+        self.assertTrue(third.is_file())
+
+    def test_previous_file_is_sent_while_a_run_is_pending(self):
+        previous = self._generate()
+        with mock.patch.object(views, 'request_report', return_value=Future()):
+            response = self.client.get('/api/reports/download/headcount')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['X-Report-Stale'], 'true')
+            self.assertEqual(b''.join(response.streaming_content), previous.read_bytes())
+            # An explicit wait that runs out also falls back to it.
+            self.assertEqual(self.client.get('/api/reports/download/headcount?wait=0.01').status_code, 200)
+        response = self.client.get('/api/reports/download/headcount?wait=1')
+        self.assertFalse(response.has_header('X-Report-Stale'))
+
+    def test_no_file_yet_answers_202(self):
+        with mock.patch.object(views, 'request_report', return_value=Future()):
+            response = self.client.get('/api/reports/download/headcount')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response['Retry-After'], '5')
+
+    def test_pruned_file_answers_202(self):
+        job = Future()
+        job.set_result(report_jobs.artifact_path('headcount', 'gone'))
+        with mock.patch.object(views, 'request_report', return_value=job):
+            response = self.client.get('/api/reports/download/headcount')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response['Retry-After'], '1')
+
+
+class ReportCsvTests(EmpTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        EmpMaster.objects.create(emp_id=1, first_name='Asha', last_name='Rao, "Jr"', start_date=date(2023, 1, 1))
+        EmpMaster.objects.create(
+            emp_id=2, first_name='Ravi', last_name='Iyer', start_date=date(2022, 1, 1), end_date=date(2024, 6, 30),
+        )
+        for emp_ctc_id, title, level, start, end, amount in (
+            (1, 'Engineer', (1, 'A'), date(2023, 1, 1), date(2023, 12, 31), 100000),
+            (2, 'Senior Engineer', (2, 'B'), date(2024, 1, 1), None, 150000),
+        ):
+            EmpCtcInfo.objects.create(
+                emp_ctc_id=emp_ctc_id, emp_id=1, int_title=title, ext_title=title, main_level=level[0],
+                sub_level=level[1], start_of_ctc=start, end_of_ctc=end, ctc_amt=amount,
+            )
+        EmpComplianceTracker.objects.create(
+            emp_compliance_tracker_id=1, emp_id=2, comp_type='PAN', status='Verified', doc_url='',
+        )
+
+    def setUp(self):
+        super().setUp()
+        report_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, report_dir, True)
+        self.enterContext(override_settings(REPORT_WORKERS=0, REPORT_DIR=report_dir))
+
+    def _download(self, slug: str, **headers) -> list[list[str]]:
+        response = self.client.get(f'/api/reports/download/{slug}', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        body = b''.join(response.streaming_content)
+        if response.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        return list(csv.reader(io.StringIO(body.decode())))
+
+    def test_reports_list_every_row(self):
+        self.assertEqual(self._download('headcount'), [
+            ['Emp ID', 'First Name', 'Last Name', 'Role', 'Level', 'Start Date', 'End Date', 'Status'],
+            ['1', 'Asha', 'Rao, "Jr"', 'Senior Engineer', 'L2B', '2023-01-01', '', 'Active'],
+            ['2', 'Ravi', 'Iyer', 'N/A', 'N/A', '2022-01-01', '2024-06-30', 'Exited'],
+        ])
+        self.assertEqual(self._download('joiners-leavers'), [
+            ['Emp ID', 'Name', 'Type', 'Date'],
+            ['1', 'Asha Rao, "Jr"', 'Joiner', '2023-01-01'],
+            ['2', 'Ravi Iyer', 'Joiner', '2022-01-01'],
+            ['2', 'Ravi Iyer', 'Leaver', '2024-06-30'],
+        ])
+        self.assertEqual(self._download('ctc'), [
+            ['Emp ID', 'Name', 'Role', 'Level', 'CTC Amount', 'Start Date', 'End Date'],
+            ['1', 'Asha Rao, "Jr"', 'Senior Engineer', 'L2B', '150000', '2024-01-01', 'Current'],
+            ['1', 'Asha Rao, "Jr"', 'Engineer', 'L1A', '100000', '2023-01-01', '2023-12-31'],
+        ])
+        self.assertEqual(self._download('compliance'), [
+            ['Emp ID', 'Name', 'Compliance Type', 'Status', 'Document URL'],
+            ['2', 'Ravi Iyer', 'PAN', 'Verified', ''],
+        ])
+
+    def test_gzipped_download_has_the_same_rows(self):
+        self.assertEqual(self._download('headcount', accept_encoding='gzip'), self._download('headcount'))
+
+    def test_rows_are_encoded_in_batches(self):
+        consumed = []
+
+        def rows():
+            for n in range(5):
+                consumed.append(n)
+                yield [n, f'row, {n}']
+
+        with mock.patch.object(reports, 'ROWS_PER_WRITE', 2):
+            chunks = reports.encode_csv(rows())
+            first = next(chunks)
+            # Only the rows of the first batch have been pulled from the database.
+            self.assertEqual((first, consumed), ('0,"row, 0"\r\n1,"row, 1"\r\n', [0, 1]))
+            rest = list(chunks)
+        self.assertEqual(len(rest), 2)
+        self.assertEqual(list(csv.reader(io.StringIO(first + ''.join(rest)))), [[str(n), f'row, {n}'] for n in range(5)])
+
+
+class JobHistoryTests(EmpTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for emp_id in (3001, 3002):
+            EmpMaster.objects.create(emp_id=emp_id, first_name='Job', last_name=str(emp_id), start_date=date(2021, 1, 1))
+        timeline = (
+            (1, 3001, 'Engineer', date(2021, 1, 1)),
+            (2, 3001, 'Senior Engineer', date(2022, 4, 1)),
+            (3, 3001, 'Lead Engineer', date(2023, 4, 1)),
+            # Another employee's title in between must not leak into 3001's history.
+            (4, 3002, 'Analyst', date(2022, 1, 1)),
+        )
+        for emp_ctc_id, emp_id, title, start in timeline:
+            EmpCtcInfo.objects.create(
+                emp_ctc_id=emp_ctc_id, emp_id=emp_id, int_title=title, ext_title=title,
+                main_level=1, sub_level='A', start_of_ctc=start, ctc_amt=100000,
+            )
+
+    def _roles(self, **params) -> list[tuple]:
+        rows = self.client.get('/api/job-history', params).json()['job_history']
+        return [(row['emp_id'], row['previous_role'], row['new_role']) for row in rows]
+
+    def test_previous_role_comes_from_the_row_before(self):
+        self.assertEqual(self._roles(), [
+            (3001, 'Senior Engineer', 'Lead Engineer'),
+            (3001, 'Engineer', 'Senior Engineer'),
+            (3002, '—', 'Analyst'),
+            (3001, '—', 'Engineer'),
+        ])
+
+    def test_date_range_keeps_the_previous_role(self):
+        # The rows the previous roles come from fall outside the range.
+        self.assertEqual(self._roles(effective_from='2022-02-01', employee='3001'), [
+            (3001, 'Senior Engineer', 'Lead Engineer'),
+            (3001, 'Engineer', 'Senior Engineer'),
+        ])
+        self.assertEqual(self._roles(effective_from='2023-01-01', effective_to='2023-12-31'), [
+            (3001, 'Senior Engineer', 'Lead Engineer'),
+        ])
+        self.assertEqual(self._roles(effective_from='2022-02-01', limit=1), [
+            (3001, 'Senior Engineer', 'Lead Engineer'),
+        ])
+
+
+class ListFormatTests(EmpTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        synthetic.generate(30, seed=3)
+        # One exit in each list of /api/exit-workflow.
+        for emp_id, end_date in ((1001, date.today() + timedelta(days=10)), (1002, date(2024, 6, 30))):
+            EmpMaster.objects.create(
+                emp_id=emp_id, first_name='Exit', last_name=str(emp_id), start_date=date(2020, 1, 1), end_date=end_date,
+            )
+
+    def test_every_list_endpoint_answers_in_columns(self):
+        for path in ('/api/employees', '/api/compliance', '/api/onboarding', '/api/job-history', '/api/exit-workflow'):
+            with self.subTest(path):
+                rows = self.client.get(path).json()
+                columns = self.client.get(path, {'format': 'columns'}).json()
+                self.assertEqual(rows.keys(), columns.keys())
+                for key, value in rows.items():
+                    if not isinstance(value, list):
+                        self.assertEqual(columns[key], value)
+                        continue
+                    fields = list(columns[key])
+                    self.assertEqual([dict(zip(fields, row)) for row in zip(*columns[key].values())], value)
+                self.assertEqual(self.client.get(path, {'format': 'xml'}).status_code, 400)
+
+
+class BatchTests(EmpTablesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        synthetic.generate(5, seed=2)
+
+    def _batch(self, *paths: str) -> list[dict]:
+        body = {'requests': [{'id': str(n), 'path': path} for n, path in enumerate(paths)]}
+        response = self.client.post('/api/batch', body, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['responses']
+
+    def test_sub_responses_match_direct_calls(self):
+        employees, compliance = self._batch('/api/employees', '/api/compliance?format=rows')
+        self.assertEqual((employees['status'], compliance['status']), (200, 200))
+        self.assertEqual(employees['body'], self.client.get('/api/employees').json())
+        self.assertEqual(compliance['body'], self.client.get('/api/compliance?format=rows').json())
+
+    def test_async_view_is_rejected(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            (stream,) = self._batch('/api/events')
+        self.assertEqual(stream['status'], 406)
+
+    def test_view_error_is_not_leaked(self):
+        with mock.patch.object(views, 'employee_rollups', side_effect=RuntimeError('secret detail')):
+            with self.assertLogs('hackathon.batch', 'ERROR'):
+                onboarding, employees = self._batch('/api/onboarding', '/api/employees')
+        self.assertEqual(onboarding, {'id': '0', 'status': 500, 'body': {'error': 'Internal server error.'}})
+        self.assertEqual(employees['status'], 200)
+
+
+class ReplicaTests(EmpTablesTestCase):
+    """Reads against two SQLite replica files: a copy of the schema and a missing file."""
+
+    @classmethod
+    def setUpClass(cls):
+        tmpdir = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, tmpdir, True)
+        cls.replica_path = f'{tmpdir}/replica.sqlite3'
+        cls.missing_path = f'{tmpdir}/missing.sqlite3'
+        # Copy the migrated schema before the test transaction starts.
+        synthetic.create_tables()
+        connection.ensure_connection()
+        with sqlite3.connect(cls.replica_path) as replica:
+            connection.connection.backup(replica)
+        # Opened like settings.py configures them, but outside
+        # connections.settings, so the test transaction leaves them alone.
+        for alias, path in (('replica_ok', cls.replica_path), ('replica_missing', cls.missing_path)):
+            primary = connections['default']
+            connections[alias] = type(primary)({**primary.settings_dict, 'NAME': f'{Path(path).as_uri()}?mode=ro'}, alias)
+        cls.addClassCleanup(cls._forget)
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        EmpMaster.objects.create(emp_id=1, first_name='Primary', last_name='Row', start_date=date(2024, 1, 1))
+        with sqlite3.connect(cls.replica_path) as replica:
+            replica.execute('DELETE FROM emp_master')
+            replica.execute(
+                "INSERT INTO emp_master (emp_id, first_name, last_name, start_date) VALUES (1, 'Replica', 'Row', '2024-01-01')"
+            )
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(override_settings(REPLICA_DATABASES=['replica_missing', 'replica_ok']))
+        self.addCleanup(replicas._down_until.clear)
+        self.addCleanup(replicas._checked_until.clear)
+
+    @classmethod
+    def _forget(cls):
+        for alias in ('replica_ok', 'replica_missing'):
+            connections[alias].close()
+            del connections[alias]
+
+    def _first_name(self, last_write: str | None = None) -> str:
+        headers = {replicas.LAST_WRITE_HEADER: last_write} if last_write else {}
+        return self.client.get('/api/employees', headers=headers).json()['employees'][0]['first_name']
+
+    def test_gets_fail_over_to_the_healthy_replica(self):
+        for _ in range(3):
+            self.assertEqual(self._first_name(), 'Replica')
+        self.assertIn('replica_missing', replicas._down_until)
+        # The missing file was not created by the health check.
+        self.assertFalse(os.path.exists(self.missing_path))
+
+    def test_no_healthy_replica_falls_back_to_the_primary(self):
+        with override_settings(REPLICA_DATABASES=['replica_missing']):
+            self.assertEqual(self._first_name(), 'Primary')
+
+    def test_client_reads_its_own_writes(self):
+        response = self.client.post(
+            '/api/initiate-exit', {'emp_id': 1, 'end_date': '2024-06-30'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        stamp = response[replicas.LAST_WRITE_HEADER]
+        self.assertEqual(self._first_name(stamp), 'Primary')
+        # Other clients, and this one once the lag has passed, use the replica.
+        self.assertEqual(self._first_name(), 'Replica')
+        self.assertEqual(self._first_name(str(float(stamp) - 60)), 'Replica')
+        self.assertFalse(self.client.get('/api/employees').has_header(replicas.LAST_WRITE_HEADER))
+
+    def test_shared_cache_entries_are_built_on_the_primary(self):
+        replicas.begin(True)
+        self.addCleanup(replicas.begin, False)
+        self.assertEqual(EmpMaster.objects.get(emp_id=1).first_name, 'Replica')
+        name, _ = caching.get_or_build('hackathon:test:replica', lambda: EmpMaster.objects.get(emp_id=1).first_name)
+        self.assertEqual(name, 'Primary')
+
+    def test_router(self):
+        router = replicas.ReplicaRouter()
+        with override_settings(REPLICA_DATABASES=['replica_ok']):
+            self.assertEqual(router.db_for_read(EmpMaster), 'default')
+            with replicas.reading():
+                self.assertEqual(router.db_for_read(EmpMaster), 'replica_ok')
+                with replicas.primary():
+                    self.assertEqual(router.db_for_read(EmpMaster), 'default')
+                self.assertEqual(router.db_for_write(EmpMaster), 'default')
+                # After a write the scope reads its own writes.
+                self.assertEqual(router.db_for_read(EmpMaster), 'default')
+            self.assertFalse(router.allow_migrate('replica_ok', 'hackathon'))
@@ -1,30 +1,50 @@
+from django.conf import settings
 from django.urls import path
 
 from .views import (
     ApiForgotPasswordView, ApiLoginView, ApiLogoutView, ApiMeView, 
     ApiOtpRequestView, ApiOtpVerifyView, ApiRegisterView, HealthView,
+    AsyncApiForgotPasswordView, AsyncApiLoginView, AsyncApiOtpRequestView,
+    AsyncApiOtpVerifyView, AsyncApiRegisterView,
     EmployeeListView, ComplianceListView, ApiAddEmployeeView, OnboardingListView,
     JobHistoryListView, ExitWorkflowListView, ReportsView, ReportDownloadView,
-    InitiateExitView
+    InitiateExitView, EmployeeSearchView, ApiBulkImportEmployeesView, ReportStatsView,
+    MetricsView, FrontendAssetView, EmployeeProfileView, BatchView, ChangesView,
+    EventStreamView
 )
 
+
+def _auth_view(sync_view, async_view):
+    # External-auth views come in sync (WSGI) and native async (ASGI) flavours.
+    return (async_view if settings.ASYNC_AUTH_VIEWS else sync_view).as_view()
+
+
 urlpatterns = [
     path('', HealthView.as_view(), name='health'),
-    path('api/login', ApiLoginView.as_view(), name='api_login'),
-    path('api/register', ApiRegisterView.as_view(), name='api_register'),
-    path('api/forgot-password', ApiForgotPasswordView.as_view(), name='api_forgot_password'),
-    path('api/otp/request', ApiOtpRequestView.as_view(), name='api_otp_request'),
-    path('api/otp/verify', ApiOtpVerifyView.as_view(), name='api_otp_verify'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
+    path('assets/<path:path>', FrontendAssetView.as_view(), name='frontend_asset'),
+    path('api/login', _auth_view(ApiLoginView, AsyncApiLoginView), name='api_login'),
+    path('api/register', _auth_view(ApiRegisterView, AsyncApiRegisterView), name='api_register'),
+    path('api/forgot-password', _auth_view(ApiForgotPasswordView, AsyncApiForgotPasswordView), name='api_forgot_password'),
+    path('api/otp/request', _auth_view(ApiOtpRequestView, AsyncApiOtpRequestView), name='api_otp_request'),
+    path('api/otp/verify', _auth_view(ApiOtpVerifyView, AsyncApiOtpVerifyView), name='api_otp_verify'),
     path('api/home', ApiMeView.as_view(), name='api_home'),
     path('api/logout', ApiLogoutView.as_view(), name='api_logout'),
+    path('api/batch', BatchView.as_view(), name='batch'),
     # Data endpoints
     path('api/employees', EmployeeListView.as_view(), name='employee_list'),
+    path('api/employees/search', EmployeeSearchView.as_view(), name='employee_search'),
+    path('api/employees/<int:emp_id>', EmployeeProfileView.as_view(), name='employee_profile'),
     path('api/employees/add', ApiAddEmployeeView.as_view(), name='employee_add'),
+    path('api/employees/bulk', ApiBulkImportEmployeesView.as_view(), name='employee_bulk_import'),
+    path('api/changes', ChangesView.as_view(), name='changes'),
+    path('api/events', EventStreamView.as_view(), name='events'),
     path('api/compliance', ComplianceListView.as_view(), name='compliance_list'),
     path('api/onboarding', OnboardingListView.as_view(), name='onboarding_list'),
     path('api/job-history', JobHistoryListView.as_view(), name='job_history_list'),
     path('api/exit-workflow', ExitWorkflowListView.as_view(), name='exit_workflow_list'),
     path('api/reports', ReportsView.as_view(), name='reports'),
+    path('api/reports/stats', ReportStatsView.as_view(), name='report_stats'),
     path('api/reports/download/<str:slug>', ReportDownloadView.as_view(), name='report_download'),
     path('api/initiate-exit', InitiateExitView.as_view(), name='initiate_exit'),
 ]
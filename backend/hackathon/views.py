@@ -1,18 +1,66 @@
+import codecs
+import csv
+import hmac
+import io
 import json
+import mimetypes
 import re
-
-from django.http import HttpRequest, JsonResponse
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import date
+from operator import itemgetter
+from pathlib import Path
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import DataError, IntegrityError, transaction
+from django.db.models import CharField, PositiveIntegerField, Q
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.utils.dateparse import parse_date
-from .models import EmpMaster, EmpComplianceTracker, EmpCtcInfo
+from . import batch, changes, events
+from .caching import (
+    BREAKDOWNS_KEY,
+    STATS_KEY,
+    bump_data_version,
+    data_etag,
+    employee_key,
+    extend_etag,
+    get_or_build,
+)
+from .compression import FILE_SUFFIXES, negotiate
+from .ids import emp_id_allocator
+from .metrics import render_prometheus
+from .importer import ImportTooLarge, import_employees
+from .models import EmpBankInfo, EmpMaster, EmpComplianceTracker, EmpCtcInfo, EmpRegInfo
+from .pagination import PaginationError, keyset_page, parse_limit
+from .queries import (
+    current_ctc_field,
+    current_ctc_title,
+    employee_profile,
+    employee_rollups,
+    headcount_breakdown,
+    headcount_totals,
+    job_history,
+)
+from .search import get_employee_index
+from .serialization import FORMATS, ROWS, FastJsonResponse, tabulate
+from .report_jobs import GZIP_SUFFIX, last_generated, latest_artifact, request_report
+from .reports import REPORT_CATALOG, REPORTS
 
 from .auth import (
     ExternalAuthError,
+    apost_form_json,
     create_signed_otp_challenge,
     create_signed_session,
     is_success_response,
     load_signed_otp_challenge,
-    load_signed_session,
     post_form_json,
     require_env,
 )
@@ -25,27 +73,24 @@ def _normalize_phone(raw: str) -> str:
     return re.sub(r'\D+', '', (raw or '').strip())
 
 
-def _get_bearer_token(request: HttpRequest) -> str | None:
-    auth_header = request.headers.get('Authorization')
-    if not auth_header:
-        return None
-
-    prefix = 'Bearer '
-    if not auth_header.startswith(prefix):
-        return None
-
-    token = auth_header[len(prefix) :].strip()
-    return token or None
+def _date_param(request: HttpRequest, name: str) -> tuple[date | None, JsonResponse | None]:
+    raw = (request.GET.get(name) or '').strip()
+    if not raw:
+        return None, None
+    try:
+        value = parse_date(raw)
+    except ValueError:
+        value = None
+    if not value:
+        return None, JsonResponse({'error': f'Invalid {name}. Use YYYY-MM-DD.'}, status=400)
+    return value, None
 
 
-def _get_session_payload(request: HttpRequest) -> dict | None:
-    token = _get_bearer_token(request)
-    if not token:
-        return None
-    try:
-        return load_signed_session(token)
-    except ExternalAuthError:
-        return None
+def _list_format(request: HttpRequest) -> tuple[str | None, JsonResponse | None]:
+    fmt = (request.GET.get('format') or ROWS).strip().lower()
+    if fmt not in FORMATS:
+        return None, JsonResponse({'error': f"format must be one of: {', '.join(FORMATS)}."}, status=400)
+    return fmt, None
 
 
 def _json_body(request: HttpRequest) -> dict:
@@ -57,6 +102,27 @@ def _json_body(request: HttpRequest) -> dict:
         return {}
 
 
+def _conditional_get(*models, daily: bool = False):
+    """Answer ``If-None-Match`` with 304 before a list view queries anything.
+
+    The ETag combines the data versions of ``models`` (every table the view
+    reads) with the full request path, plus today's date for views whose
+    output depends on it. Clients are told to always revalidate. The view
+    finds the ``data_etag`` of ``models`` in ``request.data_version``.
+    """
+    def etag(request: HttpRequest, *args, **kwargs) -> str:
+        request.data_version = data_etag(*models)
+        extra = request.get_full_path()
+        if daily:
+            extra = f'{extra}|{date.today().isoformat()}'
+        return extend_etag(request.data_version, extra)
+
+    return method_decorator(
+        [cache_control(private=True, no_cache=True), condition(etag_func=etag)],
+        name='get',
+    )
+
+
 def _external_error_message(result: dict, default: str) -> str:
     return result.get('error') or result.get('message') or default
 
@@ -66,6 +132,22 @@ def _external_success_message(result: dict) -> str | None:
     return message or None
 
 
+def _external_url_or_error(url_env: str) -> tuple[str | None, JsonResponse | None]:
+    try:
+        return require_env(url_env), None
+    except ExternalAuthError as exc:
+        return None, JsonResponse({'error': str(exc)}, status=500)
+
+
+def _external_result_or_error(
+    result: dict, *, failure_status: int, failure_default_message: str
+) -> tuple[dict | None, JsonResponse | None]:
+    if not is_success_response(result):
+        message = _external_error_message(result, failure_default_message)
+        return None, JsonResponse({'error': message}, status=failure_status)
+    return result, None
+
+
 def _post_external_or_error(
     *,
     url_env: str,
@@ -73,21 +155,78 @@ def _post_external_or_error(
     failure_status: int,
     failure_default_message: str,
 ) -> tuple[dict | None, JsonResponse | None]:
+    url, error = _external_url_or_error(url_env)
+    if error:
+        return None, error
+
     try:
-        url = require_env(url_env)
+        result = post_form_json(url=url, payload=payload)
     except ExternalAuthError as exc:
-        return None, JsonResponse({'error': str(exc)}, status=500)
+        return None, JsonResponse({'error': str(exc)}, status=502)
+
+    return _external_result_or_error(
+        result, failure_status=failure_status, failure_default_message=failure_default_message
+    )
+
+
+async def _apost_external_or_error(
+    *,
+    url_env: str,
+    payload: dict[str, str],
+    failure_status: int,
+    failure_default_message: str,
+) -> tuple[dict | None, JsonResponse | None]:
+    url, error = _external_url_or_error(url_env)
+    if error:
+        return None, error
 
     try:
-        result = post_form_json(url=url, payload=payload)
+        result = await apost_form_json(url=url, payload=payload)
     except ExternalAuthError as exc:
         return None, JsonResponse({'error': str(exc)}, status=502)
 
-    if not is_success_response(result):
-        message = _external_error_message(result, failure_default_message)
-        return None, JsonResponse({'error': message}, status=failure_status)
+    return _external_result_or_error(
+        result, failure_status=failure_status, failure_default_message=failure_default_message
+    )
 
-    return result, None
+
+class _ExternalAuthView(View):
+    """Base for views that proxy one call to the external auth service.
+
+    Subclasses implement ``prepare`` (validate input, return the keyword
+    arguments for ``_post_external_or_error`` or an error response) and
+    ``respond`` (shape the reply from a successful result).
+    """
+    def prepare(self, payload: dict) -> tuple[dict | None, JsonResponse | None]:
+        raise NotImplementedError
+
+    def respond(self, result: dict) -> JsonResponse:
+        raise NotImplementedError
+
+    def post(self, request: HttpRequest) -> JsonResponse:
+        call, error = self.prepare(_json_body(request))
+        if error:
+            return error
+
+        result, error = _post_external_or_error(**call)
+        if error:
+            return error
+
+        return self.respond(result or {})
+
+
+class _AsyncExternalAuthMixin:
+    """Native async ``post`` for ``_ExternalAuthView`` subclasses (used under ASGI)."""
+    async def post(self, request: HttpRequest) -> JsonResponse:
+        call, error = self.prepare(_json_body(request))
+        if error:
+            return error
+
+        result, error = await _apost_external_or_error(**call)
+        if error:
+            return error
+
+        return self.respond(result or {})
 
 
 class HealthView(View):
@@ -95,30 +234,86 @@ class HealthView(View):
         return JsonResponse({'status': 'ok'})
 
 
-class ApiLoginView(View):
-    def post(self, request: HttpRequest) -> JsonResponse:
+class MetricsView(View):
+    """Per-route request metrics in the Prometheus text format."""
+    def get(self, request: HttpRequest) -> HttpResponse:
+        expected = getattr(settings, 'METRICS_TOKEN', '')
+        if expected:
+            supplied = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(supplied.encode(), f'Bearer {expected}'.encode()):
+                return JsonResponse({'error': 'Unauthorized'}, status=401)
+        return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# Vite puts a content hash in every file name under assets/.
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class FrontendAssetView(View):
+    """Serve a built frontend asset, preferring a precompressed variant."""
+    def get(self, request: HttpRequest, path: str) -> HttpResponseBase:
+        root = Path(getattr(settings, 'FRONTEND_DIST')) / 'assets'
+        try:
+            target = Path(safe_join(root, path))
+        except SuspiciousFileOperation:
+            target = None
+        if target is None or not target.is_file():
+            return JsonResponse({'error': 'Not found'}, status=404)
+
+        offered = tuple(
+            coding for coding, suffix in FILE_SUFFIXES.items() if target.with_name(target.name + suffix).is_file()
+        )
+        coding = negotiate(request.headers.get('Accept-Encoding', ''), offered) if offered else None
+        served = target.with_name(target.name + FILE_SUFFIXES[coding]) if coding else target
+        content_type, _ = mimetypes.guess_type(target.name)
+        response = FileResponse(
+            served.open('rb'), content_type=content_type or 'application/octet-stream', filename=target.name,
+        )
+        if coding:
+            response['Content-Encoding'] = coding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+
+class BatchView(View):
+    """Answer several GET requests to this API in one round trip.
+
+    Body: ``{"requests": [{"id": "employees", "path": "/api/employees"}, ...],
+    "parallel": false}``. The response lists ``{"id", "status", "body"}`` per
+    sub-request in the same order; see ``hackathon.batch``.
+    """
+    def post(self, request: HttpRequest) -> HttpResponse:
         payload = _json_body(request)
-        username_raw = (payload.get('username') or '').strip()
+        try:
+            requests = batch.parse_requests(payload)
+        except batch.BatchError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        return batch.run(request, requests, parallel=bool(payload.get('parallel')))
+
+
+class ApiLoginView(_ExternalAuthView):
+    def prepare(self, payload: dict) -> tuple[dict | None, JsonResponse | None]:
+        self.username = (payload.get('username') or '').strip()
         password = (payload.get('password') or '').strip()
 
-        if not username_raw or not password:
-            return JsonResponse({'error': 'Please enter username and password.'}, status=400)
+        if not self.username or not password:
+            return None, JsonResponse({'error': 'Please enter username and password.'}, status=400)
 
-        result, error = _post_external_or_error(
-            url_env='LOGIN_THROUGH_PASSWORD_URL',
-            payload={
-                'email': username_raw,
+        return {
+            'url_env': 'LOGIN_THROUGH_PASSWORD_URL',
+            'payload': {
+                'email': self.username,
                 'password': password,
                 'system_name': SYSTEM_NAME,
             },
-            failure_status=401,
-            failure_default_message='Invalid username or password.',
-        )
-        if error:
-            return error
+            'failure_status': 401,
+            'failure_default_message': 'Invalid username or password.',
+        }, None
 
-        session_payload = {'email': username_raw}
-        session_payload.update(result or {})
+    def respond(self, result: dict) -> JsonResponse:
+        session_payload = {'email': self.username}
+        session_payload.update(result)
         raw_token, expires_at = create_signed_session(payload=session_payload)
 
         return JsonResponse(
@@ -127,51 +322,48 @@ class ApiLoginView(View):
                 'expires_at': expires_at.isoformat(),
                 'user': {
                     'id': None,
-                    'username': username_raw,
+                    'username': self.username,
                 },
             }
         )
 
 
-class ApiForgotPasswordView(View):
-    def post(self, request: HttpRequest) -> JsonResponse:
-        payload = _json_body(request)
+class ApiForgotPasswordView(_ExternalAuthView):
+    def prepare(self, payload: dict) -> tuple[dict | None, JsonResponse | None]:
         email = (payload.get('email') or '').strip()
         password = (payload.get('password') or '').strip()
 
         if not email or not password:
-            return JsonResponse({'error': 'Please enter email and password.'}, status=400)
+            return None, JsonResponse({'error': 'Please enter email and password.'}, status=400)
 
-        result, error = _post_external_or_error(
-            url_env='FORGET_PASSWORD_URL',
-            payload={
+        return {
+            'url_env': 'FORGET_PASSWORD_URL',
+            'payload': {
                 'email': email,
                 'password': password,
                 'system_name': SYSTEM_NAME,
             },
-            failure_status=400,
-            failure_default_message='Unable to reset password.',
-        )
-        if error:
-            return error
+            'failure_status': 400,
+            'failure_default_message': 'Unable to reset password.',
+        }, None
 
-        return JsonResponse({'ok': True, 'message': _external_success_message(result or {})})
+    def respond(self, result: dict) -> JsonResponse:
+        return JsonResponse({'ok': True, 'message': _external_success_message(result)})
 
 
-class ApiRegisterView(View):
-    def post(self, request: HttpRequest) -> JsonResponse:
-        payload = _json_body(request)
+class ApiRegisterView(_ExternalAuthView):
+    def prepare(self, payload: dict) -> tuple[dict | None, JsonResponse | None]:
         display_name = (payload.get('display_name') or '').strip()
         email = (payload.get('email') or '').strip()
         phone_number = _normalize_phone(payload.get('phone_number') or '')
         password = (payload.get('password') or '').strip()
 
         if not display_name or not email or not phone_number or not password:
-            return JsonResponse({'error': 'Please fill all required fields.'}, status=400)
+            return None, JsonResponse({'error': 'Please fill all required fields.'}, status=400)
 
-        result, error = _post_external_or_error(
-            url_env='REGISTER_URL',
-            payload={
+        return {
+            'url_env': 'REGISTER_URL',
+            'payload': {
                 'display_name': display_name,
                 'email': email,
                 'phone_number': phone_number,
@@ -179,18 +371,17 @@ class ApiRegisterView(View):
                 'system_name': SYSTEM_NAME,
                 'role': REGISTER_ROLE,
             },
-            failure_status=400,
-            failure_default_message='Unable to create account.',
-        )
-        if error:
-            return error
+            'failure_status': 400,
+            'failure_default_message': 'Unable to create account.',
+        }, None
 
-        return JsonResponse({'ok': True, 'message': _external_success_message(result or {})})
+    def respond(self, result: dict) -> JsonResponse:
+        return JsonResponse({'ok': True, 'message': _external_success_message(result)})
 
 
 class ApiMeView(View):
     def get(self, request: HttpRequest) -> JsonResponse:
-        session_payload = _get_session_payload(request)
+        session_payload = getattr(request, 'auth_session', None)
         if session_payload is None:
             return JsonResponse({'error': 'Unauthorized'}, status=401)
 
@@ -217,102 +408,301 @@ class ApiLogoutView(View):
         return JsonResponse({'ok': True})
 
 
-class ApiOtpRequestView(View):
-    def post(self, request: HttpRequest) -> JsonResponse:
-        payload = _json_body(request)
+class ApiOtpRequestView(_ExternalAuthView):
+    def prepare(self, payload: dict) -> tuple[dict | None, JsonResponse | None]:
         channel = (payload.get('channel') or '').strip().lower()
         phone = _normalize_phone(payload.get('phone') or payload.get('username') or '')
         email = (payload.get('email') or payload.get('username') or '').strip()
 
         if channel not in {'whatsapp', 'email'}:
-            return JsonResponse({'error': 'Invalid OTP channel.'}, status=400)
+            return None, JsonResponse({'error': 'Invalid OTP channel.'}, status=400)
 
         if channel == 'whatsapp' and not phone:
-            return JsonResponse({'error': 'Please enter mobile number.'}, status=400)
+            return None, JsonResponse({'error': 'Please enter mobile number.'}, status=400)
         if channel == 'email' and not email:
-            return JsonResponse({'error': 'Please enter email id.'}, status=400)
-
-        identifier = email if channel == 'email' else phone
-        result, error = _post_external_or_error(
-            url_env='SEND_OTP_URL',
-            payload={
-                'email': identifier,
+            return None, JsonResponse({'error': 'Please enter email id.'}, status=400)
+
+        self.channel = channel
+        self.identifier = email if channel == 'email' else phone
+        return {
+            'url_env': 'SEND_OTP_URL',
+            'payload': {
+                'email': self.identifier,
                 'type': channel,
                 'system_name': SYSTEM_NAME,
             },
-            failure_status=400,
-            failure_default_message='Unable to request key',
-        )
-        if error:
-            return error
+            'failure_status': 400,
+            'failure_default_message': 'Unable to request key',
+        }, None
 
-        challenge_id, expires_at = create_signed_otp_challenge(email=identifier, channel=channel)
+    def respond(self, result: dict) -> JsonResponse:
+        challenge_id, expires_at = create_signed_otp_challenge(email=self.identifier, channel=self.channel)
         return JsonResponse({'challenge_id': challenge_id, 'expires_at': expires_at.isoformat()})
 
 
-class ApiOtpVerifyView(View):
-    def post(self, request: HttpRequest) -> JsonResponse:
-        payload = _json_body(request)
+class ApiOtpVerifyView(_ExternalAuthView):
+    def prepare(self, payload: dict) -> tuple[dict | None, JsonResponse | None]:
         challenge_id = payload.get('challenge_id')
         otp = (payload.get('otp') or '').strip()
 
         if not challenge_id or not otp:
-            return JsonResponse({'error': 'Please enter OTP.'}, status=400)
+            return None, JsonResponse({'error': 'Please enter OTP.'}, status=400)
 
         try:
             otp_payload = load_signed_otp_challenge(str(challenge_id))
         except ExternalAuthError as exc:
-            return JsonResponse({'error': str(exc)}, status=401)
+            return None, JsonResponse({'error': str(exc)}, status=401)
 
-        email = (otp_payload.get('email') or '').strip()
-        result, error = _post_external_or_error(
-            url_env='VERIFY_OTP_URL',
-            payload={
-                'email': email,
+        self.email = (otp_payload.get('email') or '').strip()
+        return {
+            'url_env': 'VERIFY_OTP_URL',
+            'payload': {
+                'email': self.email,
                 'otp': otp,
                 'system_name': SYSTEM_NAME,
             },
-            failure_status=401,
-            failure_default_message='Invalid or expired OTP.',
-        )
-        if error:
-            return error
+            'failure_status': 401,
+            'failure_default_message': 'Invalid or expired OTP.',
+        }, None
 
-        session_payload = {'email': email}
-        session_payload.update(result or {})
+    def respond(self, result: dict) -> JsonResponse:
+        session_payload = {'email': self.email}
+        session_payload.update(result)
         raw_token, expires_at = create_signed_session(payload=session_payload)
 
         return JsonResponse(
             {
                 'token': raw_token,
                 'expires_at': expires_at.isoformat(),
-                'user': {'id': None, 'username': email},
+                'user': {'id': None, 'username': self.email},
             }
         )
 
 
+# Native async variants, routed instead of the sync views when
+# settings.ASYNC_AUTH_VIEWS is on (the default under backend/asgi.py).
+class AsyncApiLoginView(_AsyncExternalAuthMixin, ApiLoginView):
+    pass
+
+
+class AsyncApiForgotPasswordView(_AsyncExternalAuthMixin, ApiForgotPasswordView):
+    pass
+
+
+class AsyncApiRegisterView(_AsyncExternalAuthMixin, ApiRegisterView):
+    pass
+
+
+class AsyncApiOtpRequestView(_AsyncExternalAuthMixin, ApiOtpRequestView):
+    pass
+
+
+class AsyncApiOtpVerifyView(_AsyncExternalAuthMixin, ApiOtpVerifyView):
+    pass
+
+
+EMPLOYEE_FIELDS = ('emp_id', 'first_name', 'last_name', 'start_date')
+
+EMPLOYEE_SORTS = {
+    'emp_id': ('emp_id',),
+    '-emp_id': ('-emp_id',),
+    'start_date': ('start_date', 'emp_id'),
+    '-start_date': ('-start_date', '-emp_id'),
+}
+
+
+@_conditional_get(EmpMaster)
 class EmployeeListView(View):
+    """Employee list with optional filters and keyset pagination.
+
+    Query params: ``status`` (active|exited), ``start_from``/``start_to``
+    (YYYY-MM-DD), ``name`` (first/last name prefix), ``sort`` (see
+    ``EMPLOYEE_SORTS``), ``limit``, ``cursor`` and ``format`` (rows|columns).
+    Without ``limit`` or ``cursor`` the full (filtered) list is returned.
+    """
+    def get(self, request: HttpRequest) -> HttpResponse:
+        params = request.GET
+        sort = params.get('sort') or 'emp_id'
+        if sort not in EMPLOYEE_SORTS:
+            return JsonResponse({'error': f'Invalid sort: {sort}'}, status=400)
+        fmt, error = _list_format(request)
+        if error:
+            return error
+
+        employees = EmpMaster.objects.values(*EMPLOYEE_FIELDS)
+
+        status = (params.get('status') or '').strip().lower()
+        if status == 'active':
+            employees = employees.filter(end_date__isnull=True)
+        elif status == 'exited':
+            employees = employees.filter(end_date__isnull=False)
+        elif status:
+            return JsonResponse({'error': 'status must be active or exited.'}, status=400)
+
+        start_from, error = _date_param(request, 'start_from')
+        if error:
+            return error
+        start_to, error = _date_param(request, 'start_to')
+        if error:
+            return error
+        if start_from:
+            employees = employees.filter(start_date__gte=start_from)
+        if start_to:
+            employees = employees.filter(start_date__lte=start_to)
+
+        name = (params.get('name') or '').strip()
+        if name:
+            employees = employees.filter(Q(first_name__istartswith=name) | Q(last_name__istartswith=name))
+
+        order = EMPLOYEE_SORTS[sort]
+        if 'limit' not in params and 'cursor' not in params:
+            rows = employees.values_list(*EMPLOYEE_FIELDS).order_by(*order)
+            return FastJsonResponse({'employees': tabulate(EMPLOYEE_FIELDS, rows, fmt), 'next_cursor': None})
+
+        try:
+            limit = parse_limit(params.get('limit'))
+            rows, next_cursor = keyset_page(employees, order=order, limit=limit, cursor=params.get('cursor'))
+        except PaginationError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        values = map(itemgetter(*EMPLOYEE_FIELDS), rows)
+        return FastJsonResponse({'employees': tabulate(EMPLOYEE_FIELDS, values, fmt), 'next_cursor': next_cursor})
+
+
+class EmployeeSearchView(View):
+    """Typeahead search over employee names and current titles.
+
+    Query params: ``q`` (required), ``status`` (active|exited), ``limit``.
+    """
     def get(self, request: HttpRequest) -> JsonResponse:
-        # Example: Fetch all employees
-        employees = EmpMaster.objects.all().values(
-            'emp_id', 'first_name', 'last_name', 'start_date'
+        query = (request.GET.get('q') or '').strip()
+        if not query:
+            return JsonResponse({'results': []})
+
+        status = (request.GET.get('status') or '').strip().lower()
+        if status not in {'', 'active', 'exited'}:
+            return JsonResponse({'error': 'status must be active or exited.'}, status=400)
+        active = None if not status else status == 'active'
+
+        try:
+            limit = parse_limit(request.GET.get('limit'), default=20)
+        except PaginationError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+
+        docs = get_employee_index().search(query, limit=limit, active=active)
+        return JsonResponse({'results': [doc.as_dict() for doc in docs]})
+
+
+PROFILE_MODELS = (EmpMaster, EmpRegInfo, EmpBankInfo, EmpCtcInfo, EmpComplianceTracker)
+
+
+class EmployeeProfileView(View):
+    """Everything about one employee: master row, registration IDs, bank
+    accounts, CTC timeline and compliance documents.
+
+    Requires a session (the profile holds PAN/Aadhaar and bank details). The
+    assembled profile is cached per employee and data version of the five
+    tables; ``X-Cache`` tells whether it came from the cache.
+    """
+    def get(self, request: HttpRequest, emp_id: int) -> JsonResponse:
+        if getattr(request, 'auth_session', None) is None:
+            return JsonResponse({'error': 'Unauthorized'}, status=401)
+
+        profile, hit = get_or_build(
+            employee_key(emp_id), lambda: employee_profile(emp_id), version=data_etag(*PROFILE_MODELS),
         )
-        return JsonResponse({'employees': list(employees)})
+        if profile is None:
+            return JsonResponse({'error': f'Employee {emp_id} not found.'}, status=404)
+        response = JsonResponse(profile)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
 
 
+COMPLIANCE_FIELDS = ('id', 'employee', 'type', 'status')
+
+
+@_conditional_get(EmpComplianceTracker, EmpMaster)
 class ComplianceListView(View):
-    def get(self, request: HttpRequest) -> JsonResponse:
-        # Example: Fetch compliance records with related employee info
-        records = EmpComplianceTracker.objects.select_related('emp').all()
-        data = []
-        for record in records:
-            data.append({
-                'id': record.emp_compliance_tracker_id,
-                'employee': f"{record.emp.first_name} {record.emp.last_name}",
-                'type': record.comp_type,
-                'status': record.status,
-            })
-        return JsonResponse({'compliance_records': data})
+    def get(self, request: HttpRequest) -> HttpResponse:
+        fmt, error = _list_format(request)
+        if error:
+            return error
+        # Compliance records with the employee name from one joined query.
+        records = EmpComplianceTracker.objects.values_list(
+            'emp_compliance_tracker_id', 'emp__first_name', 'emp__last_name', 'comp_type', 'status',
+        )
+        values = (
+            (record_id, f'{first} {last}', comp_type, status)
+            for record_id, first, last, comp_type, status in records
+        )
+        return FastJsonResponse({'compliance_records': tabulate(COMPLIANCE_FIELDS, values, fmt)})
+
+
+class ChangesView(View):
+    """Rows written since a change-log sequence number.
+
+    Query params: ``since`` (the ``seq`` of the previous response; omit it
+    to get only the current ``seq``), ``limit`` (log entries per page) and
+    ``format`` (rows|columns). ``upserts`` holds the current rows and
+    ``deletes`` the IDs of removed ones, both keyed by table; keep calling
+    while ``has_more`` is true. See ``hackathon.changes``.
+    """
+    def get(self, request: HttpRequest) -> HttpResponse:
+        fmt, error = _list_format(request)
+        if error:
+            return error
+        raw = (request.GET.get('since') or '').strip()
+        if not raw:
+            return FastJsonResponse({'seq': changes.current_seq(), 'has_more': False, 'upserts': {}, 'deletes': {}})
+        try:
+            since = int(raw)
+        except ValueError:
+            since = -1
+        if since < 0:
+            return JsonResponse({'error': 'since must be a non-negative integer.'}, status=400)
+        try:
+            limit = parse_limit(request.GET.get('limit'), default=500)
+        except PaginationError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+
+        delta = changes.changes_since(since, limit=limit, fmt=fmt)
+        return FastJsonResponse(
+            {'seq': delta.seq, 'has_more': delta.has_more, 'upserts': delta.upserts, 'deletes': delta.deletes}
+        )
+
+
+async def _event_stream(last_event_id: str):
+    subscriber = events.broadcaster.subscribe()
+    try:
+        yield b'retry: 5000\n\n'
+        if last_event_id.isdigit():
+            # Events sent while the client was away are gone; catch up by delta.
+            yield events.resync_frame(int(last_event_id))
+        heartbeat = getattr(settings, 'EVENTS_HEARTBEAT', 15)
+        while True:
+            data = await subscriber.get(heartbeat)
+            # Comments keep proxies from timing out an idle stream.
+            yield data if data is not None else b': keep-alive\n\n'
+    finally:
+        events.broadcaster.unsubscribe(subscriber)
+
+
+class EventStreamView(View):
+    """Server-sent events about employee writes; see ``hackathon.events``.
+
+    Only served under ASGI (backend/asgi.py), where a connected client is a
+    suspended coroutine; under WSGI it would hold a worker thread for as
+    long as it stays connected, so it gets 503 there.
+    """
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({'error': 'Live updates need the ASGI server (backend/asgi.py).'}, status=503)
+        response = StreamingHttpResponse(
+            _event_stream(request.headers.get('Last-Event-ID', '').strip()), content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream.
+        response['X-Accel-Buffering'] = 'no'
+        return response
 
 
 class ApiAddEmployeeView(View):
@@ -330,249 +720,362 @@ class ApiAddEmployeeView(View):
         if not start_date:
             return JsonResponse({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=400)
 
-        # Handle ID generation if DB isn't Auto-Increment
-        # For now, we try to let DB handle it. If it fails, we might need to fetch max ID.
-        # However, typically 'primary_key=True' implies we might want to let DB handle it.
-        # If DB is not auto-increment, we need to manually set it.
-        # Let's try to find the max ID and increment + 1 just in case, or try insert.
-        # To be safe given 'managed=False' and typical legacy DBs:
-        last_emp = EmpMaster.objects.order_by('-emp_id').first()
-        new_id = (last_emp.emp_id + 1) if last_emp else 1
+        # emp_master has no auto-increment; IDs come from a hi/lo block
+        # reserved under a row lock, so concurrent adds never collide.
+        new_id = emp_id_allocator.next_id()
 
         try:
-            emp = EmpMaster.objects.create(
-                emp_id=new_id, 
-                first_name=first_name,
-                last_name=last_name,
-                start_date=start_date,
-                middle_name=payload.get('middle_name'),
-                end_date=parse_date(payload.get('end_date')) if payload.get('end_date') else None
-            )
+            with transaction.atomic():
+                emp = EmpMaster.objects.create(
+                    emp_id=new_id, 
+                    first_name=first_name,
+                    last_name=last_name,
+                    start_date=start_date,
+                    middle_name=payload.get('middle_name'),
+                    end_date=parse_date(payload.get('end_date')) if payload.get('end_date') else None
+                )
+                seq = changes.record({EmpMaster: [emp.emp_id]})
+                bump_data_version(EmpMaster)
         except Exception as e:
              return JsonResponse({'error': str(e)}, status=500)
 
+        events.publish(events.EMPLOYEES_ADDED, seq=seq, ids=[emp.emp_id])
         return JsonResponse({'ok': True, 'message': 'Employee added successfully', 'emp_id': emp.emp_id})
 
 
+def _import_lines(request: HttpRequest, max_bytes: int):
+    """Yield the body of ``request`` line by line, at most ``max_bytes`` of it."""
+    remaining = max_bytes
+    while True:
+        line = request.readline(remaining + 1)
+        if not line:
+            return
+        remaining -= len(line)
+        if remaining < 0:
+            raise ImportTooLarge(f'Imports are limited to {max_bytes} bytes.')
+        yield line
+
+
+def _import_rows(request: HttpRequest):
+    """Rows of a bulk import: CSV upload (``file``), a text/csv body or JSON.
+
+    Bodies are read from the request stream rather than ``request.body``
+    and bounded by ``IMPORT_MAX_BYTES`` instead of
+    DATA_UPLOAD_MAX_MEMORY_SIZE: the declared length is checked first and
+    the bytes actually read are counted. CSV is parsed as it streams in; a
+    JSON body has to be read whole before it can be parsed.
+    """
+    max_bytes = getattr(settings, 'IMPORT_MAX_BYTES', 20 * 1024 * 1024)
+    length = request.META.get('CONTENT_LENGTH') or ''
+    if length.isdigit() and int(length) > max_bytes:
+        raise ImportTooLarge(f'Imports are limited to {max_bytes} bytes.')
+    if request.content_type == 'multipart/form-data':
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValueError('Upload a CSV file in the "file" field.')
+        if upload.size > max_bytes:
+            raise ImportTooLarge(f'Imports are limited to {max_bytes} bytes.')
+        return csv.DictReader(io.TextIOWrapper(upload, encoding='utf-8-sig'))
+    if request.content_type == 'text/csv':
+        return csv.DictReader(codecs.iterdecode(_import_lines(request, max_bytes), 'utf-8-sig'))
+    body = request.read(max_bytes + 1)
+    if len(body) > max_bytes:
+        raise ImportTooLarge(f'Imports are limited to {max_bytes} bytes.')
+    payload = json.loads(body.decode('utf-8') or 'null')
+    if isinstance(payload, dict):
+        payload = payload.get('employees')
+    if not isinstance(payload, list):
+        raise ValueError('Expected a JSON array of employees or {"employees": [...]}.')
+    return payload
+
+
+class ApiBulkImportEmployeesView(View):
+    """Bulk-create employees (plus optional CTC, registration and bank rows).
+
+    Accepts a JSON array, ``{"employees": [...]}``, a text/csv body or a
+    multipart CSV upload named ``file``. Nothing is written if any row is
+    invalid unless ``?partial=1`` is given. Requires a session; bodies over
+    ``IMPORT_MAX_BYTES`` (or ``importer.MAX_ROWS`` rows) get 413.
+    """
+    def post(self, request: HttpRequest) -> JsonResponse:
+        if getattr(request, 'auth_session', None) is None:
+            return JsonResponse({'error': 'Unauthorized'}, status=401)
+
+        partial = request.GET.get('partial', '').lower() in {'1', 'true', 'yes'}
+        try:
+            result = import_employees(_import_rows(request), partial=partial)
+        except ImportTooLarge as exc:
+            return JsonResponse({'error': str(exc)}, status=413)
+        except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        except IntegrityError as exc:
+            return JsonResponse({'error': f'Import conflicts with existing data: {exc}'}, status=409)
+        except DataError as exc:
+            return JsonResponse({'error': f'Import has a value the database rejects: {exc}'}, status=400)
+
+        if result.employees:
+            events.publish(events.EMPLOYEES_ADDED, seq=result.seq, ids=[emp.emp_id for emp in result.employees])
+
+        status = 400 if result.errors and not result.imported else 200
+        return JsonResponse(
+            {
+                'ok': status == 200,
+                'received': result.received,
+                'imported': result.imported,
+                'emp_ids': [emp.emp_id for emp in result.employees],
+                'errors': result.errors,
+            },
+            status=status,
+        )
+
+
+ONBOARDING_FIELDS = ('emp_id', 'employee', 'role', 'date_of_joining', 'status', 'docs_uploaded')
+
+
+def _onboarding_values(row: dict) -> tuple:
+    total, verified = row['docs_total'], row['docs_verified']
+    if total == 0:
+        status = 'Not Started'
+    elif verified == total:
+        status = 'Completed'
+    else:
+        status = 'In Progress'
+    return (
+        row['emp_id'],
+        f"{row['first_name']} {row['last_name']}",
+        row['role'] or 'N/A',
+        str(row['start_date']),
+        status,
+        f"{verified} / {total}",
+    )
+
+
+@_conditional_get(EmpMaster, EmpCtcInfo, EmpComplianceTracker)
 class OnboardingListView(View):
-    def get(self, request: HttpRequest) -> JsonResponse:
-        employees = list(EmpMaster.objects.all())
-        # Bulk-fetch all CTC and compliance records (2 queries instead of 2*N)
-        all_ctc = list(EmpCtcInfo.objects.all().order_by('-start_of_ctc'))
-        all_compliance = list(EmpComplianceTracker.objects.all())
-
-        # Build lookup dicts
-        ctc_by_emp = {}
-        for c in all_ctc:
-            ctc_by_emp.setdefault(c.emp_id, []).append(c)
-        comp_by_emp = {}
-        for c in all_compliance:
-            comp_by_emp.setdefault(c.emp_id, []).append(c)
-
-        data = []
-        for emp in employees:
-            ctc_list = ctc_by_emp.get(emp.emp_id, [])
-            # Pick active (no end_of_ctc) or latest
-            ctc = next((c for c in ctc_list if c.end_of_ctc is None), ctc_list[0] if ctc_list else None)
-            role = ctc.ext_title if ctc else 'N/A'
-
-            records = comp_by_emp.get(emp.emp_id, [])
-            total = len(records)
-            verified = sum(1 for r in records if r.status in ('Verified', 'Completed'))
-
-            if total == 0:
-                status, docs_done, docs_total = 'Not Started', 0, 0
-            elif verified == total:
-                status, docs_done, docs_total = 'Completed', verified, total
-            else:
-                status, docs_done, docs_total = 'In Progress', verified, total
+    def get(self, request: HttpRequest) -> HttpResponse:
+        fmt, error = _list_format(request)
+        if error:
+            return error
+        # One aggregated query: role and compliance counts come back per employee.
+        values = map(_onboarding_values, employee_rollups())
+        return FastJsonResponse({'onboarding': tabulate(ONBOARDING_FIELDS, values, fmt)})
+
+
+JOB_HISTORY_ORDER = ('-effective_date', 'emp_id', 'emp_ctc_id')
+
+
+JOB_HISTORY_FIELDS = (
+    'emp_id', 'employee', 'previous_role', 'new_role', 'level', 'effective_date', 'end_date', 'ctc', 'type',
+)
 
-            data.append({
-                'emp_id': emp.emp_id,
-                'employee': f"{emp.first_name} {emp.last_name}",
-                'role': role,
-                'date_of_joining': str(emp.start_date),
-                'status': status,
-                'docs_uploaded': f"{docs_done} / {docs_total}",
-            })
 
-        return JsonResponse({'onboarding': data})
+def _job_history_values(row: dict) -> tuple:
+    previous = row['previous_title']
+    return (
+        row['emp_id'],
+        f"{row['first_name']} {row['last_name']}",
+        previous or '—',
+        row['ext_title'],
+        f"L{row['main_level']}{row['sub_level']}",
+        str(row['effective_date']),
+        str(row['end_of_ctc']) if row['end_of_ctc'] else 'Current',
+        row['ctc_amt'],
+        'Initial' if previous is None else 'Promotion',
+    )
 
 
+@_conditional_get(EmpMaster, EmpCtcInfo)
 class JobHistoryListView(View):
-    def get(self, request: HttpRequest) -> JsonResponse:
-        employees = {e.emp_id: e for e in EmpMaster.objects.all()}
-        # Single query for all CTC records
-        all_ctc = list(EmpCtcInfo.objects.all().order_by('emp_id', 'start_of_ctc'))
-
-        ctc_by_emp = {}
-        for c in all_ctc:
-            ctc_by_emp.setdefault(c.emp_id, []).append(c)
-
-        data = []
-        for emp_id, ctc_list in ctc_by_emp.items():
-            emp = employees.get(emp_id)
-            if not emp:
-                continue
-            name = f"{emp.first_name} {emp.last_name}"
-            prev_title = None
-            for ctc in ctc_list:
-                change_type = 'Initial' if prev_title is None else 'Promotion'
-                data.append({
-                    'emp_id': emp_id,
-                    'employee': name,
-                    'previous_role': prev_title or '—',
-                    'new_role': ctc.ext_title,
-                    'level': f"L{ctc.main_level}{ctc.sub_level}",
-                    'effective_date': str(ctc.start_of_ctc),
-                    'end_date': str(ctc.end_of_ctc) if ctc.end_of_ctc else 'Current',
-                    'ctc': ctc.ctc_amt,
-                    'type': change_type,
-                })
-                prev_title = ctc.ext_title
-
-        data.sort(key=lambda x: x['effective_date'], reverse=True)
-        return JsonResponse({'job_history': data})
+    """CTC changes, newest first, with the role each one replaced.
+
+    Query params: ``employee`` (emp_id), ``effective_from``/``effective_to``
+    (YYYY-MM-DD), ``limit``, ``cursor`` and ``format`` (rows|columns).
+    Without ``limit`` or ``cursor`` the full (filtered) history is returned.
+    """
+    def get(self, request: HttpRequest) -> HttpResponse:
+        params = request.GET
+        fmt, error = _list_format(request)
+        if error:
+            return error
+        employees = None
+        employee = (params.get('employee') or '').strip()
+        if employee:
+            if not employee.isdigit():
+                return JsonResponse({'error': 'employee must be an emp_id.'}, status=400)
+            employees = EmpMaster.objects.filter(emp_id=int(employee))
+        history = job_history(employees)
+
+        effective_from, error = _date_param(request, 'effective_from')
+        if error:
+            return error
+        effective_to, error = _date_param(request, 'effective_to')
+        if error:
+            return error
+        if effective_from:
+            history = history.filter(effective_date__gte=effective_from)
+        if effective_to:
+            history = history.filter(effective_date__lte=effective_to)
 
+        if 'limit' not in params and 'cursor' not in params:
+            rows = history.order_by(*JOB_HISTORY_ORDER).iterator(chunk_size=2000)
+            entries = tabulate(JOB_HISTORY_FIELDS, map(_job_history_values, rows), fmt)
+            return FastJsonResponse({'job_history': entries, 'next_cursor': None})
 
-class ExitWorkflowListView(View):
-    def get(self, request: HttpRequest) -> JsonResponse:
-        from datetime import date
-        today = date.today()
+        try:
+            limit = parse_limit(params.get('limit'))
+            rows, next_cursor = keyset_page(history, order=JOB_HISTORY_ORDER, limit=limit, cursor=params.get('cursor'))
+        except PaginationError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        entries = tabulate(JOB_HISTORY_FIELDS, map(_job_history_values, rows), fmt)
+        return FastJsonResponse({'job_history': entries, 'next_cursor': next_cursor})
 
-        exiting = list(EmpMaster.objects.exclude(end_date__isnull=True))
-        if not exiting:
-            return JsonResponse({'exit_requests': [], 'completed_exits': []})
 
-        emp_ids = [e.emp_id for e in exiting]
-        # Bulk-fetch CTC and compliance for exiting employees only
-        all_ctc = list(EmpCtcInfo.objects.filter(emp_id__in=emp_ids).order_by('-start_of_ctc'))
-        all_comp = list(EmpComplianceTracker.objects.filter(emp_id__in=emp_ids))
+EXIT_REQUEST_FIELDS = ('emp_id', 'employee', 'role', 'resignation_date', 'last_working_day', 'status')
+COMPLETED_EXIT_FIELDS = ('emp_id', 'employee', 'role', 'last_working_day', 'clearance_status')
 
-        ctc_by_emp = {}
-        for c in all_ctc:
-            ctc_by_emp.setdefault(c.emp_id, []).append(c)
-        comp_by_emp = {}
-        for c in all_comp:
-            comp_by_emp.setdefault(c.emp_id, []).append(c)
+
+@_conditional_get(EmpMaster, EmpCtcInfo, EmpComplianceTracker, daily=True)
+class ExitWorkflowListView(View):
+    def get(self, request: HttpRequest) -> HttpResponse:
+        fmt, error = _list_format(request)
+        if error:
+            return error
+        today = date.today()
 
         exit_requests = []
         completed_exits = []
 
-        for emp in exiting:
-            ctc_list = ctc_by_emp.get(emp.emp_id, [])
-            ctc = next((c for c in ctc_list if c.end_of_ctc is None), ctc_list[0] if ctc_list else None)
-            role = ctc.ext_title if ctc else 'N/A'
-
-            records = comp_by_emp.get(emp.emp_id, [])
-            total = len(records)
-            verified = sum(1 for r in records if r.status in ('Verified', 'Completed'))
-
-            if emp.end_date >= today:
-                exit_requests.append({
-                    'emp_id': emp.emp_id,
-                    'employee': f"{emp.first_name} {emp.last_name}",
-                    'role': role,
-                    'resignation_date': str(emp.start_date),
-                    'last_working_day': str(emp.end_date),
-                    'status': 'Notice Period',
-                })
+        for row in employee_rollups(EmpMaster.objects.exclude(end_date__isnull=True)):
+            name = f"{row['first_name']} {row['last_name']}"
+            role = row['role'] or 'N/A'
+            if row['end_date'] >= today:
+                exit_requests.append((
+                    row['emp_id'], name, role, str(row['start_date']), str(row['end_date']), 'Notice Period',
+                ))
             else:
+                total, verified = row['docs_total'], row['docs_verified']
                 clearance = 'Cleared' if (total > 0 and verified == total) else 'Pending'
-                completed_exits.append({
-                    'emp_id': emp.emp_id,
-                    'employee': f"{emp.first_name} {emp.last_name}",
-                    'role': role,
-                    'last_working_day': str(emp.end_date),
-                    'clearance_status': clearance,
-                })
-
-        return JsonResponse({
-            'exit_requests': exit_requests,
-            'completed_exits': completed_exits,
+                completed_exits.append((row['emp_id'], name, role, str(row['end_date']), clearance))
+
+        return FastJsonResponse({
+            'exit_requests': tabulate(EXIT_REQUEST_FIELDS, exit_requests, fmt),
+            'completed_exits': tabulate(COMPLETED_EXIT_FIELDS, completed_exits, fmt),
         })
 
 
+# Tables behind the cached stats and breakdowns (ReportStatsView's ETag).
+STATS_MODELS = (EmpMaster, EmpCtcInfo)
+
+
+def _headcount_stats() -> dict:
+    counts = headcount_totals()
+    total, exited = counts['total'], counts['exited']
+    attrition = round((exited / total * 100), 1) if total > 0 else 0
+    return {
+        'total_headcount': total,
+        'active_employees': total - exited,
+        'exited_employees': exited,
+        'attrition_rate': attrition,
+    }
+
+
+def _headcount_breakdowns() -> dict:
+    return {
+        'by_level': headcount_breakdown(
+            main_level=current_ctc_field('main_level', PositiveIntegerField()),
+            sub_level=current_ctc_field('sub_level', CharField()),
+        ),
+        'by_title': headcount_breakdown(title=current_ctc_title()),
+    }
+
+
+def _report_catalog() -> list[dict]:
+    return [
+        {'name': name, 'description': description, 'slug': slug, 'last_generated': last_generated(slug)}
+        for name, description, slug in REPORT_CATALOG
+    ]
+
+
 class ReportsView(View):
-    """Live stats for the Reports & Analytics page."""
-    def get(self, request: HttpRequest) -> JsonResponse:
-        from datetime import date
-        total = EmpMaster.objects.count()
-        exited = EmpMaster.objects.exclude(end_date__isnull=True).count()
-        attrition = round((exited / total * 100), 1) if total > 0 else 0
-        active = total - exited
-        today = date.today().isoformat()
-        return JsonResponse({
-            'total_headcount': total,
-            'active_employees': active,
-            'exited_employees': exited,
-            'attrition_rate': attrition,
-            'reports': [
-                {'name': 'Headcount Report', 'description': 'Breakdown by Level & Role', 'slug': 'headcount', 'last_generated': today},
-                {'name': 'Joiners & Leavers', 'description': 'Monthly movement tracking', 'slug': 'joiners-leavers', 'last_generated': today},
-                {'name': 'CTC Distribution', 'description': 'Salary band analysis', 'slug': 'ctc', 'last_generated': today},
-                {'name': 'Compliance Status', 'description': 'Audit ready compliance report', 'slug': 'compliance', 'last_generated': today},
-            ],
-        })
+    """Live stats for the Reports & Analytics page.
 
+    Stats are cached per data version of the employee tables; ``X-Cache`` tells
+    whether they were served from the cache. ``last_generated`` is when the
+    newest file of each report was written, or null if it never was.
+    """
+    def get(self, request: HttpRequest) -> JsonResponse:
+        stats, hit = get_or_build(STATS_KEY, _headcount_stats, version=data_etag(*STATS_MODELS))
+        response = JsonResponse({**stats, 'reports': _report_catalog()})
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
 
-class ReportDownloadView(View):
-    """Generate CSV reports from live database data."""
-    def get(self, request: HttpRequest, slug: str) -> JsonResponse:
-        import csv
-        from django.http import HttpResponse as DjangoHttpResponse
-
-        if slug == 'headcount':
-            response = DjangoHttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = 'attachment; filename="headcount_report.csv"'
-            writer = csv.writer(response)
-            writer.writerow(['Emp ID', 'First Name', 'Last Name', 'Role', 'Level', 'Start Date', 'End Date', 'Status'])
-            employees = list(EmpMaster.objects.all())
-            all_ctc = list(EmpCtcInfo.objects.all().order_by('-start_of_ctc'))
-            ctc_by_emp = {}
-            for c in all_ctc:
-                ctc_by_emp.setdefault(c.emp_id, []).append(c)
-            for emp in employees:
-                ctc_list = ctc_by_emp.get(emp.emp_id, [])
-                ctc = next((c for c in ctc_list if c.end_of_ctc is None), ctc_list[0] if ctc_list else None)
-                role = ctc.ext_title if ctc else 'N/A'
-                level = f"L{ctc.main_level}{ctc.sub_level}" if ctc else 'N/A'
-                status = 'Active' if emp.end_date is None else 'Exited'
-                writer.writerow([emp.emp_id, emp.first_name, emp.last_name, role, level, emp.start_date, emp.end_date or '', status])
-            return response
 
-        elif slug == 'joiners-leavers':
-            response = DjangoHttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = 'attachment; filename="joiners_leavers_report.csv"'
-            writer = csv.writer(response)
-            writer.writerow(['Emp ID', 'Name', 'Type', 'Date'])
-            for emp in EmpMaster.objects.all().order_by('-start_date'):
-                writer.writerow([emp.emp_id, f"{emp.first_name} {emp.last_name}", 'Joiner', emp.start_date])
-            for emp in EmpMaster.objects.exclude(end_date__isnull=True).order_by('-end_date'):
-                writer.writerow([emp.emp_id, f"{emp.first_name} {emp.last_name}", 'Leaver', emp.end_date])
-            return response
+@_conditional_get(*STATS_MODELS)
+class ReportStatsView(View):
+    """Headcount/attrition totals plus breakdowns by current level and title.
 
-        elif slug == 'ctc':
-            response = DjangoHttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = 'attachment; filename="ctc_distribution_report.csv"'
-            writer = csv.writer(response)
-            writer.writerow(['Emp ID', 'Name', 'Role', 'Level', 'CTC Amount', 'Start Date', 'End Date'])
-            for ctc in EmpCtcInfo.objects.select_related('emp').all().order_by('-ctc_amt'):
-                writer.writerow([ctc.emp_id, f"{ctc.emp.first_name} {ctc.emp.last_name}", ctc.ext_title,
-                                 f"L{ctc.main_level}{ctc.sub_level}", ctc.ctc_amt, ctc.start_of_ctc, ctc.end_of_ctc or 'Current'])
-            return response
+    Breakdowns are column arrays (``main_level``/``sub_level`` or ``title``,
+    then ``headcount``, ``active``, ``exited``); employees without a CTC row
+    are grouped under null.
+    """
+    def get(self, request: HttpRequest) -> JsonResponse:
+        # data_etag(*STATS_MODELS), from _conditional_get.
+        version = request.data_version
+        stats, stats_hit = get_or_build(STATS_KEY, _headcount_stats, version=version)
+        breakdowns, breakdowns_hit = get_or_build(BREAKDOWNS_KEY, _headcount_breakdowns, version=version)
+        response = JsonResponse({**stats, **breakdowns})
+        response['X-Cache'] = 'HIT' if stats_hit and breakdowns_hit else 'MISS'
+        return response
 
-        elif slug == 'compliance':
-            response = DjangoHttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = 'attachment; filename="compliance_status_report.csv"'
-            writer = csv.writer(response)
-            writer.writerow(['Emp ID', 'Name', 'Compliance Type', 'Status', 'Document URL'])
-            for c in EmpComplianceTracker.objects.select_related('emp').all():
-                writer.writerow([c.emp_id, f"{c.emp.first_name} {c.emp.last_name}", c.comp_type, c.status, c.doc_url or ''])
-            return response
 
-        else:
+class ReportDownloadView(View):
+    """Send a CSV report generated in the background (see ``report_jobs``).
+
+    When the data changed since the last run, a new run is queued and the
+    previous file is sent meanwhile (``X-Report-Stale: true``); with no
+    file yet the answer is 202 with ``Retry-After``. ``?wait=<seconds>``
+    (at most ``REPORT_WAIT_TIMEOUT``) waits for the new file instead. Files
+    are sent from disk (``sendfile`` under servers with
+    ``wsgi.file_wrapper``), gzipped when the client accepts it.
+    """
+    def get(self, request: HttpRequest, slug: str) -> HttpResponseBase:
+        if slug not in REPORTS:
             return JsonResponse({'error': f'Unknown report: {slug}'}, status=404)
+        try:
+            wait = float(request.GET.get('wait') or 0)
+        except ValueError:
+            return JsonResponse({'error': 'wait must be a number of seconds.'}, status=400)
+        wait = min(max(wait, 0), getattr(settings, 'REPORT_WAIT_TIMEOUT', 30))
+
+        job = request_report(slug)
+        stale = False
+        try:
+            path = job.result(timeout=wait)
+        except FutureTimeoutError:
+            path = latest_artifact(slug)
+            if path is None:
+                response = JsonResponse({'status': 'generating', 'slug': slug}, status=202)
+                response['Retry-After'] = '5'
+                return response
+            stale = True
+
+        filename, _ = REPORTS[slug]
+        packed = path.with_name(path.name + GZIP_SUFFIX)
+        gzipped = negotiate(request.headers.get('Accept-Encoding', ''), ('gzip',)) and packed.is_file()
+        try:
+            body = (packed if gzipped else path).open('rb')
+        except FileNotFoundError:
+            # Pruned after a newer run replaced it; that run's file is ready.
+            response = JsonResponse({'status': 'generating', 'slug': slug}, status=202)
+            response['Retry-After'] = '1'
+            return response
+        response = FileResponse(body, content_type='text/csv', as_attachment=True, filename=filename)
+        if gzipped:
+            response['Content-Encoding'] = 'gzip'
+        if stale:
+            response['X-Report-Stale'] = 'true'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
 
 
 class InitiateExitView(View):
@@ -594,6 +1097,11 @@ class InitiateExitView(View):
         except EmpMaster.DoesNotExist:
             return JsonResponse({'error': f'Employee {emp_id} not found.'}, status=404)
 
-        emp.end_date = end_date
-        emp.save()
+        if emp.end_date != end_date:
+            emp.end_date = end_date
+            with transaction.atomic():
+                emp.save()
+                seq = changes.record({EmpMaster: [emp.emp_id]})
+                bump_data_version(EmpMaster)
+            events.publish(events.EXIT_INITIATED, seq=seq, ids=[emp.emp_id], end_date=end_date)
         return JsonResponse({'ok': True, 'message': f'Exit initiated for {emp.first_name} {emp.last_name}. Last working day: {end_date}'})
@@ -1,12 +1,73 @@
-import { httpJson } from './http.js'
+import { httpJson, resolveUrl } from './http.js'
 
-export function apiGetEmployees({ token }) {
-    return httpJson('/api/employees', {
+// Pass `limit` (and the returned `next_cursor`) to page through results.
+function withQuery(path, params) {
+    const query = new URLSearchParams()
+    Object.entries(params || {}).forEach(([key, value]) => {
+        if (value !== undefined && value !== null && value !== '') query.set(key, value)
+    })
+    const qs = query.toString()
+    return qs ? `${path}?${qs}` : path
+}
+
+// params: { status, start_from, start_to, name, sort, limit, cursor, format: "rows" | "columns" }
+export function apiGetEmployees({ token, params } = {}) {
+    return httpJson(withQuery('/api/employees', params), {
         method: 'GET',
         token,
     })
 }
 
+// Master row, registration IDs, bank accounts, CTC timeline and compliance docs.
+export function apiGetEmployeeProfile({ token, empId }) {
+    return httpJson(`/api/employees/${encodeURIComponent(empId)}`, {
+        method: 'GET',
+        token,
+    })
+}
+
+// requests: [{ id, path }] (GET only). Resolves to { [id]: body }; throws
+// on the first sub-request that failed.
+export async function apiBatch({ token, requests }) {
+    const payload = await httpJson('/api/batch', {
+        method: 'POST',
+        token,
+        body: { requests },
+    })
+    const results = {}
+    for (const { id, status, body } of payload.responses) {
+        if (status >= 400) {
+            const error = new Error(body?.error || body?.message || `Request failed (${status})`)
+            error.status = status
+            error.payload = body
+            throw error
+        }
+        results[id] = body
+    }
+    return results
+}
+
+// Rows written since `since` (the `seq` of the previous call; omit it to get
+// the current `seq` only): { seq, has_more, upserts: { table: rows }, deletes: { table: ids } }.
+export function apiGetChanges({ token, since, limit, format } = {}) {
+    return httpJson(withQuery('/api/changes', { since, limit, format }), {
+        method: 'GET',
+        token,
+    })
+}
+
+// Live updates over server-sent events (ASGI backend only). `onEvent(type, data)`
+// gets employees.added, employees.exit_initiated and resync
+// (refetch, or apply /api/changes from data.since). Returns a function that closes the stream.
+export function subscribeEvents({ onEvent }) {
+    const source = new EventSource(resolveUrl('/api/events'))
+    const types = ['employees.added', 'employees.exit_initiated', 'resync']
+    types.forEach((type) => {
+        source.addEventListener(type, (event) => onEvent(type, JSON.parse(event.data)))
+    })
+    return () => source.close()
+}
+
 export function apiAddEmployee({ token, employee }) {
     return httpJson('/api/employees/add', {
         method: 'POST',
@@ -29,8 +90,9 @@ export function apiGetOnboarding({ token }) {
     })
 }
 
-export function apiGetJobHistory({ token }) {
-    return httpJson('/api/job-history', {
+// params: { employee, effective_from, effective_to, limit, cursor, format: "rows" | "columns" }
+export function apiGetJobHistory({ token, params } = {}) {
+    return httpJson(withQuery('/api/job-history', params), {
         method: 'GET',
         token,
     })
@@ -1,4 +1,4 @@
-function resolveUrl(path) {
+export function resolveUrl(path) {
   if (typeof path !== 'string' || !path) return path
   if (/^https?:\/\//i.test(path)) return path
 
@@ -10,16 +10,23 @@ function resolveUrl(path) {
   return new URL(path, baseUrl).toString()
 }
 
+// Time of this client's last write, as reported by the backend. Sending it
+// back makes the backend read from the primary database (not a replica
+// that may be behind) for a few seconds after our own writes.
+let lastWrite = null
+
 export async function httpJson(path, { method = 'GET', token, body } = {}) {
   const headers = { Accept: 'application/json' }
   if (body !== undefined) headers['Content-Type'] = 'application/json'
   if (token) headers.Authorization = `Bearer ${token}`
+  if (lastWrite) headers['X-Last-Write'] = lastWrite
 
   const res = await fetch(resolveUrl(path), {
     method,
     headers,
     body: body === undefined ? undefined : JSON.stringify(body),
   })
+  lastWrite = res.headers.get('X-Last-Write') || lastWrite
 
   const isJson = (res.headers.get('content-type') || '').includes('application/json')
   const payload = isJson ? await res.json() : null
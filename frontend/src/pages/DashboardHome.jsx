@@ -1,7 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../auth/AuthContext';
-import { apiGetEmployees, apiGetCompliance } from '../api/employeeApi';
+import { apiBatch, subscribeEvents } from '../api/employeeApi';
 
 function DashboardHome() {
     const { token } = useAuth();
@@ -14,10 +14,13 @@ function DashboardHome() {
     useEffect(() => {
         async function fetchData() {
             try {
-                const [empRes, compRes] = await Promise.all([
-                    apiGetEmployees({ token }),
-                    apiGetCompliance({ token })
-                ]);
+                const { employees: empRes, compliance: compRes } = await apiBatch({
+                    token,
+                    requests: [
+                        { id: 'employees', path: '/api/employees' },
+                        { id: 'compliance', path: '/api/compliance' },
+                    ],
+                });
                 setEmployees(empRes.employees || []);
                 setCompliance(compRes.compliance_records || []);
             } catch (err) {
@@ -26,7 +29,20 @@ function DashboardHome() {
                 setLoading(false);
             }
         }
-        if (token) fetchData();
+        if (!token) return undefined;
+        fetchData();
+        // Refetch when employees change; bursts collapse into one fetch.
+        let timer = null;
+        const unsubscribe = subscribeEvents({
+            onEvent: () => {
+                clearTimeout(timer);
+                timer = setTimeout(fetchData, 500);
+            },
+        });
+        return () => {
+            clearTimeout(timer);
+            unsubscribe();
+        };
     }, [token]);
 
     const totalHeadcount = employees.length;
@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { useAuth } from '../auth/AuthContext';
-import { apiGetReports, apiGetCompliance, apiGetEmployees } from '../api/employeeApi';
+import { apiBatch } from '../api/employeeApi';
 
 const COLORS = ['#3b82f6', '#22c55e', '#f59e0b', '#8b5cf6', '#f06292', '#2dd4bf', '#ef4444', '#6366f1', '#ec4899', '#14b8a6'];
 
@@ -115,11 +115,14 @@ function Reports() {
     useEffect(() => {
         async function fetchAll() {
             try {
-                const [rpt, comp, emp] = await Promise.all([
-                    apiGetReports({ token }),
-                    apiGetCompliance({ token }),
-                    apiGetEmployees({ token }),
-                ]);
+                const { reports: rpt, compliance: comp, employees: emp } = await apiBatch({
+                    token,
+                    requests: [
+                        { id: 'reports', path: '/api/reports' },
+                        { id: 'compliance', path: '/api/compliance' },
+                        { id: 'employees', path: '/api/employees' },
+                    ],
+                });
                 setData(rpt);
                 setCompliance(comp.compliance_records || []);
                 setEmployees(emp.employees || []);
@@ -246,7 +249,7 @@ function Reports() {
                     <tbody>
                         {data.reports.map(r => (
                             <tr key={r.slug}>
-                                <td>{r.name}</td><td>{r.description}</td><td>{r.last_generated}</td>
+                                <td>{r.name}</td><td>{r.description}</td><td>{r.last_generated || '—'}</td>
                                 <td><button className="btn" onClick={() => handleDownload(r.slug)}>Download</button></td>
                             </tr>
                         ))}
@@ -1,10 +1,46 @@
+import { readFileSync, writeFileSync } from 'node:fs'
+import { join } from 'node:path'
+import zlib from 'node:zlib'
 import { defineConfig } from 'vite'
 import react from '@vitejs/plugin-react'
 
+const COMPRESSIBLE = /\.(js|mjs|css|html|svg|json|txt|map)$/
+const MIN_SIZE = 1024
+
+// Writes .gz, .br and (when this Node has it) .zst next to every
+// compressible build output, so the backend can serve them as is.
+function precompress() {
+  const codings = [
+    ['.gz', (data) => zlib.gzipSync(data, { level: 9 })],
+    ['.br', (data) => zlib.brotliCompressSync(data, {
+      params: { [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY },
+    })],
+  ]
+  if (zlib.zstdCompressSync) {
+    codings.push(['.zst', (data) => zlib.zstdCompressSync(data)])
+  }
+  return {
+    name: 'precompress',
+    apply: 'build',
+    writeBundle(options, bundle) {
+      for (const fileName of Object.keys(bundle)) {
+        if (!COMPRESSIBLE.test(fileName)) continue
+        const file = join(options.dir, fileName)
+        const data = readFileSync(file)
+        if (data.length < MIN_SIZE) continue
+        for (const [suffix, compress] of codings) {
+          const packed = compress(data)
+          if (packed.length < data.length) writeFileSync(file + suffix, packed)
+        }
+      }
+    },
+  }
+}
+
 // https://vite.dev/config/
 export default defineConfig(({ mode }) => {
   return {
-    plugins: [react()],
+    plugins: [react(), precompress()],
     server: {
       proxy: {
         '/api': {